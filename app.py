@@ -1,44 +1,56 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-import folium
-from streamlit_folium import st_folium
+import os
 import time
+from dataclasses import replace
 from datetime import datetime, timedelta
-import hashlib
-import re
+
+from catalog import Catalog
+from change_feed import ChangeFeed, LiveAggregates
+from exports import WRITERS, export_path, payroll_table, write_payslips
+from metrics import record_table_gauges, rerun_span, span, start_server
+from paging import render_paged_table
+from rebalancing import plan_moves, plan_rebalance, validate_plan
+from reconciliation import reconcile_shifts, variance_summary
+from retention import RetentionState, compact, compacted_tables, enforce_budget, history_bounds, read_archive_rows, sales_history, table_bytes
+from regions import RegionCluster, aggregate_hq, hub_for_store, partition_by_region, region_summary
+from security import hash_password, sanitize_input
+from seed_data import ROW_IDS, id_counters, load_seed_tables, next_ids
+from stock_aging import AGING_LABELS, LastSoldTracker
+from stock_ledger import StockLedger
+from time_index import append_events, index_tables, latest
+from trends import build_trend_series
 
 # ==============================================================================
 # 1. SECURITY & CONFIGURATION LAYER
 # ==============================================================================
 
-st.set_page_config(
-    page_title="Hyderabad Retail Nexus",
-    page_icon="🛡️",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header { font-size: 2.5rem; font-weight: 700; color: #1e293b; }
-    .status-badge { padding: 4px 8px; border-radius: 4px; font-weight: 600; font-size: 0.8rem; }
-    .critical { background-color: #fca5a5; color: #7f1d1d; }
-    .healthy { background-color: #86efac; color: #14532d; }
-    div[data-testid="stMetricValue"] { font-size: 1.8rem; }
-</style>
-""", unsafe_allow_html=True)
-
-# --- SECURITY UTILS ---
-def hash_password(password):
-    return hashlib.sha256(str(password).encode()).hexdigest()
-
-def sanitize_input(user_input):
-    if not isinstance(user_input, str): return user_input
-    return re.sub(r'[^\w\s\-\.\@]', '', user_input)
+def configure_page():
+    st.set_page_config(
+        page_title="Hyderabad Retail Nexus",
+        page_icon="🛡️",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+
+    # Custom CSS
+    st.markdown("""
+    <style>
+        .main-header { font-size: 2.5rem; font-weight: 700; color: #1e293b; }
+        .status-badge { padding: 4px 8px; border-radius: 4px; font-weight: 600; font-size: 0.8rem; }
+        .critical { background-color: #fca5a5; color: #7f1d1d; }
+        .healthy { background-color: #86efac; color: #14532d; }
+        div[data-testid="stMetricValue"] { font-size: 1.8rem; }
+    </style>
+    """, unsafe_allow_html=True)
+
+# --- LAZY HEAVY IMPORTS ---
+# Plotly is only imported when an analytics view renders, so POS sessions never pay for it
+def load_plotly():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    return px, go
 
 # --- AUTHENTICATION MODULE ---
 # CREDENTIALS dict removed, we now use the 'employees' table in session_state
@@ -58,170 +70,137 @@ def login_user(username, password):
 # 2. DATA PROCESSING & OPTIMIZATION LAYER
 # ==============================================================================
 
+@st.cache_resource
+def shared_feed():
+    # One feed per server process: cashiers in any session publish, each admin session subscribes
+    return ChangeFeed()
+
 def initialize_data_optimized():
-    stores_info = {
-        'Hitech City': 'HYDSTR001', 'Banjara Hills': 'HYDSTR002', 'Gachibowli': 'HYDSTR003',
-        'Secunderabad': 'HYDSTR004', 'Uppal': 'HYDSTR005', 'Jubilee Hills': 'HYDSTR006',
-        'Madhapur': 'HYDSTR007', 'Kukatpally': 'HYDSTR008', 'Begumpet': 'HYDSTR009', 'Charminar': 'HYDSTR010'
-    }
-    stores = list(stores_info.keys())
-    
-    products_info = {
-        'iPhone 15': 75000.0, 'Samsung TV': 45000.0, 'Milk (1L)': 60.0, 
-        'Rice (25kg)': 1200.0, 'Detergent': 250.0, 'T-Shirt': 500.0
-    }
-    products = list(products_info.keys())
-    
-    # Coordinates mapping
-    coords = {
-        'Hitech City': (17.44, 78.38), 'Banjara Hills': (17.41, 78.43),
-        'Gachibowli': (17.44, 78.34), 'Secunderabad': (17.43, 78.50),
-        'Uppal': (17.39, 78.56), 'Jubilee Hills': (17.42, 78.40),
-        'Madhapur': (17.45, 78.39), 'Kukatpally': (17.48, 78.40),
-        'Begumpet': (17.44, 78.46), 'Charminar': (17.36, 78.47)
-    }
-    
-    df = pd.DataFrame([{'Location': s, 'StoreID': stores_info[s], 'Product': p, 'Type': 'Store'} for s in stores for p in products])
-    hub_df = pd.DataFrame([{'Location': 'Kompally Hub', 'Product': p, 'Type': 'Hub'} for p in products])
-    df = pd.concat([hub_df, df], ignore_index=True)
-    
-    targets = {'iPhone 15': 20, 'Samsung TV': 10, 'Milk (1L)': 100, 'Rice (25kg)': 50, 'Detergent': 80, 'T-Shirt': 40}
-    df['Target_Stock'] = df['Product'].map(targets)
-    df['Current_Stock'] = np.where(
-        df['Type'] == 'Hub',
-        df['Target_Stock'] * 100,
-        (np.random.rand(len(df)) * 1.5 * df['Target_Stock']).astype(int)
-    )
-    df['Lat'] = df['Location'].map(lambda x: coords.get(x, (17.55, 78.49))[0])
-    df['Lon'] = df['Location'].map(lambda x: coords.get(x, (17.55, 78.49))[1])
-    
-    # Generate Mock Sales
-    sales_data = []
-    # Make random seed for reproducibility in sales demo
-    np.random.seed(42)
-    for _ in range(250):
-        sale_date = datetime.now() - timedelta(days=np.random.randint(0, 30))
-        store = np.random.choice(stores)
-        prod = np.random.choice(products)
-        qty = np.random.randint(1, 4)
-        sales_data.append({
-            'Date': sale_date.strftime("%Y-%m-%d %H:%M"),
-            'Location': store,
-            'Product': prod,
-            'Quantity': qty,
-            'Revenue': qty * products_info[prod]
-        })
-    sales_df = pd.DataFrame(sales_data)
-    # Sort by Date descending correctly
-    sales_df['Date'] = pd.to_datetime(sales_df['Date'])
-    sales_df = sales_df.sort_values(by='Date', ascending=False)
-    sales_df['Date'] = sales_df['Date'].dt.strftime('%Y-%m-%d %H:%M')
-
-    # Dispatches (empty at start, will fill from actions)
-    dispatches_df = pd.DataFrame(columns=['Date', 'Destination', 'Product', 'Quantity', 'Status'])
-
-    # Requests
-    requests_df = pd.DataFrame([
-         {'Date': (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"), 'Store': 'Gachibowli', 'Product': 'Milk (1L)', 'Quantity': 50, 'Status': 'Pending'},
-         {'Date': (datetime.now() - timedelta(hours=5)).strftime("%Y-%m-%d %H:%M"), 'Store': 'Charminar', 'Product': 'Rice (25kg)', 'Quantity': 20, 'Status': 'Approved'}
-    ])
-
-    # Employees
-    employees_data = [
-        {'EmpID': 'EMP-0001', 'Name': 'Super Admin', 'Username': 'admin', 'PasswordHash': hash_password('admin123'), 'Contact': 'admin@nexus.com', 'Role': 'Admin', 'Store': 'All', 'Wage': 50000, 'Status': 'Active'},
-        {'EmpID': 'HYDSTR001-MGR', 'Name': 'Store Manager Hitech', 'Username': 'manager1', 'PasswordHash': hash_password('mgr123'), 'Contact': 'mgr.hitech@nexus.com', 'Role': 'Manager', 'Store': 'Hitech City', 'Wage': 35000, 'Status': 'Active'},
-        {'EmpID': 'EMP-2051', 'Name': 'Cashier Hitech', 'Username': 'employee', 'PasswordHash': hash_password('emp123'), 'Contact': 'cashier.hitech@nexus.com', 'Role': 'Employee', 'Store': 'Hitech City', 'Wage': 20000, 'Status': 'Active'},
-        {'EmpID': 'HYDCHAR001', 'Name': 'Rajesh', 'Username': 'rajesh', 'PasswordHash': hash_password('emp123'), 'Contact': 'rajesh@nexus.com', 'Role': 'Employee', 'Store': 'Charminar', 'Wage': 22000, 'Status': 'Active'},
-        {'EmpID': 'HYDBAN001', 'Name': 'Suresh', 'Username': 'suresh', 'PasswordHash': hash_password('emp123'), 'Contact': 'suresh@nexus.com', 'Role': 'Employee', 'Store': 'Banjara Hills', 'Wage': 25000, 'Status': 'Active'},
-        {'EmpID': 'HYDGAC001', 'Name': 'Ramesh', 'Username': 'ramesh', 'PasswordHash': hash_password('emp123'), 'Contact': 'ramesh@nexus.com', 'Role': 'Employee', 'Store': 'Gachibowli', 'Wage': 24000, 'Status': 'Active'}
-    ]
-    employees_df = pd.DataFrame(employees_data)
-
-    # Attendance
-    att_data = []
-    for emp_id in [e['EmpID'] for e in employees_data if e['Role'] != 'Admin']:
-        # Generate 15-25 random days of attendance in the last 30 days
-        days_worked = np.random.randint(15, 26)
-        for d in range(days_worked):
-            date_str = (datetime.now() - timedelta(days=np.random.randint(1, 30))).strftime("%Y-%m-%d")
-            att_data.append({
-                'EmpID': emp_id,
-                'Date': date_str,
-                'CheckIn': '09:00:00',
-                'CheckOut': '18:00:00'
-            })
-    attendance_df = pd.DataFrame(att_data).drop_duplicates(subset=['EmpID', 'Date'])
-    if attendance_df.empty:
-        attendance_df = pd.DataFrame(columns=['EmpID', 'Date', 'CheckIn', 'CheckOut'])
-
-    # Audit Logs
-    audit_logs_df = pd.DataFrame(columns=['Timestamp', 'User', 'Action', 'Details'])
-
-    # Purchase Orders
-    po_df = pd.DataFrame(columns=['PO_ID', 'Date', 'Supplier', 'Product', 'Quantity', 'TotalCost', 'Status'])
-
-    # Shifts
-    shifts_df = pd.DataFrame(columns=['ShiftID', 'EmpID', 'Store', 'Date', 'StartCash', 'EndCash', 'Status'])
-
-    return {
-        'inventory': df,
-        'sales': sales_df,
-        'dispatches': dispatches_df,
-        'requests': requests_df,
-        'stores': stores,
-        'stores_info': stores_info,
-        'products': products,
-        'products_info': products_info,
-        'employees': employees_df,
-        'attendance': attendance_df,
-        'audit_logs': audit_logs_df,
-        'purchase_orders': po_df,
-        'shifts': shifts_df
-    }
-
-if 'db' not in st.session_state:
-    st.session_state['db'] = initialize_data_optimized()
-
-if 'auth_status' not in st.session_state:
-    st.session_state['auth_status'] = False
-    st.session_state['user_role'] = None
-    st.session_state['user_store'] = None
+    # Seed tables come from the prebuilt memory-mapped snapshot when one exists
+    db = load_seed_tables()
+    db.update(compacted_tables())
+    db = index_tables(db)
+    db['last_sold'] = LastSoldTracker.from_sales(db['sales'], db['stores'], db['products'], now=datetime.now())
+    db['catalog'] = Catalog(db['product_catalog'])
+    inv = db['inventory']
+    db['ledger'] = StockLedger.from_inventory(inv)
+    db['inventory_rows'] = dict(zip(zip(inv['Location'], inv['Product']), inv.index))
+    db['retention'] = RetentionState()
+    db['feed'] = shared_feed()
+    db['id_seq'] = id_counters(db)
+    return db
+
+def move_stock(db, moves):
+    # Every stock movement is a ledger event; Current_Stock is the ledger's materialized view
+    kinds, locations, products, deltas = zip(*moves)
+    levels = db['ledger'].record_batch(kinds, locations, products, deltas)
+    rows = [db['inventory_rows'][cell] for cell in zip(locations, products)]
+    db['inventory'].loc[rows, 'Current_Stock'] = levels
+
+def record_sales(db, rows):
+    # Single write path for sales: time-ordered table plus last-sold tracker
+    new = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    append_events(db, 'sales', new)
+    db['last_sold'].record_many(new['Location'], new['Product'], new['Quantity'], new['Date'])
+    for row in new[['Date', 'Location', 'Product', 'Quantity', 'Revenue']].to_dict('records'):
+        db['feed'].publish('sale', **row)
+
+def row_for_id(db, table, row_id):
+    # Frame label of a row by its stable ID at the moment of use, or None once it's archived
+    frame = db[table]
+    hits = frame.index[frame[ROW_IDS[table][0]] == row_id]
+    return hits[0] if len(hits) else None
+
+def reconcile(db, shifts=None):
+    # The sales time index already holds the sale timestamps as int64 ns
+    shifts = db['shifts'] if shifts is None else shifts
+    return reconcile_shifts(shifts, db['sales'], sales_ns=db['time_index']['sales'].keys, refunds=db['refunds'])
+
+def product_options(key, default=None):
+    # Picker choices come from a catalog prefix search rather than the full product list
+    query = st.text_input("🔎 Find product (name, SKU or barcode)", key=f"{key}_search")
+    options = st.session_state['db']['catalog'].picker_options(query, include=default)
+    return options, options.index(default) if default in options else 0
+
+def init_session():
+    if 'db' not in st.session_state:
+        st.session_state['db'] = initialize_data_optimized()
+
+    if 'auth_status' not in st.session_state:
+        st.session_state['auth_status'] = False
+        st.session_state['user_role'] = None
+        st.session_state['user_store'] = None
 
 # ==============================================================================
 # 3. UI LOGIC (SECURE REWRITE)
 # ==============================================================================
 
+LIVE_REFRESH_S = 5
+ARCHIVE_PAGE_ROWS = 100
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def render_live_feed():
+    # Reruns on its own timer and applies only the deltas published since the last tick
+    db = st.session_state['db']
+    sub_name = st.session_state.setdefault('live_sub_name', f"admin-{id(st.session_state)}-{time.time_ns()}")
+    sub = db['feed'].subscribe(sub_name)
+    agg = st.session_state.get('live_agg')
+    deltas, overflowed = sub.drain()
+    if agg is None or overflowed or sub is not st.session_state.get('live_sub') or agg.day != pd.Timestamp.now().normalize():
+        # First tick, dropped deltas, expired subscription or a new day: rebuild from the tables
+        agg = st.session_state['live_agg'] = LiveAggregates()
+        agg.resync(db)
+        st.session_state['live_sub'] = sub
+    else:
+        for delta in deltas:
+            agg.apply(delta)
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Revenue Today", f"₹{agg.revenue:,.0f}")
+    c2.metric("Sales Today", agg.sales, help=f"{agg.units} units")
+    c3.metric("Pending Requests", agg.pending_requests)
+    c4.metric("In Transit", agg.in_transit)
+    c5.metric("Staff On Shift", len(agg.on_shift))
+    if agg.recent:
+        st.dataframe(pd.DataFrame(list(agg.recent)), width='stretch', hide_index=True, height=180)
+    else:
+        st.caption(f"Waiting for network activity (refreshes every {LIVE_REFRESH_S}s).")
+
 def render_admin_dashboard():
     db = st.session_state['db']
     
-    tabs = st.tabs(["📊 Sales Tracking", "🚚 Dispatch Monitoring", "🔮 AI Demand Forecasting", "📥 Store Requests Dashboard", "� Inter-Store Transfers", "📦 Supplier & POs", "�👥 HR Management", "💰 Payroll & Audit"])
+    with st.expander("📡 Live Network Feed", expanded=True):
+        render_live_feed()
+    
+    tabs = st.tabs(["📊 Sales Tracking", "🚚 Dispatch Monitoring", "🔮 AI Demand Forecasting", "📥 Store Requests Dashboard", "� Inter-Store Transfers", "📦 Supplier & POs", "�👥 HR Management", "💰 Payroll & Audit", "🗺️ Regional Hubs", "🧾 Stock Ledger", "🗄️ Data Retention"])
     
     # TAB 1: Sales Tracking
-    with tabs[0]:
+    with tabs[0], span('tab', 'admin.sales_tracking'):
         st.subheader("Network Sales Analytics")
-        if not db['sales'].empty:
-            sales_df = db['sales'].copy()
-            sales_df['Date'] = pd.to_datetime(sales_df['Date'])
+        s_index = db['time_index']['sales']
+        first_sale, last_sale = history_bounds(db)
+        if first_sale is not None:
+            px, go = load_plotly()
+            sales_df = db['sales']
             
             # Sub-tabs for better organization
             s_tabs = st.tabs(["Overview & Trends", "Store Financial Monitor", "Peak Hour Heatmap", "Dead Stock Analysis"])
             
-            with s_tabs[0]:
+            with s_tabs[0], span('tab', 'sales.overview'):
                 colA, colB = st.columns([1, 3])
                 with colA:
                     st.markdown("**Date Range Filter**")
-                    min_date = sales_df['Date'].min().date()
-                    max_date = sales_df['Date'].max().date()
+                    min_date = first_sale.date()
+                    max_date = last_sale.date()
                     start_d = st.date_input("Start Date", min_date, min_value=min_date, max_value=max_date)
                     end_d = st.date_input("End Date", max_date, min_value=min_date, max_value=max_date)
                     
-                # Filter data
-                mask = (sales_df['Date'].dt.date >= start_d) & (sales_df['Date'].dt.date <= end_d)
-                filtered_sales = sales_df.loc[mask]
+                # Filter data (binary search on the time index, end date inclusive); compacted days come from daily aggregates
+                filtered_sales = sales_history(db, start_d, end_d + timedelta(days=1))
                 
                 if not filtered_sales.empty:
                     c1, c2, c3 = st.columns(3)
-                    c1.metric("Total Sales Events", len(filtered_sales))
+                    c1.metric("Total Sales Events", int(filtered_sales['Transactions'].sum()))
                     c2.metric("Total Items Sold", filtered_sales['Quantity'].sum())
                     top_store = filtered_sales.groupby('Location')['Quantity'].sum().idxmax()
                     c3.metric("Top Performing Store", top_store)
@@ -238,30 +217,56 @@ def render_admin_dashboard():
                         store_sales = filtered_sales.groupby('Location')['Quantity'].sum().reset_index()
                         fig2 = px.bar(store_sales, x='Location', y='Quantity', color='Location', color_discrete_sequence=px.colors.qualitative.Set2)
                         st.plotly_chart(fig2, width='stretch')
-                        
+
+                    st.markdown("**Revenue & Units Trend**")
+                    t_col1, t_col2 = st.columns(2)
+                    with t_col1:
+                        trend_metric = st.radio("Metric", ["Revenue", "Quantity"], horizontal=True, key="trend_metric")
+                    with t_col2:
+                        trend_split = st.radio("Split By", ["Location", "Product"], horizontal=True, key="trend_split")
+
+                    # Pre-bin and downsample on the server so the payload stays bounded
+                    # Daily aggregates can't be binned finer than a day
+                    lo, hi = db['time_index']['sales_daily'].bounds(start_d, end_d + timedelta(days=1))
+                    bin_label, trend = build_trend_series(
+                        filtered_sales, pd.Timestamp(start_d), pd.Timestamp(end_d) + pd.Timedelta(days=1),
+                        split_by=trend_split, metric=trend_metric,
+                        min_step=pd.Timedelta(days=1) if hi > lo else None
+                    )
+                    fig_trend = go.Figure()
+                    for name, (xs, ys) in trend.items():
+                        fig_trend.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', name=name))
+                    fig_trend.update_layout(
+                        title=f"{trend_metric} by {trend_split} ({bin_label} bins)",
+                        hovermode='x unified', margin=dict(t=40, b=20)
+                    )
+                    st.plotly_chart(fig_trend, width='stretch')
+
                     st.markdown("**Recent Global Sales Logs**")
-                    st.dataframe(filtered_sales.sort_values(by='Date', ascending=False).head(15), width='stretch', hide_index=True)
+                    st.dataframe(latest(filtered_sales, 15), width='stretch', hide_index=True)
                 else:
                     st.warning("No sales found in the selected date range.")
             
-            with s_tabs[1]:
+            with s_tabs[1], span('tab', 'sales.store_monitor'):
                 st.markdown("### Store Financial & Revenue Monitor")
                 st.markdown("Analyze revenue and specific metrics by store and product.")
                 
                 f_col1, f_col2 = st.columns(2)
                 with f_col1:
                     mon_store = st.selectbox("Select Store", db['stores'], key="mon_store")
-                    mon_prod = st.selectbox("Select Product", db['products'] + ["All Products"], key="mon_prod")
+                    mon_options, _ = product_options("mon_prod")
+                    mon_prod = st.selectbox("Select Product", mon_options + ["All Products"], key="mon_prod")
                 with f_col2:
                     m_start_d = st.date_input("From Date", min_date, key="mon_start")
                     m_end_d = st.date_input("To Date", max_date, key="mon_end")
                 
                 # Filter sales
-                s_mask = (sales_df['Date'].dt.date >= m_start_d) & (sales_df['Date'].dt.date <= m_end_d) & (sales_df['Location'] == mon_store)
+                mon_range = sales_history(db, m_start_d, m_end_d + timedelta(days=1))
+                s_mask = mon_range['Location'] == mon_store
                 if mon_prod != "All Products":
-                    s_mask = s_mask & (sales_df['Product'] == mon_prod)
+                    s_mask = s_mask & (mon_range['Product'] == mon_prod)
                     
-                mon_sales = sales_df.loc[s_mask]
+                mon_sales = mon_range.loc[s_mask]
                 
                 # Get store specific info
                 store_employees = db['employees'][ (db['employees']['Store'] == mon_store) | (db['employees']['Store'] == 'All') ]
@@ -280,17 +285,21 @@ def render_admin_dashboard():
                 m_c3.metric("Total Revenue (₹)", f"₹{total_rev:,.2f}")
                 
                 if not mon_sales.empty:
-                    st.dataframe(mon_sales[['Date', 'Product', 'Quantity', 'Revenue']].sort_values(by='Date', ascending=False), hide_index=True, width='stretch')
+                    render_paged_table(mon_sales, key="mon_sales_tbl", columns=['Date', 'Product', 'Quantity', 'Revenue'], sort_by='Date', presorted='Date')
                 else:
                     st.info("No sales data matches the criteria.")
                     
-            with s_tabs[2]:
+            with s_tabs[2], span('tab', 'sales.heatmap'):
                 st.markdown("### Peak Hour Sales Heatmap")
                 st.markdown("Identify the busiest times across stores for optimized shift scheduling.")
                 
-                # Extract Hours
-                hm_df = sales_df.copy()
-                hm_df['Hour'] = hm_df['Date'].dt.hour
+                if len(db['sales_daily']):
+                    st.caption(f"Hourly detail is kept for raw sales only (since {s_index.first():%d %b %Y})." if len(s_index) else "Hourly detail is kept for raw sales only.")
+                # Extract Hours straight from the index keys (ns since epoch)
+                hm_df = pd.DataFrame({
+                    'Location': sales_df['Location'].to_numpy(),
+                    'Hour': (s_index.keys // 3_600_000_000_000) % 24
+                })
                 
                 # Count sales per store per hour
                 heatmap_data = hm_df.groupby(['Location', 'Hour']).size().reset_index(name='Transactions')
@@ -303,27 +312,34 @@ def render_admin_dashboard():
                 fig_hm.update_layout(xaxis=dict(tickmode='linear', tick0=0, dtick=1))
                 st.plotly_chart(fig_hm, width='stretch')
 
-            with s_tabs[3]:
+            with s_tabs[3], span('tab', 'sales.dead_stock'):
                 st.markdown("### Dead Stock Analytics")
                 
                 ds_range = st.selectbox("Inactivity Threshold (Days)", [30, 60, 90], index=0)
-                cutoff_date = datetime.now() - timedelta(days=ds_range)
-                
-                # Find all store-product combinations that have NO sales since cutoff
-                recent_sales = sales_df[sales_df['Date'] >= cutoff_date]
-                sold_items = recent_sales[['Location', 'Product']].drop_duplicates()
-                sold_items['Sold_Recently'] = True
+                now = datetime.now()
+                tracker = db['last_sold']
                 
+                # Read last-sold time and velocity for every store line in one vectorized pass
                 inv = db['inventory']
-                stores_only = inv[inv['Type'] == 'Store'].copy()
+                stores_only = inv[inv['Type'] == 'Store']
+                cells = tracker.cells(stores_only['Location'], stores_only['Product'])
+                days_since = tracker.days_since_sale(now)[cells]
+                aging = stores_only[['Location', 'Product', 'Current_Stock', 'Target_Stock']].assign(
+                    Days_Since_Sale=np.round(days_since, 1),
+                    Units_Per_Day=np.round(tracker.velocity_at(now)[cells], 2),
+                    Days_Of_Cover=np.round(tracker.days_of_cover(stores_only['Current_Stock'].to_numpy(), now, cells), 1),
+                    Aging=np.array(AGING_LABELS)[tracker.aging_bucket(now)[cells]]
+                )
                 
-                # Merge to find Unsold items
-                merged = pd.merge(stores_only, sold_items, on=['Location', 'Product'], how='left')
-                dead_stock = merged[merged['Sold_Recently'].isna()]
+                bucket_counts = aging['Aging'].value_counts().reindex(AGING_LABELS, fill_value=0)
+                b_cols = st.columns(len(AGING_LABELS))
+                for b_col, (label, count) in zip(b_cols, bucket_counts.items()):
+                    b_col.metric(f"Last Sale {label} Ago", int(count))
                 
+                dead_stock = aging[days_since >= ds_range]
                 if not dead_stock.empty:
                     st.warning(f"Found {len(dead_stock)} product allocations with 0 sales in the last {ds_range} days.")
-                    st.dataframe(dead_stock[['Location', 'Product', 'Current_Stock', 'Target_Stock']].sort_values(by='Current_Stock', ascending=False), hide_index=True, width='stretch')
+                    st.dataframe(dead_stock.sort_values(by='Current_Stock', ascending=False), hide_index=True, width='stretch')
                 else:
                     st.success(f"Excellent! All inventory lines have seen movement in the last {ds_range} days.")
                     
@@ -331,47 +347,48 @@ def render_admin_dashboard():
             st.info("No sales records available.")
 
     # TAB 2: Dispatch Monitoring
-    with tabs[1]:
+    with tabs[1], span('tab', 'admin.dispatch'):
         st.subheader("Dispatch Tracking & Verification")
         st.markdown("Monitor stock moving from the Hub to specific retail store locations.")
         dispatches = db['dispatches'].copy()
         
         if not dispatches.empty:
-            st.dataframe(dispatches, width='stretch', hide_index=True)
+            render_paged_table(dispatches, key="dispatches_tbl", sort_by='Date', presorted='Date')
             
             st.markdown("### Update Transfer Status")
             in_transit = dispatches[dispatches['Status'] == 'In-Transit']
             
             if not in_transit.empty:
-                # Need to use the original index for update
-                in_transit_copy = in_transit.copy()
+                # Select by DispatchID: compaction renumbers the frame between reruns
+                in_transit_copy = in_transit.set_index('DispatchID')
                 in_transit_copy['Display'] = in_transit_copy.apply(lambda row: f"To {row['Destination']} - {row['Quantity']}x {row['Product']}", axis=1)
                 
-                idx = st.selectbox("Select Dispatch arriving at Store", in_transit_copy.index, format_func=lambda i: in_transit_copy.loc[i, 'Display'])
+                disp_id = st.selectbox("Select Dispatch arriving at Store", in_transit_copy.index, format_func=lambda i: in_transit_copy.loc[i, 'Display'])
                 
                 if st.button("Mark as Delivered & Update Inventory", type="primary"):
-                    # Record the status change
-                    st.session_state['db']['dispatches'].loc[idx, 'Status'] = 'Delivered'
+                    with span('action', 'dispatch.deliver'):
+                        idx = row_for_id(db, 'dispatches', disp_id)
+                        # Record the status change
+                        st.session_state['db']['dispatches'].loc[idx, 'Status'] = 'Delivered'
                     
-                    # Target info
-                    dest = db['dispatches'].loc[idx, 'Destination']
-                    prod = db['dispatches'].loc[idx, 'Product']
-                    qty = db['dispatches'].loc[idx, 'Quantity']
+                        # Target info
+                        dest = db['dispatches'].loc[idx, 'Destination']
+                        prod = db['dispatches'].loc[idx, 'Product']
+                        qty = db['dispatches'].loc[idx, 'Quantity']
                     
-                    # Update Store's Current Stock
-                    inv = st.session_state['db']['inventory']
-                    inv_idx = inv[(inv['Location'] == dest) & (inv['Product'] == prod)].index[0]
-                    st.session_state['db']['inventory'].at[inv_idx, 'Current_Stock'] += qty
+                        # Update Store's Current Stock
+                        move_stock(st.session_state['db'], [('DISPATCH_IN', dest, prod, qty)])
+                        db['feed'].publish('dispatch', Destination=dest, Product=prod, Quantity=int(qty), Status='Delivered')
                     
-                    st.success(f"Successfully marked delivered. {dest} inventory updated via Hub dispatch!")
-                    st.rerun()
+                        st.success(f"Successfully marked delivered. {dest} inventory updated via Hub dispatch!")
+                        st.rerun()
             else:
                 st.success("🎉 All dispatched goods have safely arrived at their destinations.")
         else:
             st.info("No dispatches on record yet. AI Forecasting or Store Requests will initialize a dispatch.")
 
     # TAB 3: AI Demand Forecasting
-    with tabs[2]:
+    with tabs[2], span('tab', 'admin.forecasting'):
         st.subheader("AI Predictor: Urgent Stock Targets")
         st.markdown("This AI-driven module predicts urgent needs based on local deficits and minimum targets.")
         
@@ -394,108 +411,122 @@ def render_admin_dashboard():
                                    np.where(shortages['Deficit_Ratio'] > 0.4, "⚠️ HIGH", "NORMAL"))
             
             st.markdown("**AI Prioritized Dispatch Strategy**")
-            display_shortages = shortages[['Location', 'Product', 'Current_Stock', 'Target_Stock', 'Required', 'Urgency']]
+            shortages['Hub'] = shortages['Location'].map(db['store_hub'])
+            display_shortages = shortages[['Location', 'Hub', 'Product', 'Current_Stock', 'Target_Stock', 'Required', 'Urgency']]
             st.dataframe(display_shortages, width='stretch', hide_index=True)
             
             st.markdown("### Rapid Dispatch Automation")
+            # Pre-fill with the most critical shortage
+            top_priority = shortages.iloc[0]
+            q_options, q_default = product_options("quick_dispatch", default=top_priority['Product'])
             with st.form("quick_dispatch"):
-                # Pre-fill with the most critical shortage
-                top_priority = shortages.iloc[0]
                 q_loc = st.selectbox("Destination Location", db['stores'], index=db['stores'].index(top_priority['Location']))
-                q_prod = st.selectbox("Product Target", db['products'], index=db['products'].index(top_priority['Product']))
+                q_prod = st.selectbox("Product Target", q_options, index=q_default)
                 q_qty = st.number_input("Units to Dispatch", min_value=1, max_value=1000, value=int(top_priority['Required']))
                 
                 if st.form_submit_button("Initiate Warehouse Dispatch", type="primary"):
-                    # Verify hub has the inventory
-                    hub_stock = inv[(inv['Location'] == 'Kompally Hub') & (inv['Product'] == q_prod)]['Current_Stock'].values[0]
-                    if hub_stock >= q_qty:
-                        # Deduct from Hub
-                        hub_idx = inv[(inv['Location'] == 'Kompally Hub') & (inv['Product'] == q_prod)].index[0]
-                        st.session_state['db']['inventory'].at[hub_idx, 'Current_Stock'] -= q_qty
+                    with span('action', 'dispatch.quick'):
+                        # Verify the destination's regional hub has the inventory
+                        hub = hub_for_store(db, q_loc)
+                        hub_stock = inv[(inv['Location'] == hub) & (inv['Product'] == q_prod)]['Current_Stock'].values[0]
+                        if hub_stock >= q_qty:
+                            # Deduct from Hub
+                            move_stock(st.session_state['db'], [('DISPATCH_OUT', hub, q_prod, -q_qty)])
                         
-                        # Apply to dispatch tracker
-                        new_dispatch = pd.DataFrame([{
-                            'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                            'Destination': q_loc,
-                            'Product': q_prod,
-                            'Quantity': q_qty,
-                            'Status': 'In-Transit'
-                        }])
-                        st.session_state['db']['dispatches'] = pd.concat([db['dispatches'], new_dispatch], ignore_index=True)
-                        st.session_state['db']['dispatches'] = st.session_state['db']['dispatches'].reset_index(drop=True)
+                            # Apply to dispatch tracker
+                            append_events(st.session_state['db'], 'dispatches', [{
+                                'DispatchID': next_ids(db, 'dispatches')[0],
+                                'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                'Origin': hub,
+                                'Destination': q_loc,
+                                'Product': q_prod,
+                                'Quantity': q_qty,
+                                'Status': 'In-Transit'
+                            }])
+                            db['feed'].publish('dispatch', Destination=q_loc, Product=q_prod, Quantity=int(q_qty), Status='In-Transit')
                         
-                        st.success(f"Dispatched {q_qty} units of {q_prod} to {q_loc}!")
-                        st.rerun()
-                    else:
-                        st.error(f"Cannot dispatch! Kompally Hub only has {hub_stock} units of {q_prod}.")
+                            st.success(f"Dispatched {q_qty} units of {q_prod} from {hub} to {q_loc}!")
+                            st.rerun()
+                        else:
+                            st.error(f"Cannot dispatch! {hub} only has {hub_stock} units of {q_prod}.")
 
     # TAB 4: Store Requests
-    with tabs[3]:
+    with tabs[3], span('tab', 'admin.requests'):
         st.subheader("Store Supply Requests")
         st.markdown("Review and authorize explicit requests submitted by Store Employees.")
         
         reqs = db['requests']
         if not reqs.empty:
-            st.dataframe(reqs.sort_values(by='Date', ascending=False), width='stretch', hide_index=True)
+            render_paged_table(reqs, key="requests_tbl", sort_by='Date', presorted='Date')
             
             pending = reqs[reqs['Status'] == 'Pending']
             if not pending.empty:
                 st.markdown("### Action Required")
                 
-                pending_copy = pending.copy()
+                # Select by ReqID: compaction renumbers the frame between reruns
+                pending_copy = pending.set_index('ReqID')
                 pending_copy['Display'] = pending_copy.apply(lambda row: f"{row['Store']} requests {row['Quantity']}x {row['Product']}", axis=1)
                 
-                req_idx = st.selectbox("Select Pending Request", pending_copy.index, format_func=lambda i: pending_copy.loc[i, 'Display'])
+                req_id = st.selectbox("Select Pending Request", pending_copy.index, format_func=lambda i: pending_copy.loc[i, 'Display'])
+                req_idx = row_for_id(db, 'requests', req_id)
                 
                 colA, colB = st.columns(2)
                 with colA:
                     if st.button("Approve & Trigger Dispatch", type="primary"):
-                        # Get details
-                        dest = reqs.loc[req_idx, 'Store']
-                        prod = reqs.loc[req_idx, 'Product']
-                        qty = reqs.loc[req_idx, 'Quantity']
+                        with span('action', 'request.approve'):
+                            # Get details
+                            dest = reqs.loc[req_idx, 'Store']
+                            prod = reqs.loc[req_idx, 'Product']
+                            qty = reqs.loc[req_idx, 'Quantity']
                         
-                        # Verify Hub stock
-                        inv = db['inventory']
-                        hub_stock = inv[(inv['Location'] == 'Kompally Hub') & (inv['Product'] == prod)]['Current_Stock'].values[0]
+                            # Verify stock at the store's regional hub
+                            inv = db['inventory']
+                            hub = hub_for_store(db, dest)
+                            hub_stock = inv[(inv['Location'] == hub) & (inv['Product'] == prod)]['Current_Stock'].values[0]
                         
-                        if hub_stock >= qty:
-                            # Update statuses
-                            st.session_state['db']['requests'].loc[req_idx, 'Status'] = 'Approved'
+                            if hub_stock >= qty:
+                                # Update statuses
+                                st.session_state['db']['requests'].loc[req_idx, 'Status'] = 'Approved'
                             
-                            # Deduct from Hub
-                            hub_idx = inv[(inv['Location'] == 'Kompally Hub') & (inv['Product'] == prod)].index[0]
-                            st.session_state['db']['inventory'].at[hub_idx, 'Current_Stock'] -= qty
+                                # Deduct from Hub
+                                move_stock(st.session_state['db'], [('DISPATCH_OUT', hub, prod, -qty)])
                             
-                            # Add to dispatches
-                            new_dispatch = pd.DataFrame([{
-                                'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                                'Destination': dest,
-                                'Product': prod,
-                                'Quantity': qty,
-                                'Status': 'In-Transit'
-                            }])
-                            st.session_state['db']['dispatches'] = pd.concat([db['dispatches'], new_dispatch], ignore_index=True)
+                                # Add to dispatches
+                                append_events(st.session_state['db'], 'dispatches', [{
+                                    'DispatchID': next_ids(db, 'dispatches')[0],
+                                    'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                    'Origin': hub,
+                                    'Destination': dest,
+                                    'Product': prod,
+                                    'Quantity': qty,
+                                    'Status': 'In-Transit'
+                                }])
+                                db['feed'].publish('request', Store=dest, Product=prod, Quantity=int(qty), Status='Approved')
+                                db['feed'].publish('dispatch', Destination=dest, Product=prod, Quantity=int(qty), Status='In-Transit')
                             
-                            st.success(f"Request Approved. Goods have left the warehouse for {dest}.")
-                            st.rerun()
-                        else:
-                            st.error(f"Cannot fulfill request. Hub shortage: Only {hub_stock} units available.")
+                                st.success(f"Request Approved. Goods have left {hub} for {dest}.")
+                                st.rerun()
+                            else:
+                                st.error(f"Cannot fulfill request. {hub} shortage: Only {hub_stock} units available.")
                 with colB:
                     if st.button("Reject Request"):
-                        st.session_state['db']['requests'].loc[req_idx, 'Status'] = 'Rejected'
-                        st.warning("Request has been denied.")
-                        st.rerun()
+                        with span('action', 'request.reject'):
+                            st.session_state['db']['requests'].loc[req_idx, 'Status'] = 'Rejected'
+                            db['feed'].publish('request', Store=reqs.loc[req_idx, 'Store'], Product=reqs.loc[req_idx, 'Product'],
+                                         Quantity=int(reqs.loc[req_idx, 'Quantity']), Status='Rejected')
+                            st.warning("Request has been denied.")
+                            st.rerun()
             else:
                 st.success("All employee requests have been handled.")
         else:
             st.info("No communications from the network.")
 
     # TAB 5: Inter-Store Transfers
-    with tabs[4]:
+    with tabs[4], span('tab', 'admin.transfers'):
         st.subheader("Direct Peer-to-Peer Store Transfers")
         st.markdown("Rebalance inventory directly between retail locations without routing through the central Hub.")
         
+        transfer_options, _ = product_options("inter_store_transfer")
         with st.form("inter_store_transfer"):
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -503,52 +534,99 @@ def render_admin_dashboard():
             with col2:
                 dest_store = st.selectbox("Destination (Receiving Store)", db['stores'], index=1)
             with col3:
-                transfer_prod = st.selectbox("Product", db['products'])
+                transfer_prod = st.selectbox("Product", transfer_options)
                 
             transfer_qty = st.number_input("Quantity to Move", min_value=1, max_value=500, value=10)
             
             if st.form_submit_button("Execute Direct Transfer", type="primary"):
-                if source_store == dest_store:
-                    st.error("Source and Destination cannot be the same.")
-                else:
-                    inv = st.session_state['db']['inventory']
-                    src_idx = inv[(inv['Location'] == source_store) & (inv['Product'] == transfer_prod)].index[0]
-                    src_stock = inv.at[src_idx, 'Current_Stock']
+                with span('action', 'transfer.execute'):
+                    if source_store == dest_store:
+                        st.error("Source and Destination cannot be the same.")
+                    else:
+                        inv = st.session_state['db']['inventory']
+                        src_idx = inv[(inv['Location'] == source_store) & (inv['Product'] == transfer_prod)].index[0]
+                        src_stock = inv.at[src_idx, 'Current_Stock']
                     
-                    if src_stock >= transfer_qty:
-                        # Deduct from Source
-                        st.session_state['db']['inventory'].at[src_idx, 'Current_Stock'] -= transfer_qty
-                        
-                        # Add to Destination
-                        dest_idx = inv[(inv['Location'] == dest_store) & (inv['Product'] == transfer_prod)].index[0]
-                        st.session_state['db']['inventory'].at[dest_idx, 'Current_Stock'] += transfer_qty
+                        if src_stock >= transfer_qty:
+                            # Deduct from Source and add to Destination as one ledger batch
+                            move_stock(st.session_state['db'], [
+                                ('TRANSFER_OUT', source_store, transfer_prod, -transfer_qty),
+                                ('TRANSFER_IN', dest_store, transfer_prod, transfer_qty)
+                            ])
                         
-                        # Add Audit Log
-                        audit_log = pd.DataFrame([{
-                            'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'User': 'admin',
-                            'Action': 'INTER_STORE_TRANSFER',
-                            'Details': f"Moved {transfer_qty}x {transfer_prod} from {source_store} to {dest_store}"
-                        }])
-                        st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                            # Add Audit Log
+                            audit_log = pd.DataFrame([{
+                                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                'User': 'admin',
+                                'Action': 'INTER_STORE_TRANSFER',
+                                'Details': f"Moved {transfer_qty}x {transfer_prod} from {source_store} to {dest_store}"
+                            }])
+                            st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
                         
-                        st.success(f"Transfer Complete! {transfer_qty} units of {transfer_prod} moved from {source_store} to {dest_store}.")
-                        st.rerun()
-                    else:
-                        st.error(f"Transfer Failed. {source_store} only has {src_stock} units of {transfer_prod}.")
+                            st.success(f"Transfer Complete! {transfer_qty} units of {transfer_prod} moved from {source_store} to {dest_store}.")
+                            st.rerun()
+                        else:
+                            st.error(f"Transfer Failed. {source_store} only has {src_stock} units of {transfer_prod}.")
+        
+        st.divider()
+        st.markdown("### Network Rebalancing Planner")
+        st.markdown("Moves surplus stock (above target) to short stores across every store and SKU, matching the nearest stores first.")
+        rb_c1, rb_c2 = st.columns(2)
+        with rb_c1:
+            rb_max_km = st.number_input("Max Transfer Distance (km, 0 = no limit)", min_value=0.0, value=0.0, step=1.0)
+        with rb_c2:
+            rb_min_units = st.number_input("Minimum Units per Line", min_value=1, max_value=100, value=1)
+        
+        if st.button("Plan Network Rebalance"):
+            with span('action', 'rebalance.plan'):
+                st.session_state['rebalance_plan'] = plan_rebalance(db['inventory'], min_units=rb_min_units, max_km=rb_max_km or None)
+        
+        if 'rebalance_plan' in st.session_state:
+            plan, stats = st.session_state['rebalance_plan']
+            if plan.empty:
+                st.success("No transfers needed: no store has surplus that a short store could use.")
+            else:
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Transfer Lines", stats['lines'])
+                m2.metric("Units Moved", f"{stats['units']:,}")
+                m3.metric("Deficit Covered", f"{stats['covered_pct']:.1f}%")
+                m4.metric("Avg Distance / Unit", f"{stats['unit_km'] / stats['units']:.1f} km")
+                render_paged_table(plan, key="rebalance_tbl", sort_by='Distance_km', ascending=True)
+                
+                if st.button("Execute Plan as One Batch", type="primary"):
+                    with span('action', 'rebalance.execute'):
+                        # Stock may have moved since planning: apply all of the plan or none of it
+                        stale = validate_plan(st.session_state['db']['inventory'], plan)
+                        if not stale.empty:
+                            st.error(f"Plan is out of date: {len(stale)} source lines no longer have the stock. Re-plan and try again.")
+                        else:
+                            move_stock(st.session_state['db'], plan_moves(plan))
+                            now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            audit_log = pd.DataFrame({
+                                'Timestamp': now_str,
+                                'User': st.session_state.get('user_username', 'admin'),
+                                'Action': 'REBALANCE_TRANSFER',
+                                'Details': [f"Moved {q}x {p} from {s} to {d} ({km} km)" for s, d, p, q, km in plan.itertuples(index=False)]
+                            })
+                            st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                            del st.session_state['rebalance_plan']
+                            st.success(f"Rebalance complete: {stats['units']:,} units moved across {stats['lines']} lines.")
+                            st.rerun()
                         
     # TAB 6: Supplier & PO Management
-    with tabs[5]:
+    with tabs[5], span('tab', 'admin.procurement'):
         st.subheader("Procurement & Supplier Management")
-        st.markdown("Manage Purchase Orders to restock the central Kompally Hub.")
+        st.markdown("Manage Purchase Orders to restock the regional hubs.")
         
         c_po1, c_po2 = st.columns([1, 2])
         
         with c_po1:
             st.markdown("### Create Purchase Order")
+            po_options, _ = product_options("new_po")
             with st.form("new_po_form"):
                 supplier_name = st.text_input("Supplier/Vendor Name", value="Global Electronics Ltd.")
-                po_prod = st.selectbox("Product Line", db['products'])
+                po_hub = st.selectbox("Receiving Hub", db['hubs']['Hub'].tolist())
+                po_prod = st.selectbox("Product Line", po_options)
                 po_qty = st.number_input("Order Quantity", min_value=50, max_value=10000, value=500, step=50)
                 unit_cost = st.number_input("Wholesale Unit Cost (₹)", min_value=1.0, value=150.0)
                 
@@ -556,19 +634,21 @@ def render_admin_dashboard():
                 st.markdown(f"**Estimated Total:** ₹{total_cost:,.2f}")
                 
                 if st.form_submit_button("Issue PO to Supplier", type="primary"):
-                    new_po_id = f"PO-{np.random.randint(40000, 99999)}"
-                    new_po = pd.DataFrame([{
-                        'PO_ID': new_po_id,
-                        'Date': datetime.now().strftime("%Y-%m-%d"),
-                        'Supplier': supplier_name,
-                        'Product': po_prod,
-                        'Quantity': po_qty,
-                        'TotalCost': total_cost,
-                        'Status': 'Issued'
-                    }])
-                    st.session_state['db']['purchase_orders'] = pd.concat([db['purchase_orders'], new_po], ignore_index=True)
-                    st.success(f"PO {new_po_id} successfully issued to {supplier_name}.")
-                    st.rerun()
+                    with span('action', 'po.issue'):
+                        new_po_id = f"PO-{np.random.randint(40000, 99999)}"
+                        new_po = pd.DataFrame([{
+                            'PO_ID': new_po_id,
+                            'Date': datetime.now().strftime("%Y-%m-%d"),
+                            'Hub': po_hub,
+                            'Supplier': supplier_name,
+                            'Product': po_prod,
+                            'Quantity': po_qty,
+                            'TotalCost': total_cost,
+                            'Status': 'Issued'
+                        }])
+                        st.session_state['db']['purchase_orders'] = pd.concat([db['purchase_orders'], new_po], ignore_index=True)
+                        st.success(f"PO {new_po_id} successfully issued to {supplier_name}.")
+                        st.rerun()
                     
         with c_po2:
             st.markdown("### Active Purchase Orders")
@@ -583,34 +663,34 @@ def render_admin_dashboard():
                     recv_po = st.selectbox("Select PO to Receive", issued_pos['PO_ID'] + " - " + issued_pos['Product'])
                     
                     if st.button("Confirm Goods Received at Hub"):
-                        po_id = recv_po.split(" - ")[0]
-                        idx = pos[pos['PO_ID'] == po_id].index[0]
+                        with span('action', 'po.receive'):
+                            po_id = recv_po.split(" - ")[0]
+                            idx = pos[pos['PO_ID'] == po_id].index[0]
                         
-                        # Update status
-                        st.session_state['db']['purchase_orders'].at[idx, 'Status'] = 'Received'
+                            # Update status
+                            st.session_state['db']['purchase_orders'].at[idx, 'Status'] = 'Received'
                         
-                        # Add to Hub Inventory
-                        prod = pos.loc[idx, 'Product']
-                        qty = pos.loc[idx, 'Quantity']
+                            # Add to the receiving Hub's Inventory
+                            prod = pos.loc[idx, 'Product']
+                            qty = pos.loc[idx, 'Quantity']
+                            hub = pos.loc[idx, 'Hub']
                         
-                        inv = st.session_state['db']['inventory']
-                        hub_idx = inv[(inv['Location'] == 'Kompally Hub') & (inv['Product'] == prod)].index[0]
-                        st.session_state['db']['inventory'].at[hub_idx, 'Current_Stock'] += qty
+                            move_stock(st.session_state['db'], [('PO_RECEIPT', hub, prod, qty)])
                         
-                        st.success(f"Goods received! {qty}x {prod} added to Kompally Hub inventory.")
-                        st.rerun()
+                            st.success(f"Goods received! {qty}x {prod} added to {hub} inventory.")
+                            st.rerun()
             else:
                 st.info("No Purchase Orders currently active.")
 
     # TAB 7: HR Management (Adding Staff & Soft Delete)
-    with tabs[6]:
+    with tabs[6], span('tab', 'admin.hr'):
         st.subheader("Employee Directory & Management")
         employees = db['employees']
         
         c1, c2 = st.columns([2, 1])
         with c1:
             st.markdown("**Active Workforce**")
-            st.dataframe(employees[['EmpID', 'Name', 'Role', 'Store', 'Contact', 'Wage', 'Status']], hide_index=True, width='stretch')
+            render_paged_table(employees, key="employees_tbl", columns=['EmpID', 'Name', 'Role', 'Store', 'Contact', 'Wage', 'Status'], sort_by='EmpID', ascending=True)
         
         with c2:
             st.markdown("**Action Panel**")
@@ -624,15 +704,16 @@ def render_admin_dashboard():
                     n_wage = st.number_input("Base Monthly Wage (₹)", min_value=5000)
                     
                     if st.form_submit_button("Register Staff"):
-                        if n_name and n_user and n_pass:
-                            new_emp_id = f"EMP-{np.random.randint(3000, 9999)}"
-                            new_emp = pd.DataFrame([{
-                                'EmpID': new_emp_id, 'Name': n_name, 'Username': n_user, 'PasswordHash': hash_password(n_pass),
-                                'Contact': f"{n_user}@nexus.com", 'Role': n_role, 'Store': n_store, 'Wage': n_wage, 'Status': 'Active'
-                            }])
-                            st.session_state['db']['employees'] = pd.concat([employees, new_emp], ignore_index=True)
-                            st.success(f"Successfully onboarded {n_name} ({new_emp_id})")
-                            st.rerun()
+                        with span('action', 'hr.onboard'):
+                            if n_name and n_user and n_pass:
+                                new_emp_id = f"EMP-{np.random.randint(3000, 9999)}"
+                                new_emp = pd.DataFrame([{
+                                    'EmpID': new_emp_id, 'Name': n_name, 'Username': n_user, 'PasswordHash': hash_password(n_pass),
+                                    'Contact': f"{n_user}@nexus.com", 'Role': n_role, 'Store': n_store, 'Wage': n_wage, 'Status': 'Active'
+                                }])
+                                st.session_state['db']['employees'] = pd.concat([employees, new_emp], ignore_index=True)
+                                st.success(f"Successfully onboarded {n_name} ({new_emp_id})")
+                                st.rerun()
                             
             with st.expander("🛠️ Update / Soft Delete Staff"):
                 u_emp = st.selectbox("Select Employee", employees['EmpID'] + " - " + employees['Name'])
@@ -642,23 +723,24 @@ def render_admin_dashboard():
                     
                     new_status = st.radio("Account Status", ["Active", "Inactive"], index=0 if emp_rec['Status'] == 'Active' else 1)
                     if st.button("Update Status"):
-                        idx = employees[employees['EmpID'] == sel_id].index[0]
-                        st.session_state['db']['employees'].at[idx, 'Status'] = new_status
+                        with span('action', 'hr.status'):
+                            idx = employees[employees['EmpID'] == sel_id].index[0]
+                            st.session_state['db']['employees'].at[idx, 'Status'] = new_status
                         
-                        # Add audit log
-                        audit_log = pd.DataFrame([{
-                            'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'User': 'admin',
-                            'Action': 'STATUS_CHANGE',
-                            'Details': f"Changed status of {sel_id} to {new_status}"
-                        }])
-                        st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                            # Add audit log
+                            audit_log = pd.DataFrame([{
+                                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                'User': 'admin',
+                                'Action': 'STATUS_CHANGE',
+                                'Details': f"Changed status of {sel_id} to {new_status}"
+                            }])
+                            st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
                         
-                        st.success(f"Status updated to {new_status}")
-                        st.rerun()
+                            st.success(f"Status updated to {new_status}")
+                            st.rerun()
                         
     # TAB 6: Payroll & Audit Tracking
-    with tabs[5]:
+    with tabs[5], span('tab', 'admin.payroll_audit'):
         st.subheader("Salaries & Security Operations")
         
         p_c1, p_c2 = st.columns(2)
@@ -667,22 +749,25 @@ def render_admin_dashboard():
             st.markdown("Calculates total hours/days worked based on Check-In logs.")
             
             att = db['attendance']
-            if not att.empty:
+            if not att.empty or not db['attendance_monthly'].empty:
                 # Merge attendance with employee DB to calculate wages
-                valid_att = att.dropna(subset=['CheckOut']) # Only completed shifts
-                if not valid_att.empty:
-                    # Calculate dummy 'days worked' by group counting
-                    days_worked = valid_att.groupby('EmpID').size().reset_index(name='Days_Worked')
-                    emp_wage = employees[['EmpID', 'Name', 'Role', 'Store', 'Wage']]
-                    
-                    payroll = pd.merge(days_worked, emp_wage, on='EmpID')
-                    # Assume base wage is for 30 days, calculate daily rate
-                    payroll['Calculated_Payout'] = (payroll['Wage'] / 30 * payroll['Days_Worked']).astype(int)
+                payroll = payroll_table(att, employees, db['attendance_monthly'])
+                if not payroll.empty:
+                    render_paged_table(payroll, key="payroll_tbl", sort_by='EmpID', ascending=True)
                     
-                    st.dataframe(payroll[['EmpID', 'Name', 'Role', 'Store', 'Wage', 'Days_Worked', 'Calculated_Payout']], hide_index=True, width='stretch')
+                    if st.button("Generate Payslips for All Employees (PDF)"):
+                        with span('action', 'payroll.payslips'):
+                            period = datetime.now().strftime("%Y-%m")
+                            path = export_path(f"payslips_{period}", 'zip')
+                            bar = st.progress(0.0, text="Rendering payslips...")
+                            for done in write_payslips(payroll, path, period):
+                                bar.progress(done / len(payroll), text=f"Rendered {done:,} of {len(payroll):,} payslips")
+                            st.session_state['payslip_export'] = path
                     
-                    if st.button("Generate Selected Payslip (PDF Mock)"):
-                        st.success("📄 Generating PDF... (Simulated download complete: 'payslip_EMP.pdf')")
+                    if st.session_state.get('payslip_export') and os.path.exists(st.session_state['payslip_export']):
+                        path = st.session_state['payslip_export']
+                        with open(path, 'rb') as f:
+                            st.download_button("⬇️ Download Payslips (.zip)", f, file_name=os.path.basename(path), mime='application/zip')
                 else:
                     st.info("No completed shifts found to calculate payroll.")
             else:
@@ -693,9 +778,231 @@ def render_admin_dashboard():
             st.markdown("Immutable record of manual overrides and sensitive actions.")
             audits = db['audit_logs']
             if not audits.empty:
-                st.dataframe(audits.sort_values(by='Timestamp', ascending=False), hide_index=True, width='stretch')
+                render_paged_table(audits, key="audit_tbl", sort_by='Timestamp')
             else:
                 st.info("No audit logs recorded yet. Manual inventory changes will appear here.")
+        
+        st.divider()
+        st.markdown("### Cash Drawer Reconciliation")
+        st.markdown("Every register shift is matched to the POS sales at its store during the shift. Expected cash is the opening float plus takings, less refunds paid from the drawer.")
+        if not db['shifts'].empty:
+            recon = reconcile(db)
+            summary = variance_summary(recon)
+            r1, r2, r3, r4 = st.columns(4)
+            r1.metric("Closed Shifts", summary['shifts'])
+            r2.metric("Flagged Variances", summary['flagged'])
+            r3.metric("Net Variance", f"₹{summary['net_variance']:,.0f}")
+            r4.metric("Total Shortfall", f"₹{summary['shortfall']:,.0f}")
+            if st.checkbox("Show flagged shifts only", key="recon_flagged"):
+                recon = recon[recon['Flag'].isin(['SHORT', 'OVER'])]
+            render_paged_table(recon.drop(columns=['Status']), key="recon_tbl", sort_by='Date')
+        else:
+            st.info("No register shifts recorded yet.")
+        
+        st.divider()
+        st.markdown("### Report Exports")
+        st.markdown("Reports are written to disk in chunks, so large exports never sit in memory as one file.")
+        ex_c1, ex_c2, ex_c3 = st.columns(3)
+        with ex_c1:
+            report = st.selectbox("Report", ["Sales by Date Range", "Audit Trail", "Payroll", "Dispatches"], key="export_report")
+        with ex_c2:
+            ex_format = st.radio("Format", list(WRITERS), horizontal=True, key="export_format")
+        ex_range = ()
+        with ex_c3:
+            first_sale, last_sale = history_bounds(db)
+            if report == "Sales by Date Range" and first_sale is not None:
+                ex_range = st.date_input("Sales Dates", (first_sale.date(), last_sale.date()), key="export_range")
+        
+        if st.button("Export Report"):
+            with span('action', 'export.report'):
+                if report == "Sales by Date Range":
+                    # A half-picked range exports that single day
+                    start_d, end_d = (tuple(ex_range) * 2)[:2] if ex_range else (None, None)
+                    frame = sales_history(db, start_d, end_d + timedelta(days=1) if end_d else None)
+                elif report == "Audit Trail":
+                    frame = db['audit_logs']
+                elif report == "Payroll":
+                    frame = payroll_table(db['attendance'], db['employees'], db['attendance_monthly'])
+                else:
+                    frame = db['dispatches']
+                writer, ext, mime = WRITERS[ex_format]
+                path = export_path(report.lower().replace(' ', '_'), ext)
+                bar = st.progress(0.0, text="Exporting...")
+                for written in writer(frame, path):
+                    bar.progress(written / len(frame), text=f"Wrote {written:,} of {len(frame):,} rows")
+                bar.progress(1.0, text=f"Exported {len(frame):,} rows")
+                st.session_state['report_export'] = (path, mime)
+        
+        if st.session_state.get('report_export') and os.path.exists(st.session_state['report_export'][0]):
+            path, mime = st.session_state['report_export']
+            with open(path, 'rb') as f:
+                st.download_button(f"⬇️ Download {os.path.basename(path)}", f, file_name=os.path.basename(path), mime=mime)
+
+    # TAB 9: Regional Hubs
+    with tabs[8], span('tab', 'admin.regions'):
+        st.subheader("Regional Hub Network")
+        st.markdown("Each store is served by its nearest hub. Regions are partitioned so each can be served by its own worker process.")
+        
+        hubs = db['hubs'].copy()
+        hubs['Stores'] = hubs['Hub'].map(lambda h: ", ".join(s for s, sh in db['store_hub'].items() if sh == h))
+        st.dataframe(hubs, hide_index=True, width='stretch')
+        
+        # Every tab body runs on each rerun, so the roll-up is only built while it is switched on
+        show_rollup = st.toggle("Show HQ roll-up by region", key="region_rollup")
+        use_workers = show_rollup and st.checkbox("Compute on regional worker processes", key="region_workers")
+        if not use_workers and 'region_cluster' in st.session_state:
+            st.session_state.pop('region_cluster').stop()
+        
+        if show_rollup:
+            if use_workers:
+                cluster = st.session_state.get('region_cluster')
+                if cluster is None:
+                    cluster = st.session_state['region_cluster'] = RegionCluster(db)
+                else:
+                    # Workers keep their partition resident; only rows changed since the last sync are sent
+                    sent = cluster.sync(db)
+                    st.caption(f"Sent {sent:,} changed rows to the regional workers.")
+                summaries = cluster.summaries()
+            else:
+                summaries = [region_summary(part) for part in partition_by_region(db).values()]
+            
+            overview, by_product, stock = aggregate_hq(summaries)
+            st.markdown("**HQ Roll-up by Region**")
+            st.dataframe(overview, hide_index=True, width='stretch')
+            
+            r_c1, r_c2 = st.columns(2)
+            with r_c1:
+                st.markdown("**Network Sales by Product**")
+                st.dataframe(by_product, width='stretch')
+            with r_c2:
+                st.markdown("**Network Stock by Product**")
+                st.dataframe(stock, width='stretch')
+
+    # TAB 10: Stock Ledger
+    with tabs[9], span('tab', 'admin.stock_ledger'):
+        st.subheader("Stock Movement Ledger")
+        st.markdown("Every stock movement is recorded as a typed event. Current_Stock is maintained from this ledger.")
+        
+        ledger = db['ledger']
+        inv = db['inventory']
+        # Cheap O(lines) check against the materialized view; the full replay runs only on rebuild
+        drift = int((ledger.levels_for(inv['Location'], inv['Product']) != inv['Current_Stock'].to_numpy()).sum())
+        
+        l_c1, l_c2, l_c3 = st.columns(3)
+        l_c1.metric("Recorded Movements", len(ledger))
+        l_c2.metric("Checkpoints", ledger.checkpoints)
+        l_c3.metric("Lines Drifted from Ledger", drift)
+        
+        if drift:
+            st.error(f"{drift} inventory lines no longer match the stock ledger.")
+            if st.button("Rebuild Current_Stock from Ledger", type="primary"):
+                with span('action', 'ledger.rebuild'):
+                    ledger.stock = ledger.replay()
+                    st.session_state['db']['inventory']['Current_Stock'] = ledger.levels_for(inv['Location'], inv['Product'])
+                    audit_log = pd.DataFrame([{
+                        'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        'User': 'admin',
+                        'Action': 'LEDGER_REBUILD',
+                        'Details': f"Rebuilt {drift} inventory lines from {len(ledger)} ledger events"
+                    }])
+                    st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                    st.rerun()
+        
+        st.markdown("### Point-in-Time Stock")
+        pit_c1, pit_c2, pit_c3, pit_c4 = st.columns(4)
+        with pit_c1:
+            pit_loc = st.selectbox("Location", ledger.locations, key="pit_loc")
+        with pit_c2:
+            pit_prod = st.selectbox("Product", ledger.products, key="pit_prod")
+        with pit_c3:
+            pit_date = st.date_input("As of Date", datetime.now().date(), key="pit_date")
+        with pit_c4:
+            pit_time = st.time_input("As of Time", datetime.now().time(), key="pit_time")
+        
+        as_of = datetime.combine(pit_date, pit_time)
+        pit_level = ledger.level_at(pit_loc, pit_prod, as_of)
+        if pit_level is None:
+            st.info(f"No ledger data before {ledger.start:%Y-%m-%d %H:%M}. Movements are recorded from when this session loaded its data.")
+        else:
+            st.metric(f"{pit_prod} at {pit_loc} as of {as_of:%Y-%m-%d %H:%M}", pit_level)
+        
+        st.markdown("**Movement History**")
+        history = ledger.events(pit_loc, pit_prod)
+        if not history.empty:
+            render_paged_table(history, key="ledger_tbl", sort_by='Timestamp', presorted='Timestamp')
+        else:
+            st.info("No movements recorded for this line since the data was loaded.")
+
+    # TAB 11: Data Retention
+    with tabs[10], span('tab', 'admin.retention'):
+        st.subheader("Data Retention & Compaction")
+        st.markdown("Old sales are compacted into daily aggregates, handled requests and delivered dispatches are archived to compressed files on disk, and attendance is rolled into monthly summaries.")
+        
+        retention = db['retention']
+        policy = retention.policy
+        sizes = table_bytes(db)
+        used_mb = sum(sizes.values()) / 1024 / 1024
+        
+        rt_c1, rt_c2, rt_c3, rt_c4 = st.columns(4)
+        rt_c1.metric("Table Memory", f"{used_mb:,.1f} MB", f"budget {policy.budget_mb:,.0f} MB", delta_color="off")
+        rt_c2.metric("Raw Sales Rows", f"{len(db['sales']):,}")
+        rt_c3.metric("Daily Aggregate Rows", f"{len(db['sales_daily']):,}")
+        rt_c4.metric("Archived Rows", f"{sum(seg['Rows'] for seg in retention.segments):,}")
+        budget_used = used_mb / policy.budget_mb if policy.budget_mb > 0 else 1.0
+        st.progress(min(1.0, budget_used), text=f"{budget_used:.0%} of memory budget")
+        
+        rt_l, rt_r = st.columns(2)
+        with rt_l:
+            st.markdown("**Retention Policy**")
+            with st.form("retention_policy"):
+                sales_days = st.number_input("Keep raw sales (days)", min_value=policy.min_days, value=policy.sales_days)
+                archive_days = st.number_input("Keep handled requests & delivered dispatches (days)", min_value=policy.min_days, value=policy.archive_days)
+                attendance_days = st.number_input("Keep daily attendance (days)", min_value=policy.min_days, value=policy.attendance_days)
+                audit_days = st.number_input("Keep audit entries (days)", min_value=policy.min_days, value=policy.audit_days)
+                budget_mb = st.number_input("Memory budget (MB)", min_value=64.0, value=max(64.0, float(policy.budget_mb)), step=64.0)
+                if st.form_submit_button("Save Policy"):
+                    retention.policy = replace(policy, sales_days=int(sales_days), archive_days=int(archive_days),
+                                               attendance_days=int(attendance_days), audit_days=int(audit_days), budget_mb=budget_mb)
+                    st.success("Retention policy updated. It applies on the next compaction.")
+        with rt_r:
+            st.markdown("**Memory by Table**")
+            usage = pd.DataFrame([{'Table': name, 'Rows': len(db[name]), 'MB': round(b / 1024 / 1024, 2)} for name, b in sizes.items()])
+            st.dataframe(usage.sort_values('MB', ascending=False), hide_index=True, width='stretch')
+            if st.button("Run Compaction Now", type="primary"):
+                with span('action', 'retention.compact'):
+                    report = compact(db, reason='manual (admin)')
+                st.success(f"Compacted {report['Rows_Compacted']:,} rows: {report['MB_Before']} MB → {report['MB_After']} MB in {report['Seconds']}s.")
+                st.rerun()
+        
+        st.markdown("**Recent Compactions**")
+        if retention.history:
+            st.dataframe(pd.DataFrame(list(retention.history)), hide_index=True, width='stretch')
+        else:
+            st.info("No compaction has run in this session yet. It runs automatically when tables exceed the memory budget.")
+        
+        st.markdown("**Archive Segments**")
+        if retention.segments:
+            segs = retention.segments
+            st.dataframe(pd.DataFrame(segs).drop(columns=['Path']), hide_index=True, width='stretch')
+            # Nothing is read from disk until a segment is opened, and then only the page on screen
+            seg_no = st.selectbox("Archived segment", range(len(segs)), key="archive_segment",
+                                  format_func=lambda i: f"#{i} {segs[i]['Table']}: {segs[i]['Rows']:,} rows, {segs[i]['From']} to {segs[i]['To']}")
+            if st.button("Open Segment"):
+                st.session_state['archive_open'] = seg_no
+                st.session_state['archive_page'] = 1
+            opened = st.session_state.get('archive_open')
+            if opened is not None and opened < len(segs):
+                seg = segs[opened]
+                if os.path.exists(seg['Path']):
+                    n_pages = max(1, -(-seg['Rows'] // ARCHIVE_PAGE_ROWS))
+                    page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="archive_page")
+                    lo = (page - 1) * ARCHIVE_PAGE_ROWS
+                    st.dataframe(read_archive_rows(seg['Path'], lo, lo + ARCHIVE_PAGE_ROWS), hide_index=True, width='stretch')
+                    st.caption(f"Segment #{opened} ({seg['Table']}): rows {lo + 1}–{min(lo + ARCHIVE_PAGE_ROWS, seg['Rows'])} of {seg['Rows']:,} · page {page} of {n_pages}")
+                else:
+                    st.warning(f"Segment #{opened} is no longer on disk.")
+        else:
+            st.info("Nothing archived yet.")
 
 
 def render_employee_dashboard():
@@ -707,7 +1014,7 @@ def render_employee_dashboard():
     tabs = st.tabs(["📦 Local Inventory Tracker", "🛒 Daily Sales Input", "📤 RequestHQ Supplies", "⏱️ Attendance & Shifts"])
     
     # TAB 1: Local Inventory
-    with tabs[0]:
+    with tabs[0], span('tab', 'employee.inventory'):
         st.subheader("Your Real-time Floor Inventory")
         inv = db['inventory']
         my_inv = inv[inv['Location'] == my_store][['Product', 'Current_Stock', 'Target_Stock']].copy()
@@ -723,19 +1030,24 @@ def render_employee_dashboard():
             st.warning("⚠️ High Deficit Found. Switch to the 'RequestHQ Supplies' tab to restock.")
                 
     # TAB 2: Sales Updates & POS
-    with tabs[1]:
+    with tabs[1], span('tab', 'employee.pos'):
         st.subheader("Point of Sale (POS) & Checkout")
         st.markdown("Process transactions, handle returns, and document damaged goods.")
         
         # Mock Barcode Scanner integration
         st.markdown("### 🛒 Rapid Checkout")
-        mock_barcode = st.text_input("Scan Barcode (Enter Product Name to mock)", key="barcode_input")
-        default_prod = db['products'].index(mock_barcode) if mock_barcode in db['products'] else 0
+        catalog = db['catalog']
+        mock_barcode = st.text_input("Scan Barcode (EAN-13, SKU or exact product name)", key="barcode_input")
+        scanned_row = catalog.scan(mock_barcode) if mock_barcode else None
+        if mock_barcode and scanned_row is None:
+            st.warning(f"Barcode {mock_barcode} is not in the catalog.")
+        scanned = catalog.names[scanned_row] if scanned_row is not None else None
+        pos_options, default_prod = product_options("sales_entry", default=scanned)
         
         with st.form("sales_entry"):
             col1, col2 = st.columns([2, 1])
             with col1:
-                prod_sold = st.selectbox("Select or verify scanned product line", db['products'], index=default_prod)
+                prod_sold = st.selectbox("Select or verify scanned product line", pos_options, index=default_prod)
             with col2:
                 tx_type = st.selectbox("Transaction Type", ["Sale", "Return / Refund", "Damaged / Broken goods"])
                 
@@ -745,113 +1057,123 @@ def render_employee_dashboard():
             offline_mode = st.checkbox("Simulate Offline Mode (Network Outage)")
             
             if st.form_submit_button("Submit Transaction", type="primary"):
-                # Evaluate available local stock
-                inv = st.session_state['db']['inventory']
-                inv_idx = inv[(inv['Location'] == my_store) & (inv['Product'] == prod_sold)].index[0]
-                current = inv.at[inv_idx, 'Current_Stock']
-                
-                # Handling Sales
-                if tx_type == "Sale":
-                    if current >= qty_sold:
-                        # Deduct from local inventory
-                        st.session_state['db']['inventory'].at[inv_idx, 'Current_Stock'] -= qty_sold
+                with span('action', 'pos.transaction'):
+                    # Evaluate available local stock
+                    inv = st.session_state['db']['inventory']
+                    inv_idx = inv[(inv['Location'] == my_store) & (inv['Product'] == prod_sold)].index[0]
+                    current = inv.at[inv_idx, 'Current_Stock']
+                
+                    # Handling Sales
+                    if tx_type == "Sale":
+                        if current >= qty_sold:
+                            # Deduct from local inventory
+                            move_stock(st.session_state['db'], [('SALE', my_store, prod_sold, -qty_sold)])
                         
-                        tx_record = {
-                            'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                            'Location': my_store,
-                            'Product': prod_sold,
-                            'Quantity': qty_sold,
-                            'Revenue': qty_sold * db['products_info'].get(prod_sold, 0),
-                            'Status': 'Cached' if offline_mode else 'Synced'
-                        }
+                            tx_record = {
+                                'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                'Location': my_store,
+                                'Product': prod_sold,
+                                'Quantity': qty_sold,
+                                'Revenue': qty_sold * catalog.price(prod_sold),
+                                'Status': 'Cached' if offline_mode else 'Synced'
+                            }
                         
-                        if offline_mode:
-                            if 'offline_cache' not in st.session_state:
-                                st.session_state['offline_cache'] = []
-                            st.session_state['offline_cache'].append(tx_record)
-                            st.warning(f"Network Offline. Sale of {qty_sold}x {prod_sold} cached locally.")
+                            if offline_mode:
+                                if 'offline_cache' not in st.session_state:
+                                    st.session_state['offline_cache'] = []
+                                st.session_state['offline_cache'].append(tx_record)
+                                st.warning(f"Network Offline. Sale of {qty_sold}x {prod_sold} cached locally.")
+                            else:
+                                record_sales(st.session_state['db'], [tx_record])
+                                st.success(f"Sale successful. {qty_sold}x {prod_sold} removed from local stock.")
+                            st.rerun()
                         else:
-                            new_log = pd.DataFrame([tx_record])
-                            st.session_state['db']['sales'] = pd.concat([new_log, st.session_state['db']['sales']], ignore_index=True)
-                            st.success(f"Sale successful. {qty_sold}x {prod_sold} removed from local stock.")
-                        st.rerun()
-                    else:
-                        st.error(f"Transaction Error: You only have {current} units of {prod_sold} on shelves.")
+                            st.error(f"Transaction Error: You only have {current} units of {prod_sold} on shelves.")
                 
-                # Handling Returns & Damages
-                else:
-                    if tx_type == "Return / Refund":
-                        # Add back to inventory for a return
-                        st.session_state['db']['inventory'].at[inv_idx, 'Current_Stock'] += qty_sold
-                        st.success(f"Return Processed! {qty_sold}x {prod_sold} successfully restocked.")
-                    elif tx_type == "Damaged / Broken goods":
-                        # Deduct from inventory since it's un-sellable
-                        if current >= qty_sold:
-                            st.session_state['db']['inventory'].at[inv_idx, 'Current_Stock'] -= qty_sold
-                            st.warning(f"Shrinkage logged. {qty_sold}x {prod_sold} removed due to damage.")
-                        else:
-                            st.error(f"Cannot log {qty_sold} damages, only {current} exist in system.")
-                            st.stop()
+                    # Handling Returns & Damages
+                    else:
+                        if tx_type == "Return / Refund":
+                            # Add back to inventory for a return
+                            move_stock(st.session_state['db'], [('RETURN', my_store, prod_sold, qty_sold)])
+                            # The refund leaves the cash drawer, so shift reconciliation has to see it
+                            refund = pd.DataFrame([{
+                                'Date': datetime.now().strftime("%Y-%m-%d %H:%M"), 'Location': my_store, 'Product': prod_sold,
+                                'Quantity': qty_sold, 'Amount': qty_sold * st.session_state['db']['catalog'].price(prod_sold)
+                            }])
+                            st.session_state['db']['refunds'] = pd.concat([st.session_state['db']['refunds'], refund], ignore_index=True)
+                            st.success(f"Return Processed! {qty_sold}x {prod_sold} successfully restocked.")
+                        elif tx_type == "Damaged / Broken goods":
+                            # Deduct from inventory since it's un-sellable
+                            if current >= qty_sold:
+                                move_stock(st.session_state['db'], [('DAMAGE', my_store, prod_sold, -qty_sold)])
+                                st.warning(f"Shrinkage logged. {qty_sold}x {prod_sold} removed due to damage.")
+                            else:
+                                st.error(f"Cannot log {qty_sold} damages, only {current} exist in system.")
+                                st.stop()
                             
-                    # Audit Trail for returns/damages
-                    audit_log = pd.DataFrame([{
-                        'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        'User': st.session_state.get('user_username', 'employee'),
-                        'Action': 'POS_EXCEPTION',
-                        'Details': f"{tx_type}: {qty_sold}x {prod_sold} at {my_store}"
-                    }])
-                    st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
-                    st.rerun()
+                        # Audit Trail for returns/damages
+                        audit_log = pd.DataFrame([{
+                            'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'User': st.session_state.get('user_username', 'employee'),
+                            'Action': 'POS_EXCEPTION',
+                            'Details': f"{tx_type}: {qty_sold}x {prod_sold} at {my_store}"
+                        }])
+                        st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                        st.rerun()
                     
         # Offline Cache Sync Interface
         if 'offline_cache' in st.session_state and len(st.session_state['offline_cache']) > 0:
             st.warning(f"🔌 Connection Restored? You have {len(st.session_state['offline_cache'])} unsynced transactions.")
             if st.button("Sync Cached Data to HQ"):
-                cached_df = pd.DataFrame(st.session_state['offline_cache'])
-                cached_df['Status'] = 'Synced'
-                st.session_state['db']['sales'] = pd.concat([cached_df, st.session_state['db']['sales']], ignore_index=True)
-                st.session_state['offline_cache'] = [] # Clear out cache
-                st.success("All offline transactions successfully synced with HQ database!")
-                st.rerun()
+                with span('action', 'pos.sync'):
+                    cached_df = pd.DataFrame(st.session_state['offline_cache'])
+                    cached_df['Status'] = 'Synced'
+                    record_sales(st.session_state['db'], cached_df)
+                    st.session_state['offline_cache'] = [] # Clear out cache
+                    st.success("All offline transactions successfully synced with HQ database!")
+                    st.rerun()
                 
         st.markdown("**Your Recent Store Sales**")
         my_sales = db['sales'][db['sales']['Location'] == my_store]
         if not my_sales.empty:
-            st.dataframe(my_sales.head(10), width='stretch', hide_index=True)
+            st.dataframe(latest(my_sales, 10), width='stretch', hide_index=True)
         else:
             st.info("No recorded sales for this shift yet.")
 
     # TAB 3: Request Supplies
-    with tabs[2]:
+    with tabs[2], span('tab', 'employee.requests'):
         st.subheader("Internal Supply Chain Requisition")
-        st.markdown("Notify the Admin Hub of critical stock shortages.")
+        st.markdown(f"Notify your regional hub ({hub_for_store(db, my_store)}) of critical stock shortages.")
         
+        req_options, _ = product_options("supply_request")
         with st.form("supply_request"):
-            req_prod = st.selectbox("Product Line", db['products'])
+            req_prod = st.selectbox("Product Line", req_options)
             req_qty = st.number_input("Requested Volume", min_value=1, max_value=2000, value=25)
             
             if st.form_submit_button("Submit Fulfillment Order"):
-                new_req = pd.DataFrame([{
-                    'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                    'Store': my_store,
-                    'Product': req_prod,
-                    'Quantity': req_qty,
-                    'Status': 'Pending'
-                }])
-                st.session_state['db']['requests'] = pd.concat([new_req, st.session_state['db']['requests']], ignore_index=True)
-                
-                st.success(f"Digital requisition filed! Awaiting Hub approval for {req_qty} units.")
-                st.rerun()
+                with span('action', 'request.submit'):
+                    append_events(st.session_state['db'], 'requests', [{
+                        'ReqID': next_ids(db, 'requests')[0],
+                        'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                        'Store': my_store,
+                        'Product': req_prod,
+                        'Quantity': req_qty,
+                        'Status': 'Pending'
+                    }])
+                    db['feed'].publish('request', Store=my_store, Product=req_prod, Quantity=int(req_qty), Status='Pending')
+                
+                    st.success(f"Digital requisition filed! Awaiting {hub_for_store(db, my_store)} approval for {req_qty} units.")
+                    st.rerun()
         
         st.markdown("**Your Pending and History Requests**")
         my_reqs = db['requests'][db['requests']['Store'] == my_store]
         if not my_reqs.empty:
-            st.dataframe(my_reqs, width='stretch', hide_index=True)
+            st.dataframe(latest(my_reqs), width='stretch', hide_index=True)
         else:
             st.info("You haven't requested any items recently.")
             
     # TAB 4: Attendance & Shifts
-    with tabs[3]:
+    with tabs[3], span('tab', 'employee.attendance'):
         st.subheader("Shift Management & Time Tracking")
         
         # Determine Current Logged In Employee ID
@@ -877,20 +1199,24 @@ def render_employee_dashboard():
                 
                 if today_att.empty:
                     if st.button("⏰ Check In for the Day", type="primary"):
-                        new_att = pd.DataFrame([{
-                            'EmpID': my_emp_id, 'Date': today_str, 
-                            'CheckIn': datetime.now().strftime("%H:%M:%S"), 'CheckOut': None
-                        }])
-                        st.session_state['db']['attendance'] = pd.concat([att, new_att], ignore_index=True)
-                        st.success("Successfully Checked In! Have a great shift.")
-                        st.rerun()
+                        with span('action', 'attendance.check_in'):
+                            new_att = pd.DataFrame([{
+                                'EmpID': my_emp_id, 'Date': today_str, 
+                                'CheckIn': datetime.now().strftime("%H:%M:%S"), 'CheckOut': None
+                            }])
+                            st.session_state['db']['attendance'] = pd.concat([att, new_att], ignore_index=True)
+                            db['feed'].publish('attendance', EmpID=my_emp_id, Store=my_store, Event='CheckIn')
+                            st.success("Successfully Checked In! Have a great shift.")
+                            st.rerun()
                 elif pd.isna(today_att.iloc[0]['CheckOut']):
                     st.success(f"Checked In at {today_att.iloc[0]['CheckIn']}")
                     if st.button("🚪 Check Out"):
-                        idx = att[(att['EmpID'] == my_emp_id) & (att['Date'] == today_str)].index[0]
-                        st.session_state['db']['attendance'].at[idx, 'CheckOut'] = datetime.now().strftime("%H:%M:%S")
-                        st.success("Successfully Checked Out. See you tomorrow!")
-                        st.rerun()
+                        with span('action', 'attendance.check_out'):
+                            idx = att[(att['EmpID'] == my_emp_id) & (att['Date'] == today_str)].index[0]
+                            st.session_state['db']['attendance'].at[idx, 'CheckOut'] = datetime.now().strftime("%H:%M:%S")
+                            db['feed'].publish('attendance', EmpID=my_emp_id, Store=my_store, Event='CheckOut')
+                            st.success("Successfully Checked Out. See you tomorrow!")
+                            st.rerun()
                 else:
                     st.info(f"Shift Completed. Checked In: {today_att.iloc[0]['CheckIn']} | Checked Out: {today_att.iloc[0]['CheckOut']}")
                     
@@ -902,18 +1228,25 @@ def render_employee_dashboard():
                 active_shift = shifts[(shifts['EmpID'] == my_emp_id) & (shifts['Status'] == 'Active')]
                 
                 if active_shift.empty:
+                    my_closed = shifts[(shifts['EmpID'] == my_emp_id) & (shifts['Status'] == 'Completed')]
+                    if not my_closed.empty:
+                        last = reconcile(db, my_closed.tail(1)).iloc[0]
+                        msg = (f"Last shift {last['ShiftID']}: expected ₹{last['Expected_Cash']:,.2f} "
+                               f"({last['Sales']} sales), counted ₹{last['EndCash']:,.2f}, variance ₹{last['Variance']:,.2f}")
+                        (st.success if last['Flag'] == 'OK' else st.warning)(msg)
                     with st.form("start_shift"):
                         start_cash = st.number_input("Starting Register Cash (₹)", min_value=0.0, value=5000.0)
                         if st.form_submit_button("Start Register Shift"):
-                            new_shift = pd.DataFrame([{
-                                'ShiftID': f"SHF-{np.random.randint(1000,9999)}",
-                                'EmpID': my_emp_id, 'Store': my_store, 
-                                'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                                'StartCash': start_cash, 'EndCash': None, 'Status': 'Active'
-                            }])
-                            st.session_state['db']['shifts'] = pd.concat([shifts, new_shift], ignore_index=True)
-                            st.success("Cash Register Shift Started.")
-                            st.rerun()
+                            with span('action', 'shift.start'):
+                                new_shift = pd.DataFrame([{
+                                    'ShiftID': f"SHF-{np.random.randint(1000,9999)}",
+                                    'EmpID': my_emp_id, 'Store': my_store, 
+                                    'Date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                    'EndTime': None, 'StartCash': start_cash, 'EndCash': None, 'Status': 'Active'
+                                }])
+                                st.session_state['db']['shifts'] = pd.concat([shifts, new_shift], ignore_index=True)
+                                st.success("Cash Register Shift Started.")
+                                st.rerun()
                 else:
                     shift_id = active_shift.iloc[0]['ShiftID']
                     st.info(f"Active Shift: {shift_id} | Started with: ₹{active_shift.iloc[0]['StartCash']}")
@@ -921,11 +1254,24 @@ def render_employee_dashboard():
                     with st.form("end_shift"):
                         end_cash = st.number_input("Ending Register Cash (₹)", min_value=0.0, value=float(active_shift.iloc[0]['StartCash']))
                         if st.form_submit_button("End Register Shift"):
-                            idx = shifts[shifts['ShiftID'] == shift_id].index[0]
-                            st.session_state['db']['shifts'].at[idx, 'EndCash'] = end_cash
-                            st.session_state['db']['shifts'].at[idx, 'Status'] = 'Completed'
-                            st.success(f"Shift Ended. Cash differential recorded.")
-                            st.rerun()
+                            with span('action', 'shift.end'):
+                                idx = shifts[shifts['ShiftID'] == shift_id].index[0]
+                                st.session_state['db']['shifts'].at[idx, 'EndTime'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+                                st.session_state['db']['shifts'].at[idx, 'EndCash'] = end_cash
+                                st.session_state['db']['shifts'].at[idx, 'Status'] = 'Completed'
+                                
+                                # Blind count: the expected figure is only revealed after the drawer is counted
+                                result = reconcile(db, st.session_state['db']['shifts'].loc[[idx]]).iloc[0]
+                                if result['Flag'] != 'OK':
+                                    audit_log = pd.DataFrame([{
+                                        'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                        'User': safe_user,
+                                        'Action': 'CASH_VARIANCE',
+                                        'Details': f"{shift_id} at {my_store}: {result['Flag']} ₹{result['Variance']:,.2f} (expected ₹{result['Expected_Cash']:,.2f}, counted ₹{end_cash:,.2f})"
+                                    }])
+                                    st.session_state['db']['audit_logs'] = pd.concat([st.session_state['db']['audit_logs'], audit_log], ignore_index=True)
+                                st.success(f"Shift Ended. Cash differential: ₹{result['Variance']:,.2f}")
+                                st.rerun()
                             
             st.markdown("### Your Logged Records")
             st.dataframe(att[att['EmpID'] == my_emp_id].tail(5), hide_index=True, width='stretch')
@@ -946,18 +1292,19 @@ def main():
                 submit = st.form_submit_button("Login")
                 
                 if submit:
-                    is_valid, role, store = login_user(username, password)
-                    if is_valid:
-                        st.session_state['auth_status'] = True
-                        st.session_state['user_role'] = role
-                        st.session_state['user_store'] = store
-                        st.session_state['user_username'] = username
-                        st.success(f"Access granted: {role}. Preparing dashboard...")
-                        # Give the success message half a second to show up
-                        time.sleep(0.5) 
-                        st.rerun()
-                    else:
-                        st.error("Authentication rejected. Integrity check failed.")
+                    with span('action', 'auth.login'):
+                        is_valid, role, store = login_user(username, password)
+                        if is_valid:
+                            st.session_state['auth_status'] = True
+                            st.session_state['user_role'] = role
+                            st.session_state['user_store'] = store
+                            st.session_state['user_username'] = username
+                            st.success(f"Access granted: {role}. Preparing dashboard...")
+                            # Give the success message half a second to show up
+                            time.sleep(0.5) 
+                            st.rerun()
+                        else:
+                            st.error("Authentication rejected. Integrity check failed.")
             
             st.info("""
             **Demo Credentials:**
@@ -974,12 +1321,19 @@ def main():
         st.markdown(f"**Assigned Sector:** {st.session_state['user_store']}")
         st.divider()
         if st.button("Log Off Securely"):
-            # Instead of completely wiping dict (which resets the demo data), 
-            # we just log the user out so data persists across log-ins during the session.
-            st.session_state['auth_status'] = False
-            st.session_state['user_role'] = None
-            st.session_state['user_store'] = None
-            st.rerun()
+            with span('action', 'auth.logoff'):
+                # Instead of completely wiping dict (which resets the demo data), 
+                # we just log the user out so data persists across log-ins during the session.
+                st.session_state['auth_status'] = False
+                if 'live_sub_name' in st.session_state:
+                    st.session_state['db']['feed'].unsubscribe(st.session_state.pop('live_sub_name'))
+                    st.session_state.pop('live_sub', None)
+                    st.session_state.pop('live_agg', None)
+                if 'region_cluster' in st.session_state:
+                    st.session_state.pop('region_cluster').stop()
+                st.session_state['user_role'] = None
+                st.session_state['user_store'] = None
+                st.rerun()
 
     st.markdown("<div class='main-header'>Hyderabad Logistics Operations Center</div>", unsafe_allow_html=True)
     st.divider()
@@ -992,5 +1346,12 @@ def main():
     elif st.session_state['user_role'] == 'Employee':
         render_employee_dashboard()
 
+# Worker processes re-import this script as __mp_main__, so only a real run sets up the page and loads data
 if __name__ == "__main__":
-    main()
+    configure_page()
+    init_session()
+    start_server()
+    with rerun_span(st.session_state.get('user_role') or 'Anonymous'):
+        main()
+    enforce_budget(st.session_state['db'])
+    record_table_gauges(st.session_state['db'])
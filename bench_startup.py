@@ -0,0 +1,34 @@
+# Measure cold time-to-first-render for the login page and the POS view
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Runs in a fresh interpreter so every sample pays the full cold-start cost
+CHILD = r'''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t0 = time.perf_counter(); at.run(); login = time.perf_counter() - t0
+
+at.text_input[0].input("employee"); at.text_input[1].input("emp123")
+at.button[0].click(); at.run()  # login submit, includes the 0.5 s splash
+t0 = time.perf_counter(); at.run(); pos = time.perf_counter() - t0
+print(json.dumps({"login": login, "pos": pos}))
+'''
+
+def run_bench(samples=5):
+    runs = []
+    for _ in range(samples):
+        out = subprocess.run([sys.executable, "-c", CHILD, APP], capture_output=True, text=True, cwd=os.path.dirname(APP))
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for view in ("login", "pos"):
+        times = [r[view] * 1000 for r in runs]
+        print(f"{view:>5}: median {statistics.median(times):.0f} ms (min {min(times):.0f}, max {max(times):.0f}) over {samples} cold starts")
+
+if __name__ == "__main__":
+    run_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
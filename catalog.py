@@ -0,0 +1,136 @@
+"""Product catalog: SKUs, barcodes, categories and prices with fast lookups.
+
+Barcode, SKU and name lookups are single dict probes. Product pickers search a
+sorted array of lower-cased keys (every word-suffix of a name, the SKU and
+the barcode) with two ``searchsorted`` calls, so a prefix query costs
+O(log n + k) however large the catalog grows. Prices sit in a float64 array
+aligned with the catalog rows, so pricing a batch of lines is one gather.
+
+Run ``python catalog.py [n]`` to time scans and searches on a synthetic
+catalog of ``n`` SKUs (default 200,000).
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PICKER_LIMIT = 50
+# Sorts after every real character, so [q, q + _MAX_CHAR) spans all keys starting with q
+_MAX_CHAR = '\U0010ffff'
+
+
+def ean13(numbers):
+    """EAN-13 barcodes for 12-digit integers (check digit appended)."""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    digits = (numbers[:, None] // 10 ** np.arange(11, -1, -1)) % 10
+    check = (10 - (digits * np.tile([1, 3], 6)).sum(axis=1) % 10) % 10
+    return [f"{n:012d}{c}" for n, c in zip(numbers, check)]
+
+
+def build_catalog_frame(products, prices, categories, first_code=890123400001):
+    n = len(products)
+    return pd.DataFrame({
+        'SKU': [f"SKU-{i:06d}" for i in range(1, n + 1)],
+        'Barcode': ean13(first_code + np.arange(n)),
+        'Product': list(products),
+        'Category': list(categories),
+        'Price': np.asarray(prices, dtype=np.float64),
+    })
+
+
+def synthetic_catalog(n, seed=7):
+    """A large random catalog for benchmarking."""
+    rng = np.random.default_rng(seed)
+    brands = np.array(['Apex', 'Nova', 'Zen', 'Orbit', 'Lotus', 'Vega', 'Kite', 'Delta'])
+    items = np.array(['Phone', 'TV', 'Milk', 'Rice', 'Detergent', 'Shirt', 'Soap', 'Oil', 'Tea', 'Lamp'])
+    categories = np.array(['Electronics', 'Dairy', 'Staples', 'Household', 'Apparel'])
+    b, i = rng.integers(0, len(brands), n), rng.integers(0, len(items), n)
+    names = [f"{brands[x]} {items[y]} {k}" for k, (x, y) in enumerate(zip(b, i))]
+    prices = rng.integers(20, 80000, n).astype(np.float64)
+    return build_catalog_frame(names, prices, categories[rng.integers(0, len(categories), n)])
+
+
+class Catalog:
+    """Row-aligned catalog arrays plus hash and prefix indexes."""
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.names = self.frame['Product'].to_numpy(dtype=object)
+        self.skus = self.frame['SKU'].to_numpy(dtype=object)
+        self.barcodes = self.frame['Barcode'].astype(str).to_numpy(dtype=object)
+        self.prices = self.frame['Price'].to_numpy(dtype=np.float64)
+        rows = range(len(self.frame))
+        self.row_of_barcode = dict(zip(self.barcodes, rows))
+        self.row_of_sku = dict(zip(self.skus, rows))
+        self.row_of_name = dict(zip(self.names, rows))
+        self._build_search_index()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build_search_index(self):
+        keys, rows = [], []
+        for row, (name, sku, code) in enumerate(zip(self.names, self.skus, self.barcodes)):
+            words = name.lower().split()
+            # Word suffixes let "tv" find "Samsung TV" as well as "TV Stand"
+            for i in range(len(words)):
+                keys.append(' '.join(words[i:]))
+                rows.append(row)
+            keys += [sku.lower(), code]
+            rows += [row, row]
+        # Python's sort beats argsort on object arrays of str
+        order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+        self._keys = np.array(keys, dtype=object)[order]
+        self._key_rows = np.asarray(rows, dtype=np.int64)[order]
+
+    def scan(self, code):
+        """Row for a scanned barcode, SKU or exact product name, else None."""
+        code = code.strip()
+        for index in (self.row_of_barcode, self.row_of_sku, self.row_of_name):
+            row = index.get(code)
+            if row is not None:
+                return row
+        return None
+
+    def search(self, query, limit=PICKER_LIMIT):
+        """Rows with a name word, SKU or barcode starting with ``query``."""
+        q = ' '.join(query.lower().split())
+        if not q:
+            return np.arange(min(limit, len(self)))
+        lo = int(self._keys.searchsorted(q, side='left'))
+        hi = int(self._keys.searchsorted(q + _MAX_CHAR, side='left'))
+        # A row can own several keys, so over-fetch a little before de-duplicating
+        return pd.unique(self._key_rows[lo:min(hi, lo + 4 * limit)])[:limit]
+
+    def picker_options(self, query='', include=None, limit=PICKER_LIMIT):
+        """Product names for a picker, keeping ``include`` selectable."""
+        options = self.names[self.search(query, limit)].tolist()
+        if include is not None and include not in options:
+            options.insert(0, include)
+        return options
+
+    def price(self, product):
+        return float(self.prices[self.row_of_name[product]])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frame = synthetic_catalog(n)
+    start = time.perf_counter()
+    catalog = Catalog(frame)
+    print(f"Indexed {n:,} SKUs in {time.perf_counter() - start:.2f}s")
+
+    codes = np.random.default_rng(0).choice(catalog.barcodes, 10_000)
+    start = time.perf_counter()
+    for code in codes:
+        row = catalog.scan(code)
+        catalog.prices[row]
+    print(f"Scan to line: {(time.perf_counter() - start) / len(codes) * 1e6:.2f} us per barcode")
+
+    queries = ['apex', 'tv', 'nova ph', 'sku-0012', '8901234', 'zen tea 1']
+    start = time.perf_counter()
+    for _ in range(100):
+        for q in queries:
+            catalog.picker_options(q)
+    print(f"Prefix search: {(time.perf_counter() - start) / (100 * len(queries)) * 1e6:.1f} us per query")
@@ -0,0 +1,141 @@
+"""In-process publish/subscribe change feed for incremental admin views.
+
+Write paths publish small typed deltas. Each subscriber owns a bounded queue;
+when a slow subscriber falls behind, the oldest deltas are dropped and the
+subscription is flagged for a resync, so publishers (cashiers) never block on
+a reader (an idle admin tab). The app shares one feed across every session
+in the server process, and each admin session holds its own subscription.
+"""
+import threading
+import time
+from collections import Counter, deque, namedtuple
+
+import pandas as pd
+
+TOPICS = ('sale', 'request', 'dispatch', 'attendance')
+DEFAULT_QUEUE_SIZE = 1000
+# Subscriptions not drained for this long (e.g. a closed browser tab) are dropped
+IDLE_EXPIRY_S = 15 * 60
+
+Delta = namedtuple('Delta', ['seq', 'topic', 'ts', 'payload'])
+
+
+class Subscription:
+    def __init__(self, name, topics, maxsize):
+        self.name = name
+        self.topics = frozenset(topics)
+        self._queue = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.last_drain = time.monotonic()
+
+    def offer(self, delta):
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                # Backpressure: shed the oldest delta instead of blocking the publisher
+                self.dropped += 1
+            self._queue.append(delta)
+
+    def drain(self):
+        """Return ``(deltas, overflowed)``; ``overflowed`` means a resync is needed."""
+        with self._lock:
+            deltas = list(self._queue)
+            self._queue.clear()
+            overflowed, self.dropped = self.dropped > 0, 0
+            self.last_drain = time.monotonic()
+        return deltas, overflowed
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._subs = {}
+
+    def publish(self, topic, **payload):
+        if topic not in TOPICS:
+            raise ValueError(f"Unknown change feed topic: {topic}")
+        with self._lock:
+            self._seq += 1
+            delta = Delta(self._seq, topic, time.time(), payload)
+            subs = [s for s in self._subs.values() if topic in s.topics]
+        for sub in subs:
+            sub.offer(delta)
+        return delta
+
+    def subscribe(self, name, topics=TOPICS, maxsize=DEFAULT_QUEUE_SIZE):
+        with self._lock:
+            self._prune()
+            if name not in self._subs:
+                self._subs[name] = Subscription(name, topics, maxsize)
+            return self._subs[name]
+
+    def unsubscribe(self, name):
+        with self._lock:
+            self._subs.pop(name, None)
+
+    def _prune(self):
+        cutoff = time.monotonic() - IDLE_EXPIRY_S
+        for name in [n for n, s in self._subs.items() if s.last_drain < cutoff]:
+            del self._subs[name]
+
+
+class LiveAggregates:
+    """Today's network activity, kept current by applying feed deltas."""
+
+    def __init__(self, recent=25):
+        self.recent = deque(maxlen=recent)
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.day = pd.Timestamp.now().normalize()
+        self.sales = 0
+        self.units = 0
+        self.revenue = 0.0
+        self.revenue_by_store = Counter()
+        self.pending_requests = 0
+        self.in_transit = 0
+        self.on_shift = set()
+
+    def resync(self, db):
+        """Rebuild from the tables after an overflow or at the start of a new day."""
+        from time_index import range_slice
+
+        self.reset_counts()
+        today = range_slice(db, 'sales', self.day)
+        self.sales = len(today)
+        self.units = int(today['Quantity'].sum())
+        self.revenue = float(today['Revenue'].sum())
+        self.revenue_by_store.update(today.groupby('Location')['Revenue'].sum().to_dict())
+        self.pending_requests = int((db['requests']['Status'] == 'Pending').sum())
+        self.in_transit = int((db['dispatches']['Status'] == 'In-Transit').sum())
+        att = db['attendance']
+        on_shift = att[(att['Date'] == self.day.strftime('%Y-%m-%d')) & att['CheckOut'].isna()]
+        self.on_shift = set(on_shift['EmpID'])
+
+    def apply(self, delta):
+        p = delta.payload
+        if delta.topic == 'sale':
+            if pd.Timestamp(p['Date']) >= self.day:
+                self.sales += 1
+                self.units += int(p['Quantity'])
+                self.revenue += float(p['Revenue'])
+                self.revenue_by_store[p['Location']] += float(p['Revenue'])
+            summary = f"{p['Location']} sold {p['Quantity']}x {p['Product']}"
+        elif delta.topic == 'request':
+            self.pending_requests += {'Pending': 1, 'Approved': -1, 'Rejected': -1}.get(p['Status'], 0)
+            summary = f"{p['Store']} request for {p['Quantity']}x {p['Product']} {p['Status'].lower()}"
+        elif delta.topic == 'dispatch':
+            self.in_transit += {'In-Transit': 1, 'Delivered': -1}.get(p['Status'], 0)
+            summary = f"{p['Quantity']}x {p['Product']} to {p['Destination']} {p['Status'].lower()}"
+        else:
+            if p['Event'] == 'CheckIn':
+                self.on_shift.add(p['EmpID'])
+            else:
+                self.on_shift.discard(p['EmpID'])
+            summary = f"{p['EmpID']} {p['Event']}"
+        self.recent.appendleft({
+            'Time': time.strftime('%H:%M:%S', time.localtime(delta.ts)),
+            'Feed': delta.topic.title(),
+            'Event': summary
+        })
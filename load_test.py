@@ -0,0 +1,227 @@
+# Concurrent-session load test: drive app.py headlessly with N cashier / admin sessions
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from workers import worker_context
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, "app.py")
+SCENARIOS = os.path.join(ROOT, "load_scenarios.json")
+SESSION_TIMEOUT_S = 900
+
+# AppTest keeps one runtime per process and can't run two scripts at once, so
+# each session gets its own process. Sessions then really run concurrently and
+# compete for CPU, but each holds a private interpreter and copy of the app
+# rather than sharing one server.
+
+
+# --- ACTIONS (each returns False when there was nothing to do) ---
+
+def _button(at, label):
+    for button in at.button:
+        if button.label.startswith(label):
+            return button
+    return None
+
+def _labelled(elements, label):
+    return next(e for e in elements if e.label.startswith(label))
+
+def login(at, username, password):
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    at.button[0].click()
+    at.run()
+    at.run()  # the dashboard renders on the rerun after the splash
+
+def pos_sale(at, product, quantity=1):
+    _labelled(at.selectbox, "Select or verify scanned product").set_value(product)
+    _labelled(at.number_input, "Units").set_value(quantity)
+    _button(at, "Submit Transaction").click()
+    at.run()
+
+def supply_request(at, product, quantity=25):
+    _labelled(at.selectbox, "Product Line").set_value(product)
+    _labelled(at.number_input, "Requested Volume").set_value(quantity)
+    _button(at, "Submit Fulfillment Order").click()
+    at.run()
+
+def _click_if_present(at, label):
+    button = _button(at, label)
+    if button is None:
+        return False
+    button.click()
+    at.run()
+    return True
+
+def approve_request(at):
+    return _click_if_present(at, "Approve & Trigger Dispatch")
+
+def deliver_dispatch(at):
+    return _click_if_present(at, "Mark as Delivered")
+
+def refresh(at):
+    at.run()
+
+def seed_requests(at, count, quantity=5):
+    # Sessions don't share a db, so an admin needs its own pending requests to approve
+    from seed_data import next_ids
+    from time_index import append_events
+
+    db = at.session_state['db']
+    inv = db['inventory']
+    now = time.strftime("%Y-%m-%d %H:%M")
+    rows = []
+    for req_id, (store, hub) in zip(next_ids(db, 'requests', count), db['store_hub'].items()):
+        stocked = inv[(inv['Location'] == hub) & (inv['Current_Stock'] >= quantity * count)]
+        rows.append({'ReqID': req_id, 'Date': now, 'Store': store, 'Product': stocked['Product'].iloc[0],
+                     'Quantity': quantity, 'Status': 'Pending'})
+    append_events(db, 'requests', rows)
+
+ACTIONS = {
+    'pos_sale': pos_sale,
+    'supply_request': supply_request,
+    'approve_request': approve_request,
+    'deliver_dispatch': deliver_dispatch,
+    'refresh': refresh,
+}
+
+
+# --- ONE LEVEL (one process per session) ---
+
+def allocate(sessions, n):
+    # Largest-remainder split of n sessions by share, with every kind present once n allows
+    shares = np.array([s['share'] for s in sessions], dtype=float)
+    exact = n * shares / shares.sum()
+    counts = np.floor(exact).astype(int)
+    for i in np.argsort(-(exact - counts))[:n - counts.sum()]:
+        counts[i] += 1
+    while n >= len(sessions) and (counts == 0).any():
+        counts[np.argmax(counts)] -= 1
+        counts[np.argmin(counts)] += 1
+    return [s for s, c in zip(sessions, counts) for _ in range(c)]
+
+def run_session(scenario, think_time, ready, results):
+    import logging
+    import resource
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    samples, errors = [], []
+    at = AppTest.from_file(APP, default_timeout=120)
+    steps = [('login', {})] + [(s['action'], s) for s in scenario['steps']] * scenario.get('repeat', 1)
+    # Imports, the first render and seeding are start-up, not load; every session starts together
+    at.run()
+    if scenario.get('pending_requests'):
+        seed_requests(at, scenario['pending_requests'])
+    ready.wait()
+    for action, params in steps:
+        kwargs = {k: v for k, v in params.items() if k != 'action'}
+        start = time.perf_counter()
+        try:
+            if action == 'login':
+                login(at, *scenario['login'])
+                done = True
+            else:
+                done = ACTIONS[action](at, **kwargs) is not False
+        except Exception as exc:
+            errors.append(f"{scenario['name']}.{action}: {exc!r}")
+            continue
+        elapsed = time.perf_counter() - start
+        if at.exception:
+            errors.append(f"{scenario['name']}.{action}: {at.exception[0].value}")
+        if done:
+            samples.append((f"{scenario['name']}.{action}", elapsed))
+        else:
+            # A step with nothing to act on measures nothing, so the level doesn't count as clean
+            errors.append(f"{scenario['name']}.{action}: skipped, nothing to act on")
+        if think_time:
+            time.sleep(think_time)
+    # ru_maxrss is KiB on Linux
+    results.put((samples, errors, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+def run_level(config, n):
+    ctx = worker_context()
+    scenarios = allocate(config['sessions'], n)
+    ready = ctx.Barrier(len(scenarios) + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=run_session, args=(s, config.get('think_time_s', 0.0), ready, results))
+             for s in scenarios]
+    for p in procs:
+        p.start()
+    samples, errors, rss = [], [], []
+    try:
+        ready.wait(timeout=SESSION_TIMEOUT_S)
+    except threading.BrokenBarrierError:
+        errors.append("session: failed to start")
+    start = time.perf_counter()
+    for _ in procs if not errors else ():
+        try:
+            s, e, r = results.get(timeout=SESSION_TIMEOUT_S)
+        except queue.Empty:
+            errors.append("session: no result (process died or timed out)")
+            break
+        samples += s
+        errors += e
+        rss.append(r)
+    wall = time.perf_counter() - start
+    for p in procs:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+
+    latencies = np.array([s for _, s in samples]) * 1000
+    by_action = {}
+    for name, s in samples:
+        by_action.setdefault(name, []).append(s * 1000)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        'sessions': n,
+        'interactions': len(samples),
+        'errors': errors,
+        'wall_s': wall,
+        'throughput': len(samples) / wall,
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+        'session_rss_mb': max(rss, default=0.0),
+        'total_rss_mb': sum(rss),
+        'by_action': {k: float(np.percentile(v, 95)) for k, v in sorted(by_action.items())},
+    }
+
+
+# --- DRIVER ---
+
+def run_load_test(scenarios=SCENARIOS, levels=None, out=None):
+    with open(scenarios) as f:
+        config = json.load(f)
+    results = []
+    print(f"{'sessions':>8} {'actions':>8} {'errors':>6} {'tput/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'MB/sess':>8} {'MB total':>8}")
+    for n in levels or config['levels']:
+        r = run_level(config, n)
+        results.append(r)
+        print(f"{r['sessions']:>8} {r['interactions']:>8} {len(r['errors']):>6} {r['throughput']:>8.2f} "
+              f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+              f"{r['session_rss_mb']:>8.0f} {r['total_rss_mb']:>8.0f}")
+        for err in r['errors'][:5]:
+            print(f"{'':>8} ! {err}")
+    if out:
+        with open(out, 'w') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless concurrent-session load test for app.py")
+    parser.add_argument('--scenarios', default=SCENARIOS, help="scenario JSON file")
+    parser.add_argument('--levels', type=int, nargs='+', help="session counts to run (overrides the file)")
+    parser.add_argument('--out', help="write per-level results as JSON")
+    args = parser.parse_args()
+    results = run_load_test(args.scenarios, args.levels, args.out)
+    # Errors include skipped steps, so a run that measured less than it claims fails
+    sys.exit(1 if any(r['errors'] for r in results) else 0)
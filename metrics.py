@@ -0,0 +1,184 @@
+"""Lightweight in-process instrumentation for the Streamlit app.
+
+Timing spans feed fixed-bucket histograms, DataFrame tables are tracked with
+row and memory gauges, and anything slower than ``NEXUS_SLOW_MS`` is logged.
+Everything is served on a local HTTP endpoint in Prometheus text
+(``/metrics``) or JSON (``/metrics.json``).
+
+Instrumentation is off unless ``NEXUS_METRICS=1``; while off, ``span`` hands
+back a shared no-op context manager so the hot path pays almost nothing.
+"""
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+ENABLED = os.environ.get('NEXUS_METRICS', '0') == '1'
+PORT = int(os.environ.get('NEXUS_METRICS_PORT', '9464'))
+SLOW_MS = float(os.environ.get('NEXUS_SLOW_MS', '500'))
+# Deep memory_usage walks every string, so gauges refresh at most this often
+GAUGE_INTERVAL_S = 10.0
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+log = logging.getLogger('nexus.metrics')
+
+_lock = threading.Lock()
+_histograms = {}
+_gauges = {}
+_gauges_at = 0.0
+_server = None
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, edge in enumerate(BUCKETS):
+            if value <= edge:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+def observe(metric, value, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(value)
+
+
+@contextlib.contextmanager
+def _timed(metric, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # st.rerun() / st.stop() exit via exceptions, so record in finally
+        elapsed = time.perf_counter() - start
+        observe(metric, elapsed, **labels)
+        if elapsed * 1000 >= SLOW_MS:
+            log.warning("slow %s %s took %.1f ms", metric, labels, elapsed * 1000)
+
+
+def span(kind, name):
+    """Time a block as ``kind``/``name`` (e.g. ``span('tab', 'admin.sales')``)."""
+    return _timed('nexus_span_seconds', kind=kind, name=name) if ENABLED else _NOOP
+
+
+def rerun_span(role):
+    """Time one full script rerun for the signed-in ``role``."""
+    return _timed('nexus_rerun_seconds', role=role) if ENABLED else _NOOP
+
+
+def record_table_gauges(db, force=False):
+    """Row count and memory gauges for every DataFrame in ``db``."""
+    global _gauges_at
+    if not ENABLED:
+        return
+    now = time.monotonic()
+    if not force and now - _gauges_at < GAUGE_INTERVAL_S:
+        return
+    values = {}
+    for table, frame in db.items():
+        if isinstance(frame, pd.DataFrame):
+            values[('nexus_table_rows', table)] = len(frame)
+            values[('nexus_table_bytes', table)] = int(frame.memory_usage(deep=True, index=True).sum())
+    with _lock:
+        _gauges.update(values)
+        _gauges_at = now
+
+
+def snapshot():
+    with _lock:
+        return {
+            'histograms': [
+                {'metric': metric, 'labels': dict(labels), 'count': h.count, 'sum': h.total,
+                 'buckets': dict(zip(map(str, BUCKETS), h.counts))}
+                for (metric, labels), h in _histograms.items()
+            ],
+            'gauges': [
+                {'metric': metric, 'labels': {'table': table}, 'value': value}
+                for (metric, table), value in _gauges.items()
+            ],
+        }
+
+
+def _label_value(value):
+    # The text format escapes backslash, double quote and newline in label values
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    lines = []
+    with _lock:
+        for metric in sorted({m for m, _ in _histograms}):
+            lines.append(f"# TYPE {metric} histogram")
+            for (m, labels), h in _histograms.items():
+                if m != metric:
+                    continue
+                base = ",".join(f'{k}="{_label_value(v)}"' for k, v in labels)
+                cumulative = 0
+                for edge, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    le = '+Inf' if edge == float('inf') else repr(edge)
+                    lines.append(f'{metric}_bucket{{{base},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{base}}} {h.total}")
+                lines.append(f"{metric}_count{{{base}}} {h.count}")
+        for metric in sorted({m for m, _ in _gauges}):
+            lines.append(f"# TYPE {metric} gauge")
+            for (m, table), value in sorted(_gauges.items()):
+                if m == metric:
+                    lines.append(f'{metric}{{table="{_label_value(table)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, ctype = render_prometheus().encode(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, ctype = json.dumps(snapshot()).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(port=PORT, host='127.0.0.1'):
+    """Serve metrics on a daemon thread; safe to call on every rerun."""
+    global _server
+    if not ENABLED or _server is not None:
+        return _server
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as exc:
+                log.warning("metrics endpoint not started on %s:%s: %s", host, port, exc)
+                # Don't retry (and re-log) on every rerun
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, name='nexus-metrics', daemon=True).start()
+    return _server
@@ -0,0 +1,95 @@
+"""Server-side paged table component.
+
+Search, sort and slicing run on the server against the full frame; only the
+rows of the visible page are materialised and sent to the browser.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def search_mask(df, query):
+    # Case-insensitive substring match across every text-like column
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+            continue
+        mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+def sort_keys(col):
+    # Text columns with gaps (e.g. an open CheckOut) can't be argsorted as-is
+    if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_datetime64_any_dtype(col):
+        return col.to_numpy()
+    return col.fillna('').astype(str).to_numpy()
+
+
+def paginate(df, page=1, page_size=25, sort_by=None, ascending=True, query='', presorted=None):
+    """Return ``(page_df, total_rows, n_pages)`` for one page of ``df``.
+
+    Only the sort column is ordered; the page is then gathered with ``take``
+    so the rest of the frame is never copied. ``presorted`` names a column
+    ``df`` is already ascending by, which skips the sort for that column.
+    """
+    positions = np.arange(len(df))
+    if query:
+        positions = positions[search_mask(df, query)]
+
+    if sort_by is not None and sort_by == presorted:
+        if not ascending:
+            positions = positions[::-1]
+    elif sort_by is not None and len(positions):
+        keys = sort_keys(df[sort_by])[positions]
+        order = np.argsort(keys, kind='stable')
+        if not ascending:
+            order = order[::-1]
+        positions = positions[order]
+
+    total = len(positions)
+    n_pages = max(1, math.ceil(total / page_size))
+    page = min(max(1, page), n_pages)
+    lo = (page - 1) * page_size
+    return df.take(positions[lo:lo + page_size]), total, n_pages
+
+
+def render_paged_table(df, key, columns=None, sort_by=None, ascending=False, presorted=None):
+    """Render ``df`` as a searchable, sortable table one page at a time."""
+    view = df[columns] if columns else df
+    if view.empty:
+        st.dataframe(view, hide_index=True, width='stretch')
+        return
+
+    cols = list(view.columns)
+    default_sort = cols.index(sort_by) if sort_by in cols else 0
+
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    with c1:
+        query = st.text_input("Search", key=f"{key}_search", placeholder="Filter rows...")
+    with c2:
+        sort_col = st.selectbox("Sort By", cols, index=default_sort, key=f"{key}_sort")
+    with c3:
+        desc = st.toggle("Desc", value=not ascending, key=f"{key}_desc")
+    with c4:
+        page_size = st.selectbox("Rows", PAGE_SIZES, key=f"{key}_size")
+
+    # Clamp before drawing the pager so a narrower search can't leave it out of range
+    page = st.session_state.get(f"{key}_page", 1)
+    page_df, total, n_pages = paginate(view, page, page_size, sort_col, not desc, query.strip(), presorted)
+    if page > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+
+    st.dataframe(page_df, hide_index=True, width='stretch')
+
+    p1, p2 = st.columns([1, 3])
+    with p1:
+        st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+    with p2:
+        first = 0 if total == 0 else (min(page, n_pages) - 1) * page_size + 1
+        last = min(first + page_size - 1, total)
+        st.caption(f"Rows {first}–{last} of {total} · {n_pages} page(s)")
+
@@ -0,0 +1,276 @@
+"""Hub regions: store assignment, per-region partitions and regional workers.
+
+Every store belongs to the region of its nearest hub. ``partition_by_region``
+splits the network tables so that each region can be held and served by its
+own ``RegionWorker`` process, and ``aggregate_hq`` assembles the HQ-wide view
+from the small per-region summaries the workers return. After the first load
+a ``RegionCluster`` only sends its workers what changed: appended rows, and
+the in-place updated cells (stock levels, request and dispatch statuses).
+
+The session's db stays the system of record: every write path updates it,
+and the workers hold read-only regional copies for the roll-up. That spreads
+the summary work across processes, but it adds memory rather than saving it,
+because the session still holds the whole network next to the copies.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from workers import worker_context
+
+EARTH_RADIUS_KM = 6371.0
+# Tables a region holds: (column placing a row in a region, whether hub rows belong too, columns updated in place)
+REGION_TABLES = {
+    'inventory': ('Location', True, ['Current_Stock']),
+    'sales': ('Location', False, []),
+    'sales_daily': ('Location', False, []),
+    'requests': ('Store', False, ['Status']),
+    'dispatches': ('Destination', False, ['Status']),
+}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def assign_stores_to_hubs(store_coords, hubs_df):
+    """Map each store to its nearest hub as ``{store: hub}``."""
+    stores = list(store_coords)
+    lat = np.array([store_coords[s][0] for s in stores])[:, None]
+    lon = np.array([store_coords[s][1] for s in stores])[:, None]
+    dist = haversine_km(lat, lon, hubs_df['Lat'].to_numpy()[None, :], hubs_df['Lon'].to_numpy()[None, :])
+    nearest = hubs_df['Hub'].to_numpy()[dist.argmin(axis=1)]
+    return dict(zip(stores, nearest))
+
+
+def hub_for_store(db, store):
+    return db['store_hub'][store]
+
+
+def region_stores(db, region):
+    hubs = db['hubs'][db['hubs']['Region'] == region]['Hub'].tolist()
+    return [s for s, h in db['store_hub'].items() if h in hubs], hubs
+
+
+def partition_by_region(db):
+    """Split inventory and event tables into ``{region: partition}``.
+
+    Rows keep the source table's (time) order.
+    """
+    parts = {}
+    for region in db['hubs']['Region'].unique():
+        stores, hubs = region_stores(db, region)
+        part = {'region': region, 'hubs': hubs, 'stores': stores}
+        for table, (col, with_hubs, _) in REGION_TABLES.items():
+            df = db[table]
+            part[table] = df[df[col].isin(stores + hubs if with_hubs else stores)].reset_index(drop=True)
+        parts[region] = part
+    return parts
+
+
+def region_summary(part):
+    """Small, picklable per-region aggregates used to assemble HQ analytics."""
+    inv = part['inventory']
+    stores_inv = inv[inv['Type'] == 'Store']
+    # Compacted history counts towards the totals alongside the raw sales
+    cols = ['Location', 'Product', 'Quantity', 'Revenue']
+    sales = pd.concat([part['sales_daily'][cols], part['sales'][cols]]) if len(part['sales_daily']) else part['sales']
+    return {
+        'region': part['region'],
+        'sales_by_store': sales.groupby('Location')[['Quantity', 'Revenue']].sum(),
+        'sales_by_product': sales.groupby('Product')[['Quantity', 'Revenue']].sum(),
+        'stock': inv.groupby(['Type', 'Product'])['Current_Stock'].sum(),
+        'shortage_lines': int((stores_inv['Current_Stock'] < stores_inv['Target_Stock']).sum()),
+        'pending_requests': int((part['requests']['Status'] == 'Pending').sum()),
+        'in_transit': int((part['dispatches']['Status'] == 'In-Transit').sum()),
+    }
+
+
+def aggregate_hq(summaries):
+    """Combine region summaries into network-wide HQ tables."""
+    overview = pd.DataFrame([{
+        'Region': s['region'],
+        'Units_Sold': int(s['sales_by_store']['Quantity'].sum()),
+        'Revenue': float(s['sales_by_store']['Revenue'].sum()),
+        'Shortage_Lines': s['shortage_lines'],
+        'Pending_Requests': s['pending_requests'],
+        'In_Transit': s['in_transit'],
+    } for s in summaries])
+    by_product = pd.concat([s['sales_by_product'] for s in summaries]).groupby(level=0).sum()
+    stock = pd.concat([s['stock'] for s in summaries]).groupby(level=[0, 1]).sum().unstack(level=0, fill_value=0)
+    return overview, by_product, stock
+
+
+# --- REGIONAL WORKER PROCESSES ---
+
+def apply_region_delta(part, ops):
+    """Apply ``RegionCluster.sync`` operations to a partition in place."""
+    for op, table, *args in ops:
+        if op == 'replace':
+            part[table] = args[0]
+        elif op == 'append':
+            part[table] = pd.concat([part[table], args[0]], ignore_index=True)
+        elif op == 'update':
+            col, pos, values = args
+            part[table].iloc[pos, part[table].columns.get_loc(col)] = values
+    return part
+
+
+def _serve_region(conn, part):
+    # Worker loop: the region's partition stays resident in this process
+    while True:
+        cmd, payload = conn.recv()
+        if cmd == 'stop':
+            break
+        elif cmd == 'delta':
+            apply_region_delta(part, payload)
+            conn.send(True)
+        elif cmd == 'summary':
+            conn.send(region_summary(part))
+        else:
+            conn.send(ValueError(f"Unknown region command: {cmd}"))
+    conn.close()
+
+
+class RegionWorker:
+    """One process owning one region's partition."""
+
+    def __init__(self, part, ctx=None):
+        ctx = ctx or worker_context()
+        self.region = part['region']
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve_region, args=(child, part), daemon=True, name=f"region-{self.region}")
+        self.proc.start()
+
+    def send(self, cmd, payload=None):
+        self.conn.send((cmd, payload))
+
+    def recv(self):
+        result = self.conn.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stop(self):
+        if self.proc.is_alive():
+            self.send('stop')
+            self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+
+
+def _stop_workers(workers):
+    for worker in workers:
+        worker.stop()
+
+
+def _version(db, table):
+    # Event tables keep their TimeIndex object while rows are only appended;
+    # a late-arrival merge or a compaction replaces it. Inventory is updated in place.
+    return db['time_index'][table] if table in db.get('time_index', {}) else db[table]
+
+
+class RegionCluster:
+    """A ``RegionWorker`` per region, kept in step with a db by ``sync``."""
+
+    def __init__(self, db):
+        self.regions = list(db['hubs']['Region'].unique())
+        self.members = [region_stores(db, region) for region in self.regions]
+        self.held = {}
+        for table in REGION_TABLES:
+            self._track(db, table)
+        self.workers = {region: RegionWorker(part) for region, part in partition_by_region(db).items()}
+        # Workers go when the cluster does, even if the session ends without a log-off
+        self._stop = weakref.finalize(self, _stop_workers, list(self.workers.values()))
+
+    def _region_codes(self, df, table):
+        col, with_hubs, _ = REGION_TABLES[table]
+        lookup = {}
+        for code, (stores, hubs) in enumerate(self.members):
+            lookup.update(dict.fromkeys(stores + hubs if with_hubs else stores, code))
+        return df[col].map(lookup).fillna(-1).to_numpy(dtype=np.int64)
+
+    def _track(self, db, table, start=0):
+        # Record which region (and position within it) each row from ``start`` on was sent to
+        df = db[table]
+        codes = self._region_codes(df.iloc[start:], table)
+        if start == 0:
+            held = self.held[table] = {'codes': codes, 'local': np.empty(0, dtype=np.int64),
+                                       'counts': np.zeros(len(self.regions), dtype=np.int64), 'last': {}}
+            for col in REGION_TABLES[table][2]:
+                held['last'][col] = np.empty(0, dtype=df[col].to_numpy().dtype)
+        else:
+            held = self.held[table]
+            held['codes'] = np.concatenate([held['codes'], codes])
+        local = np.full(len(codes), -1, dtype=np.int64)
+        for code in np.unique(codes[codes >= 0]):
+            rows = np.flatnonzero(codes == code)
+            local[rows] = held['counts'][code] + np.arange(len(rows))
+            held['counts'][code] += len(rows)
+        held['local'] = np.concatenate([held['local'], local])
+        for col in held['last']:
+            held['last'][col] = np.concatenate([held['last'][col], df[col].to_numpy()[start:]])
+        held['version'] = weakref.ref(_version(db, table))
+        held['rows'] = len(df)
+        return codes
+
+    def sync(self, db):
+        """Send every worker what changed in ``db`` since the last sync; returns the rows sent."""
+        ops = {region: [] for region in self.regions}
+        sent = 0
+        for table, (_, _, mutable) in REGION_TABLES.items():
+            held, df = self.held[table], db[table]
+            if held['version']() is not _version(db, table) or len(df) < held['rows']:
+                # Rewritten (late-arrival merge, compaction, new inventory lines): resend the table
+                codes = self._track(db, table)
+                for code, region in enumerate(self.regions):
+                    rows = df[codes == code].reset_index(drop=True)
+                    ops[region].append(('replace', table, rows))
+                    sent += len(rows)
+                continue
+
+            n = held['rows']
+            for col in mutable:
+                current = df[col].to_numpy()[:n]
+                changed = np.flatnonzero(current != held['last'][col])
+                changed = changed[held['codes'][changed] >= 0]
+                held['last'][col][changed] = current[changed]
+                for code, region in enumerate(self.regions):
+                    rows = changed[held['codes'][changed] == code]
+                    if len(rows):
+                        ops[region].append(('update', table, col, held['local'][rows], current[rows]))
+                        sent += len(rows)
+
+            if len(df) > n:
+                codes = self._track(db, table, start=n)
+                new = df.iloc[n:]
+                for code, region in enumerate(self.regions):
+                    rows = new[codes == code]
+                    if len(rows):
+                        ops[region].append(('append', table, rows))
+                        sent += len(rows)
+
+        busy = [region for region in self.regions if ops[region]]
+        for region in busy:
+            self.workers[region].send('delta', ops[region])
+        for region in busy:
+            self.workers[region].recv()
+        return sent
+
+    def summaries(self):
+        # Fan out first, then gather, so regions compute concurrently
+        for worker in self.workers.values():
+            worker.send('summary')
+        return [worker.recv() for worker in self.workers.values()]
+
+    def stop(self):
+        self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,283 @@
+"""Data retention: compaction, archiving and a memory budget for the session db.
+
+Old detail is folded into smaller forms rather than dropped:
+
+* raw sales older than ``sales_days`` become daily (store x product)
+  aggregates in ``sales_daily``;
+* delivered dispatches, handled requests, old audit entries, completed
+  shifts and refunds move to zstd-compressed Parquet segments on disk;
+* attendance older than ``attendance_days`` is rolled into per-employee
+  monthly summaries in ``attendance_monthly``.
+
+``enforce_budget`` measures the tables after a rerun and compacts when they
+exceed the budget. If one pass isn't enough it halves the retention windows,
+down to ``min_days``. Dashboards read sales through ``sales_history`` so
+historical ranges are still answered from the daily aggregates.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+from collections import deque
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from exports import write_parquet
+from time_index import TimeIndex, append_events, range_slice, to_ns
+
+ARCHIVE_DIR = os.environ.get('NEXUS_ARCHIVE_DIR', os.path.join(tempfile.gettempdir(), 'nexus_archive'))
+# Deep memory_usage walks every string, so the budget is checked at most this often
+CHECK_INTERVAL_S = 30.0
+# Row groups are the unit the archive viewer reads, so keep them page-sized rather than report-sized
+ARCHIVE_ROW_GROUP = 5_000
+MB = 1024 * 1024
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+SALES_COLUMNS = ['Date', 'Location', 'Product', 'Quantity', 'Revenue']
+AGE_FIELDS = ('sales_days', 'archive_days', 'attendance_days', 'audit_days')
+# table -> (time column, rows eligible for archiving, policy age field)
+ARCHIVE_RULES = {
+    'dispatches': ('Date', lambda df: df['Status'] == 'Delivered', 'archive_days'),
+    'requests': ('Date', lambda df: df['Status'].isin(['Approved', 'Rejected']), 'archive_days'),
+    'audit_logs': ('Timestamp', None, 'audit_days'),
+    # Shifts are reconciled against raw sales and refunds, so they all go when the raw sales do
+    'shifts': ('EndTime', lambda df: df['Status'] == 'Completed', 'sales_days'),
+    'refunds': ('Date', None, 'sales_days'),
+}
+
+log = logging.getLogger('nexus.retention')
+
+
+@dataclass
+class RetentionPolicy:
+    sales_days: int = 90
+    archive_days: int = 30
+    attendance_days: int = 60
+    audit_days: int = 180
+    min_days: int = 7
+    budget_mb: float = 512.0
+
+    @classmethod
+    def from_env(cls):
+        """Defaults overridden by ``NEXUS_RETENTION_<FIELD>`` (e.g. ``NEXUS_RETENTION_SALES_DAYS``)."""
+        overrides = {}
+        for f in fields(cls):
+            value = os.environ.get(f"NEXUS_RETENTION_{f.name.upper()}")
+            if value is not None:
+                overrides[f.name] = type(f.default)(value)
+        policy = cls(**overrides)
+        if policy.budget_mb <= 0:
+            raise ValueError(f"NEXUS_RETENTION_BUDGET_MB must be positive, got {policy.budget_mb}")
+        return policy
+
+    def scaled(self, factor):
+        return replace(self, **{name: max(self.min_days, int(getattr(self, name) * factor)) for name in AGE_FIELDS})
+
+
+class RetentionState:
+    """Policy, archive segments and compaction history for one db."""
+
+    def __init__(self, policy=None, archive_dir=ARCHIVE_DIR):
+        self.policy = policy or RetentionPolicy.from_env()
+        # Each session holds its own db, so each gets its own archive directory
+        self.archive_dir = os.path.join(archive_dir, uuid.uuid4().hex[:12])
+        # Segments only make sense for this db, so they go when it does
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.archive_dir, True)
+        self.segments = []
+        self.history = deque(maxlen=20)
+        self.last_usage = None
+        self._checked_at = 0.0
+
+
+def compacted_tables():
+    """Empty destination tables for compacted data."""
+    return {
+        'sales_daily': pd.DataFrame({
+            'Date': pd.Series(dtype=str), 'Location': pd.Series(dtype=str), 'Product': pd.Series(dtype=str),
+            'Quantity': pd.Series(dtype='int64'), 'Revenue': pd.Series(dtype='float64'),
+            'Transactions': pd.Series(dtype='int64'),
+        }),
+        'attendance_monthly': pd.DataFrame({
+            'EmpID': pd.Series(dtype=str), 'Month': pd.Series(dtype=str),
+            'Days_Worked': pd.Series(dtype='int64'), 'Open_Days': pd.Series(dtype='int64'),
+        }),
+    }
+
+
+def table_bytes(db):
+    return {name: int(df.memory_usage(deep=True, index=True).sum())
+            for name, df in db.items() if isinstance(df, pd.DataFrame)}
+
+
+# --- COMPACTION STEPS ---
+
+def _compact_sales(db, cutoff):
+    index = db['time_index']['sales']
+    _, hi = index.bounds(None, cutoff)
+    if hi == 0:
+        return 0
+    old = db['sales'].iloc[:hi]
+    day_ns = index.keys[:hi] // NS_PER_DAY * NS_PER_DAY
+    daily = (old[['Location', 'Product', 'Quantity', 'Revenue']]
+             .assign(Day=day_ns, Transactions=1)
+             .groupby(['Day', 'Location', 'Product'], as_index=False, sort=True).sum())
+    daily.insert(0, 'Date', pd.to_datetime(daily.pop('Day')).dt.strftime('%Y-%m-%d %H:%M'))
+    append_events(db, 'sales_daily', daily)
+    # Copy the survivors so the old rows' buffers (or the snapshot mapping) can be released
+    db['sales'] = db['sales'].iloc[hi:].copy().reset_index(drop=True)
+    db['time_index']['sales'] = TimeIndex(index.keys[hi:])
+    return hi
+
+
+def _archive(db, state, table, cutoff):
+    col, eligible, _ = ARCHIVE_RULES[table]
+    df = db[table]
+    if df.empty:
+        return 0
+    index = db['time_index'].get(table)
+    ts = index.keys if index is not None else to_ns(df[col])
+    # Open rows (e.g. an active shift's missing EndTime) parse as NaT and are never eligible
+    mask = (ts < cutoff.value) & (ts != np.iinfo(np.int64).min)
+    if eligible is not None:
+        mask &= eligible(df).to_numpy(dtype=bool)
+    if not mask.any():
+        return 0
+
+    rows = df[mask]
+    path = os.path.join(state.archive_dir, table, f"segment-{len(state.segments):05d}.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in write_parquet(rows, path, ARCHIVE_ROW_GROUP):
+        pass
+    state.segments.append({
+        'Table': table, 'Rows': len(rows), 'From': rows[col].min(), 'To': rows[col].max(),
+        'KB': round(os.path.getsize(path) / 1024, 1), 'Path': path,
+    })
+    db[table] = df[~mask].reset_index(drop=True)
+    if index is not None:
+        db['time_index'][table] = TimeIndex(index.keys[~mask])
+    return len(rows)
+
+
+def _roll_attendance(db, cutoff):
+    att = db['attendance']
+    # 'YYYY-MM-DD' strings sort chronologically
+    old = (att['Date'] < cutoff.strftime('%Y-%m-%d')).to_numpy(dtype=bool)
+    if not old.any():
+        return 0
+    rows = att[old]
+    monthly = rows.assign(
+        Month=rows['Date'].str[:7],
+        Days_Worked=rows['CheckOut'].notna().astype('int64'),
+        Open_Days=rows['CheckOut'].isna().astype('int64'),
+    )[['EmpID', 'Month', 'Days_Worked', 'Open_Days']]
+    db['attendance_monthly'] = (pd.concat([db['attendance_monthly'], monthly], ignore_index=True)
+                                .groupby(['EmpID', 'Month'], as_index=False, sort=True).sum())
+    db['attendance'] = att[~old].reset_index(drop=True)
+    return int(old.sum())
+
+
+def compact(db, policy=None, now=None, reason='manual'):
+    """Apply ``policy`` (default: the db's own) once and return a report."""
+    state = db['retention']
+    policy = policy or state.policy
+    today = pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize()
+    cutoff = lambda days: today - pd.Timedelta(days=days)
+
+    start = time.perf_counter()
+    bytes_before = sum(table_bytes(db).values())
+    moved = {'sales': _compact_sales(db, cutoff(policy.sales_days))}
+    for table, (_, _, age) in ARCHIVE_RULES.items():
+        moved[table] = _archive(db, state, table, cutoff(getattr(policy, age)))
+    moved['attendance'] = _roll_attendance(db, cutoff(policy.attendance_days))
+    bytes_after = sum(table_bytes(db).values())
+
+    report = {
+        'Time': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'Reason': reason,
+        'Windows': f"sales {policy.sales_days}d / archive {policy.archive_days}d / "
+                   f"attendance {policy.attendance_days}d / audit {policy.audit_days}d",
+        'Rows_Compacted': sum(moved.values()),
+        'MB_Before': round(bytes_before / MB, 2),
+        'MB_After': round(bytes_after / MB, 2),
+        'Seconds': round(time.perf_counter() - start, 3),
+        **{f"{t}_rows": n for t, n in moved.items()},
+    }
+    state.history.appendleft(report)
+    state.last_usage = bytes_after
+    if report['Rows_Compacted']:
+        audit_log = pd.DataFrame([{
+            'Timestamp': report['Time'], 'User': 'system', 'Action': 'RETENTION_COMPACTION',
+            'Details': f"{reason}: {report['Rows_Compacted']} rows compacted, {report['MB_Before']} MB -> {report['MB_After']} MB",
+        }])
+        db['audit_logs'] = pd.concat([db['audit_logs'], audit_log], ignore_index=True)
+    return report
+
+
+def enforce_budget(db, now=None, force=False):
+    """Compact if the db's tables are over budget; checked at most every ``CHECK_INTERVAL_S``."""
+    state = db.get('retention')
+    if state is None:
+        return None
+    clock = time.monotonic()
+    if not force and clock - state._checked_at < CHECK_INTERVAL_S:
+        return None
+    state._checked_at = clock
+    used = state.last_usage = sum(table_bytes(db).values())
+    budget = state.policy.budget_mb * MB
+    if used <= budget:
+        return None
+
+    factor, report = 1.0, None
+    while True:
+        policy = state.policy.scaled(factor)
+        report = compact(db, policy, now, reason=f"budget ({used / MB:.1f} MB > {budget / MB:.1f} MB)")
+        at_floor = all(getattr(policy, name) <= policy.min_days for name in AGE_FIELDS)
+        if report['MB_After'] * MB <= budget or at_floor:
+            break
+        factor /= 2
+    if report['MB_After'] * MB > budget:
+        log.warning("tables still %.1f MB after compaction (budget %.0f MB)", report['MB_After'], state.policy.budget_mb)
+    return report
+
+
+# --- READING COMPACTED DATA ---
+
+def sales_history(db, start=None, end=None):
+    """Sales in ``[start, end)``: compacted daily aggregates followed by raw rows.
+
+    Every row carries ``Transactions`` (1 for a raw sale), so counts survive
+    compaction.
+    """
+    raw = range_slice(db, 'sales', start, end)[SALES_COLUMNS].assign(Transactions=1)
+    daily = range_slice(db, 'sales_daily', start, end) if 'sales_daily' in db else None
+    if daily is None or daily.empty:
+        return raw
+    return pd.concat([daily, raw], ignore_index=True)
+
+
+def history_bounds(db):
+    """First and last sale time across compacted and raw sales."""
+    ends = [idx for name, idx in db['time_index'].items() if name in ('sales', 'sales_daily') and len(idx)]
+    if not ends:
+        return None, None
+    return min(i.first() for i in ends), max(i.last() for i in ends)
+
+
+def read_archive_rows(path, start, stop):
+    """Rows ``[start, stop)`` of an archive segment, reading only the row groups that hold them."""
+    pf = pq.ParquetFile(path)
+    meta = pf.metadata
+    stop = min(stop, meta.num_rows)
+    if start >= stop:
+        return pf.schema_arrow.empty_table().to_pandas()
+    ends = np.cumsum([meta.row_group(i).num_rows for i in range(meta.num_row_groups)])
+    first = int(np.searchsorted(ends, start, side='right'))
+    last = int(np.searchsorted(ends, stop - 1, side='right'))
+    offset = int(ends[first - 1]) if first else 0
+    return pf.read_row_groups(range(first, last + 1)).slice(start - offset, stop - start).to_pandas()
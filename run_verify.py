@@ -1,4 +1,5 @@
 # Run the application to verify the flow
+import os
 import subprocess
 
 def run_it():
@@ -8,9 +9,10 @@ def run_it():
     print("3. Check out the Cashier shift.")
     print("4. Log back in as Super Admin to review the Audit Log and Payroll calculation for the Cashier.")
     print("5. Review the Peak Hour Heatmap and Dead Stock analytics.")
+    print("\nFor an automated multi-session run of the POS and admin flows: python load_test.py")
     
     print("\nStarting the app now...")
-    subprocess.run(["streamlit", "run", "c:/Users/heman/OneDrive/Documents/PR/data analyist/hyderabad-retail-erp/app.py"])
+    subprocess.run(["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")])
 
 if __name__ == "__main__":
     run_it()
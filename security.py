@@ -0,0 +1,11 @@
+import hashlib
+import re
+
+
+def hash_password(password):
+    return hashlib.sha256(str(password).encode()).hexdigest()
+
+
+def sanitize_input(user_input):
+    if not isinstance(user_input, str): return user_input
+    return re.sub(r'[^\w\s\-\.\@]', '', user_input)
@@ -0,0 +1,248 @@
+"""Seed and reference data for the demo network.
+
+``generate_seed_tables`` builds the demo data from scratch. ``build_snapshot``
+writes it once as uncompressed Arrow IPC files plus a small JSON manifest, and
+``load_snapshot`` memory-maps those files on start-up. New sessions then skip
+the Python-loop generation and password hashing. Timestamps are stored
+absolutely and shifted forward on load so the demo history always ends
+"now".
+
+Build the snapshot with ``python seed_data.py`` (the Dockerfile does this).
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+
+from catalog import build_catalog_frame
+from regions import assign_stores_to_hubs
+from security import hash_password
+
+SNAPSHOT_DIR = os.environ.get('NEXUS_SEED_SNAPSHOT', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed_snapshot'))
+SNAPSHOT_VERSION = 5
+
+FRAME_TABLES = ['inventory', 'sales', 'dispatches', 'requests', 'hubs', 'product_catalog', 'employees',
+                'attendance', 'audit_logs', 'purchase_orders', 'shifts', 'refunds']
+REFERENCE_KEYS = ['stores', 'stores_info', 'store_hub', 'products']
+# Time columns shifted on load: table -> (column, string format, whole days only)
+RELATIVE_TIME = {
+    'sales': ('Date', '%Y-%m-%d %H:%M', False),
+    'requests': ('Date', '%Y-%m-%d %H:%M', False),
+    'attendance': ('Date', '%Y-%m-%d', True),
+}
+# Append-only tables can stay on the memory map; everything else is written in place
+MAPPED_TABLES = {'sales'}
+# Stable row IDs: table -> (column, prefix). Compaction renumbers the frames, so rows are picked by ID
+ROW_IDS = {'requests': ('ReqID', 'REQ'), 'dispatches': ('DispatchID', 'DSP')}
+
+
+def generate_seed_tables():
+    stores_info = {
+        'Hitech City': 'HYDSTR001', 'Banjara Hills': 'HYDSTR002', 'Gachibowli': 'HYDSTR003',
+        'Secunderabad': 'HYDSTR004', 'Uppal': 'HYDSTR005', 'Jubilee Hills': 'HYDSTR006',
+        'Madhapur': 'HYDSTR007', 'Kukatpally': 'HYDSTR008', 'Begumpet': 'HYDSTR009', 'Charminar': 'HYDSTR010'
+    }
+    stores = list(stores_info.keys())
+    
+    # Product catalog: (name, unit price, category); SKUs and barcodes are assigned in order
+    catalog_df = build_catalog_frame(*zip(*[
+        ('iPhone 15', 75000.0, 'Electronics'), ('Samsung TV', 45000.0, 'Electronics'),
+        ('Milk (1L)', 60.0, 'Dairy'), ('Rice (25kg)', 1200.0, 'Staples'),
+        ('Detergent', 250.0, 'Household'), ('T-Shirt', 500.0, 'Apparel')
+    ]))
+    products = catalog_df['Product'].tolist()
+    prices = dict(zip(products, catalog_df['Price']))
+    
+    # Coordinates mapping
+    coords = {
+        'Hitech City': (17.44, 78.38), 'Banjara Hills': (17.41, 78.43),
+        'Gachibowli': (17.44, 78.34), 'Secunderabad': (17.43, 78.50),
+        'Uppal': (17.39, 78.56), 'Jubilee Hills': (17.42, 78.40),
+        'Madhapur': (17.45, 78.39), 'Kukatpally': (17.48, 78.40),
+        'Begumpet': (17.44, 78.46), 'Charminar': (17.36, 78.47)
+    }
+    
+    # Regional hubs; every store is served by its nearest hub
+    hubs_df = pd.DataFrame([
+        {'Hub': 'Kompally Hub', 'Region': 'North', 'Lat': 17.55, 'Lon': 78.49},
+        {'Hub': 'LB Nagar Hub', 'Region': 'South-East', 'Lat': 17.35, 'Lon': 78.55}
+    ])
+    store_hub = assign_stores_to_hubs({s: coords[s] for s in stores}, hubs_df)
+    coords.update({h: (lat, lon) for h, lat, lon in hubs_df[['Hub', 'Lat', 'Lon']].itertuples(index=False)})
+    
+    df = pd.DataFrame([{'Location': s, 'StoreID': stores_info[s], 'Product': p, 'Type': 'Store'} for s in stores for p in products])
+    hub_df = pd.DataFrame([{'Location': h, 'Product': p, 'Type': 'Hub'} for h in hubs_df['Hub'] for p in products])
+    df = pd.concat([hub_df, df], ignore_index=True)
+    
+    targets = {'iPhone 15': 20, 'Samsung TV': 10, 'Milk (1L)': 100, 'Rice (25kg)': 50, 'Detergent': 80, 'T-Shirt': 40}
+    df['Target_Stock'] = df['Product'].map(targets)
+    df['Current_Stock'] = np.where(
+        df['Type'] == 'Hub',
+        df['Target_Stock'] * 100,
+        (np.random.rand(len(df)) * 1.5 * df['Target_Stock']).astype(int)
+    )
+    df['Lat'] = df['Location'].map(lambda x: coords.get(x, (17.55, 78.49))[0])
+    df['Lon'] = df['Location'].map(lambda x: coords.get(x, (17.55, 78.49))[1])
+    
+    # Generate Mock Sales
+    sales_data = []
+    # Make random seed for reproducibility in sales demo
+    np.random.seed(42)
+    for _ in range(250):
+        sale_date = datetime.now() - timedelta(days=np.random.randint(0, 30))
+        store = np.random.choice(stores)
+        prod = np.random.choice(products)
+        qty = np.random.randint(1, 4)
+        sales_data.append({
+            'Date': sale_date.strftime("%Y-%m-%d %H:%M"),
+            'Location': store,
+            'Product': prod,
+            'Quantity': qty,
+            'Revenue': qty * prices[prod]
+        })
+    sales_df = pd.DataFrame(sales_data)
+
+    # Dispatches (empty at start, will fill from actions)
+    dispatches_df = pd.DataFrame(columns=['DispatchID', 'Date', 'Origin', 'Destination', 'Product', 'Quantity', 'Status'])
+
+    # Requests
+    requests_df = pd.DataFrame([
+         {'ReqID': 'REQ-00001', 'Date': (datetime.now() - timedelta(hours=5)).strftime("%Y-%m-%d %H:%M"), 'Store': 'Charminar', 'Product': 'Rice (25kg)', 'Quantity': 20, 'Status': 'Approved'},
+         {'ReqID': 'REQ-00002', 'Date': (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"), 'Store': 'Gachibowli', 'Product': 'Milk (1L)', 'Quantity': 50, 'Status': 'Pending'}
+    ])
+
+    # Employees
+    employees_data = [
+        {'EmpID': 'EMP-0001', 'Name': 'Super Admin', 'Username': 'admin', 'PasswordHash': hash_password('admin123'), 'Contact': 'admin@nexus.com', 'Role': 'Admin', 'Store': 'All', 'Wage': 50000, 'Status': 'Active'},
+        {'EmpID': 'HYDSTR001-MGR', 'Name': 'Store Manager Hitech', 'Username': 'manager1', 'PasswordHash': hash_password('mgr123'), 'Contact': 'mgr.hitech@nexus.com', 'Role': 'Manager', 'Store': 'Hitech City', 'Wage': 35000, 'Status': 'Active'},
+        {'EmpID': 'EMP-2051', 'Name': 'Cashier Hitech', 'Username': 'employee', 'PasswordHash': hash_password('emp123'), 'Contact': 'cashier.hitech@nexus.com', 'Role': 'Employee', 'Store': 'Hitech City', 'Wage': 20000, 'Status': 'Active'},
+        {'EmpID': 'HYDCHAR001', 'Name': 'Rajesh', 'Username': 'rajesh', 'PasswordHash': hash_password('emp123'), 'Contact': 'rajesh@nexus.com', 'Role': 'Employee', 'Store': 'Charminar', 'Wage': 22000, 'Status': 'Active'},
+        {'EmpID': 'HYDBAN001', 'Name': 'Suresh', 'Username': 'suresh', 'PasswordHash': hash_password('emp123'), 'Contact': 'suresh@nexus.com', 'Role': 'Employee', 'Store': 'Banjara Hills', 'Wage': 25000, 'Status': 'Active'},
+        {'EmpID': 'HYDGAC001', 'Name': 'Ramesh', 'Username': 'ramesh', 'PasswordHash': hash_password('emp123'), 'Contact': 'ramesh@nexus.com', 'Role': 'Employee', 'Store': 'Gachibowli', 'Wage': 24000, 'Status': 'Active'}
+    ]
+    employees_df = pd.DataFrame(employees_data)
+
+    # Attendance
+    att_data = []
+    for emp_id in [e['EmpID'] for e in employees_data if e['Role'] != 'Admin']:
+        # Generate 15-25 random days of attendance in the last 30 days
+        days_worked = np.random.randint(15, 26)
+        for d in range(days_worked):
+            date_str = (datetime.now() - timedelta(days=np.random.randint(1, 30))).strftime("%Y-%m-%d")
+            att_data.append({
+                'EmpID': emp_id,
+                'Date': date_str,
+                'CheckIn': '09:00:00',
+                'CheckOut': '18:00:00'
+            })
+    attendance_df = pd.DataFrame(att_data).drop_duplicates(subset=['EmpID', 'Date'])
+    if attendance_df.empty:
+        attendance_df = pd.DataFrame(columns=['EmpID', 'Date', 'CheckIn', 'CheckOut'])
+
+    # Audit Logs
+    audit_logs_df = pd.DataFrame(columns=['Timestamp', 'User', 'Action', 'Details'])
+
+    # Purchase Orders
+    po_df = pd.DataFrame(columns=['PO_ID', 'Date', 'Hub', 'Supplier', 'Product', 'Quantity', 'TotalCost', 'Status'])
+
+    # Shifts
+    shifts_df = pd.DataFrame(columns=['ShiftID', 'EmpID', 'Store', 'Date', 'EndTime', 'StartCash', 'EndCash', 'Status'])
+
+    # Refunds paid out of a store's cash drawer
+    refunds_df = pd.DataFrame(columns=['Date', 'Location', 'Product', 'Quantity', 'Amount'])
+
+
+    return {
+        'inventory': df,
+        'sales': sales_df,
+        'dispatches': dispatches_df,
+        'requests': requests_df,
+        'stores': stores,
+        'stores_info': stores_info,
+        'hubs': hubs_df,
+        'store_hub': store_hub,
+        'products': products,
+        'product_catalog': catalog_df,
+        'employees': employees_df,
+        'attendance': attendance_df,
+        'audit_logs': audit_logs_df,
+        'purchase_orders': po_df,
+        'shifts': shifts_df,
+        'refunds': refunds_df
+    }
+
+
+def build_snapshot(path=SNAPSHOT_DIR):
+    """Generate the seed data and write it to ``path`` as Arrow IPC files."""
+    tables = generate_seed_tables()
+    built_at = datetime.now()
+    os.makedirs(path, exist_ok=True)
+    for name in FRAME_TABLES:
+        df = tables[name]
+        if name in RELATIVE_TIME:
+            # Store event tables in time order so loading needs no re-sort
+            col = RELATIVE_TIME[name][0]
+            df = df.assign(**{col: pd.to_datetime(df[col])}).sort_values(col, kind='stable')
+        arrow = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(os.path.join(path, f"{name}.arrow"), 'wb') as sink:
+            with pa.ipc.new_file(sink, arrow.schema) as writer:
+                writer.write_table(arrow)
+    manifest = {'version': SNAPSHOT_VERSION, 'built_at': built_at.isoformat()}
+    manifest.update({key: tables[key] for key in REFERENCE_KEYS})
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    return path
+
+
+def load_snapshot(path=SNAPSHOT_DIR):
+    """Memory-map a prebuilt snapshot, or return None if there isn't a usable one."""
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+
+    shift = datetime.now() - datetime.fromisoformat(manifest['built_at'])
+    tables = {key: manifest[key] for key in REFERENCE_KEYS}
+    for name in FRAME_TABLES:
+        source = pa.memory_map(os.path.join(path, f"{name}.arrow"), 'r')
+        # split_blocks keeps primitive columns as views onto the mapped file
+        df = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+        if name in RELATIVE_TIME:
+            col, fmt, whole_days = RELATIVE_TIME[name]
+            delta = pd.Timedelta(days=shift.days) if whole_days else pd.Timedelta(shift)
+            df[col] = (df[col] + delta).dt.strftime(fmt)
+        tables[name] = df if name in MAPPED_TABLES else df.copy()
+    return tables
+
+
+def load_seed_tables(path=SNAPSHOT_DIR):
+    return load_snapshot(path) or generate_seed_tables()
+
+
+def id_counters(tables):
+    """Last ID number used per ``ROW_IDS`` table, for ``next_ids``."""
+    counters = {}
+    for table, (col, prefix) in ROW_IDS.items():
+        taken = tables[table][col].str[len(prefix) + 1:].astype(int)
+        counters[table] = int(taken.max()) if len(taken) else 0
+    return counters
+
+
+def next_ids(db, table, n=1):
+    """``n`` fresh IDs for ``table``. The counter lives in ``db['id_seq']``, so archived IDs are never reused."""
+    col, prefix = ROW_IDS[table]
+    first = db['id_seq'][table] + 1
+    db['id_seq'][table] += n
+    return [f"{prefix}-{i:05d}" for i in range(first, first + n)]
+
+
+if __name__ == "__main__":
+    print(f"Seed snapshot written to {build_snapshot(sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_DIR)}")
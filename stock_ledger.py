@@ -0,0 +1,158 @@
+"""Event-sourced stock ledger with checkpoints for point-in-time queries.
+
+Every stock movement is appended as a typed event to compact, growable
+columnar arrays (timestamp, location, product, delta, kind). The current
+stock matrix is maintained incrementally as a materialized view. Every
+``checkpoint_every`` events a copy of that matrix is kept, so reconstructing
+stock at any past instant replays only the events since the nearest
+checkpoint.
+"""
+import numpy as np
+import pandas as pd
+
+EVENT_KINDS = ['SALE', 'RETURN', 'DAMAGE', 'DISPATCH_OUT', 'DISPATCH_IN',
+               'TRANSFER_OUT', 'TRANSFER_IN', 'PO_RECEIPT', 'ADJUSTMENT']
+KIND_CODE = {k: i for i, k in enumerate(EVENT_KINDS)}
+
+CHECKPOINT_EVERY = 1024
+
+
+class StockLedger:
+    """Append-only stock movements plus a materialized (locations x products) stock matrix."""
+
+    _COLUMNS = (('ts', np.int64), ('loc', np.int32), ('prod', np.int32), ('delta', np.int32), ('kind', np.int8))
+
+    def __init__(self, locations, products, initial_stock, start_ts=None, checkpoint_every=CHECKPOINT_EVERY):
+        self.locations = list(locations)
+        self.products = list(products)
+        self.loc_code = {l: i for i, l in enumerate(self.locations)}
+        self.prod_code = {p: i for i, p in enumerate(self.products)}
+        self.initial = np.asarray(initial_stock, dtype=np.int64).copy()
+        self.stock = self.initial.copy()
+        self.checkpoint_every = checkpoint_every
+
+        self._n = 0
+        self._cols = {name: np.empty(1024, dtype=dtype) for name, dtype in self._COLUMNS}
+        start = pd.Timestamp(start_ts).value if start_ts is not None else pd.Timestamp.now().value
+        # (timestamp, event offset, stock matrix) — the seed state is checkpoint 0
+        self._cp_ts = [start]
+        self._cp_offset = [0]
+        self._cp_stock = [self.initial.copy()]
+
+    @classmethod
+    def from_inventory(cls, inventory, start_ts=None, **kwargs):
+        locations = list(dict.fromkeys(inventory['Location']))
+        products = list(dict.fromkeys(inventory['Product']))
+        matrix = np.zeros((len(locations), len(products)), dtype=np.int64)
+        l_idx = inventory['Location'].map({l: i for i, l in enumerate(locations)}).to_numpy()
+        p_idx = inventory['Product'].map({p: i for i, p in enumerate(products)}).to_numpy()
+        matrix[l_idx, p_idx] = inventory['Current_Stock'].to_numpy()
+        return cls(locations, products, matrix, start_ts, **kwargs)
+
+    def __len__(self):
+        return self._n
+
+    def _col(self, name):
+        return self._cols[name][:self._n]
+
+    def _reserve(self, extra):
+        need = self._n + extra
+        cap = len(self._cols['ts'])
+        if need > cap:
+            cap = max(need, 2 * cap)
+            for name, dtype in self._COLUMNS:
+                grown = np.empty(cap, dtype=dtype)
+                grown[:self._n] = self._col(name)
+                self._cols[name] = grown
+
+    def record(self, kind, location, product, delta, ts=None):
+        """Append one movement and return the new stock level for that cell."""
+        return self.record_batch([kind], [location], [product], [delta], ts)[0]
+
+    def record_batch(self, kinds, locations, products, deltas, ts=None):
+        """Append several movements under one timestamp; returns the new levels."""
+        n = len(deltas)
+        ts = pd.Timestamp(ts).value if ts is not None else pd.Timestamp.now().value
+        # Keep the log monotonic so point-in-time lookups can binary search it
+        last = self._cols['ts'][self._n - 1] if self._n else self._cp_ts[0]
+        ts = max(ts, int(last))
+
+        l = np.fromiter((self.loc_code[x] for x in locations), dtype=np.int32, count=n)
+        p = np.fromiter((self.prod_code[x] for x in products), dtype=np.int32, count=n)
+        d = np.asarray(deltas, dtype=np.int32)
+        k = np.fromiter((KIND_CODE[x] for x in kinds), dtype=np.int8, count=n)
+
+        self._reserve(n)
+        lo, hi = self._n, self._n + n
+        self._cols['ts'][lo:hi] = ts
+        self._cols['loc'][lo:hi] = l
+        self._cols['prod'][lo:hi] = p
+        self._cols['delta'][lo:hi] = d
+        self._cols['kind'][lo:hi] = k
+        self._n = hi
+        np.add.at(self.stock, (l, p), d)
+
+        if self._n - self._cp_offset[-1] >= self.checkpoint_every:
+            self._cp_ts.append(ts)
+            self._cp_offset.append(self._n)
+            self._cp_stock.append(self.stock.copy())
+        return self.stock[l, p]
+
+    def level(self, location, product):
+        return int(self.stock[self.loc_code[location], self.prod_code[product]])
+
+    @property
+    def start(self):
+        """Time of the seed state; the ledger knows nothing earlier."""
+        return pd.Timestamp(self._cp_ts[0])
+
+    def stock_at(self, ts):
+        """Stock matrix as of ``ts`` (inclusive), replaying from the nearest checkpoint.
+
+        Returns None for times before ``start``.
+        """
+        ts = pd.Timestamp(ts).value
+        cp = int(np.searchsorted(self._cp_ts, ts, side='right')) - 1
+        if cp < 0:
+            return None
+        matrix = self._cp_stock[cp].copy()
+        lo = self._cp_offset[cp]
+        hi = lo + int(np.searchsorted(self._col('ts')[lo:], ts, side='right'))
+        np.add.at(matrix, (self._col('loc')[lo:hi], self._col('prod')[lo:hi]), self._col('delta')[lo:hi])
+        return matrix
+
+    def level_at(self, location, product, ts):
+        matrix = self.stock_at(ts)
+        return None if matrix is None else int(matrix[self.loc_code[location], self.prod_code[product]])
+
+    def levels_for(self, locations, products, matrix=None):
+        """Vectorized lookup of aligned location / product columns in ``matrix``."""
+        matrix = self.stock if matrix is None else matrix
+        l = pd.Series(locations).map(self.loc_code).to_numpy(dtype=np.int64)
+        p = pd.Series(products).map(self.prod_code).to_numpy(dtype=np.int64)
+        return matrix[l, p]
+
+    def replay(self):
+        """Rebuild the stock matrix from the seed state and the full event log."""
+        matrix = self.initial.copy()
+        np.add.at(matrix, (self._col('loc'), self._col('prod')), self._col('delta'))
+        return matrix
+
+    def events(self, location=None, product=None):
+        """Event log as a DataFrame, optionally narrowed to one location / product."""
+        mask = np.ones(self._n, dtype=bool)
+        if location is not None:
+            mask &= self._col('loc') == self.loc_code[location]
+        if product is not None:
+            mask &= self._col('prod') == self.prod_code[product]
+        return pd.DataFrame({
+            'Timestamp': pd.to_datetime(self._col('ts')[mask]).strftime('%Y-%m-%d %H:%M:%S'),
+            'Location': np.array(self.locations, dtype=object)[self._col('loc')[mask]],
+            'Product': np.array(self.products, dtype=object)[self._col('prod')[mask]],
+            'Event': np.array(EVENT_KINDS, dtype=object)[self._col('kind')[mask]],
+            'Delta': self._col('delta')[mask],
+        })
+
+    @property
+    def checkpoints(self):
+        return len(self._cp_ts)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from catalog import Catalog, build_catalog_frame, ean13
+
+
+def make_catalog():
+    frame = build_catalog_frame(['Samsung TV', 'TV Stand', 'Amul Milk', 'Tata Tea Gold', 'Zebra Pen'],
+                                [42000.0, 3500.0, 60.0, 450.0, 20.0],
+                                ['Electronics', 'Furniture', 'Dairy', 'Staples', 'Stationery'])
+    return Catalog(frame)
+
+
+def names(catalog, rows):
+    return catalog.names[rows].tolist()
+
+
+def test_ean13_check_digit():
+    # 4006381333931 is a published EAN-13 example
+    assert ean13([400638133393]) == ['4006381333931']
+
+
+def test_scan_by_barcode_sku_and_name():
+    c = make_catalog()
+    assert c.scan(c.barcodes[2]) == 2
+    assert c.scan('SKU-000004') == 3
+    assert c.scan('  Zebra Pen ') == 4
+    assert c.scan('zebra pen') is None and c.scan('SKU-999999') is None and c.scan('') is None
+    assert c.price('Amul Milk') == 60.0
+
+
+def test_search_matches_word_sku_and_barcode_prefixes():
+    c = make_catalog()
+    # Word suffixes find "tv" at the start or end of a name
+    assert sorted(names(c, c.search('tv'))) == ['Samsung TV', 'TV Stand']
+    assert names(c, c.search('  TEA   gold')) == ['Tata Tea Gold']
+    assert names(c, c.search('sku-00000')) == names(c, np.arange(5)) == names(c, c.search(c.barcodes[0][:6]))
+    assert names(c, c.search(c.barcodes[1])) == ['TV Stand']
+    assert len(c.search('tvs')) == 0 and len(c.search('stand tv')) == 0
+
+
+def test_search_boundaries():
+    c = make_catalog()
+    # The last key in sort order is still found, and nothing sorts past it
+    assert names(c, c.search('zebra pen')) == ['Zebra Pen']
+    assert len(c.search('zz')) == 0 and len(c.search('\U0010ffff')) == 0
+    assert list(c.search('')) == [0, 1, 2, 3, 4] and list(c.search('', limit=2)) == [0, 1]
+    # A row matching several keys is returned once, and the limit counts rows
+    big = Catalog(pd.DataFrame({'SKU': [f"SKU-{i:03d}" for i in range(300)],
+                                'Barcode': ean13(np.arange(300)), 'Product': [f"Tea Tea {i}" for i in range(300)],
+                                'Category': 'Staples', 'Price': 1.0}))
+    rows = big.search('tea', limit=50)
+    assert len(rows) == len(set(rows)) == 50
+
+
+def test_picker_options_keep_the_current_choice():
+    c = make_catalog()
+    assert c.picker_options('milk') == ['Amul Milk']
+    assert c.picker_options('milk', include='Zebra Pen') == ['Zebra Pen', 'Amul Milk']
+    assert c.picker_options('milk', include='Amul Milk') == ['Amul Milk']
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+import change_feed
+from change_feed import ChangeFeed, LiveAggregates
+from time_index import append_events, index_tables
+
+TODAY = pd.Timestamp.now().normalize()
+
+
+def sale(feed, qty=1, revenue=100.0, store='A', when=None):
+    when = when if when is not None else TODAY + pd.Timedelta(hours=1)
+    return feed.publish('sale', Date=when.strftime('%Y-%m-%d %H:%M'), Location=store, Product='P',
+                        Quantity=qty, Revenue=revenue)
+
+
+def test_subscribers_get_their_topics_in_order():
+    feed = ChangeFeed()
+    sales = feed.subscribe('sales', topics=('sale',))
+    everything = feed.subscribe('all')
+    sale(feed)
+    feed.publish('request', Store='A', Product='P', Quantity=5, Status='Pending')
+    sale(feed)
+    got, overflowed = sales.drain()
+    assert [d.topic for d in got] == ['sale', 'sale'] and not overflowed
+    assert [d.seq for d in everything.drain()[0]] == [1, 2, 3]
+    # Draining empties the queue
+    assert everything.drain() == ([], False)
+
+
+def test_unknown_topic_is_rejected():
+    with pytest.raises(ValueError):
+        ChangeFeed().publish('refund', Amount=1)
+
+
+def test_lagging_subscriber_drops_oldest_and_is_flagged_once():
+    feed = ChangeFeed()
+    slow = feed.subscribe('slow', maxsize=3)
+    fast = feed.subscribe('fast', maxsize=100)
+    for i in range(5):
+        sale(feed, qty=i + 1)
+    got, overflowed = slow.drain()
+    assert overflowed and [d.payload['Quantity'] for d in got] == [3, 4, 5]
+    # The publisher and other subscribers are unaffected
+    assert len(fast.drain()[0]) == 5
+    sale(feed)
+    assert slow.drain()[1] is False
+
+
+def test_subscribe_is_idempotent_and_idle_subscriptions_expire():
+    feed = ChangeFeed()
+    sub = feed.subscribe('admin')
+    assert feed.subscribe('admin') is sub
+    sub.last_drain -= change_feed.IDLE_EXPIRY_S + 1
+    # A new subscription is made after the idle one is pruned, so its owner resyncs
+    assert feed.subscribe('admin') is not sub
+    feed.unsubscribe('admin')
+    sale(feed)
+    assert feed.subscribe('admin').drain() == ([], False)
+
+
+def make_db():
+    return index_tables({
+        'sales': pd.DataFrame({'Date': [(TODAY + pd.Timedelta(hours=h)).strftime('%Y-%m-%d %H:%M') for h in (1, 2)],
+                               'Location': ['A', 'B'], 'Product': 'P', 'Quantity': [2, 3], 'Revenue': [50.0, 70.0]}),
+        'requests': pd.DataFrame({'Status': ['Pending', 'Approved', 'Pending']}),
+        'dispatches': pd.DataFrame({'Status': ['In-Transit', 'Delivered']}),
+        'attendance': pd.DataFrame({'EmpID': ['E1', 'E2'], 'Date': TODAY.strftime('%Y-%m-%d'), 'CheckOut': [None, '18:00']}),
+    }, tables={'sales': 'Date'})
+
+
+def test_resync_after_overflow_matches_applying_every_delta():
+    db = make_db()
+    feed = ChangeFeed()
+    sub = feed.subscribe('admin', maxsize=2)
+    live = LiveAggregates()
+    live.resync(db)
+    assert (live.sales, live.revenue, live.pending_requests, live.in_transit, live.on_shift) == (2, 120.0, 2, 1, {'E1'})
+
+    new_sales = [(TODAY + pd.Timedelta(hours=3), 'A', 1, 10.0), (TODAY + pd.Timedelta(hours=4), 'C', 4, 40.0),
+                 (TODAY - pd.Timedelta(days=1), 'A', 9, 90.0)]
+    for when, store, qty, revenue in new_sales:
+        sale(feed, qty, revenue, store, when)
+    feed.publish('attendance', EmpID='E3', Store='A', Event='CheckIn')
+    append_events(db, 'sales', [{'Date': w.strftime('%Y-%m-%d %H:%M'), 'Location': s, 'Product': 'P', 'Quantity': q,
+                                 'Revenue': r} for w, s, q, r in new_sales])
+    db['attendance'].loc[len(db['attendance'])] = ['E3', TODAY.strftime('%Y-%m-%d'), None]
+
+    deltas, overflowed = sub.drain()
+    assert overflowed and len(deltas) == 2
+    # Deltas were lost, so the panel rebuilds from the tables
+    rebuilt = LiveAggregates()
+    rebuilt.resync(db)
+
+    complete = LiveAggregates()
+    complete.resync(make_db())
+    everything = ChangeFeed()
+    full = everything.subscribe('full')
+    for when, store, qty, revenue in new_sales:
+        sale(everything, qty, revenue, store, when)
+    everything.publish('attendance', EmpID='E3', Store='A', Event='CheckIn')
+    for delta in full.drain()[0]:
+        complete.apply(delta)
+
+    for attr in ('sales', 'units', 'revenue', 'on_shift', 'pending_requests', 'in_transit'):
+        assert getattr(rebuilt, attr) == getattr(complete, attr), attr
+    assert dict(rebuilt.revenue_by_store) == dict(complete.revenue_by_store)
+    # Yesterday's late sale shows in the event list but not in today's totals
+    assert complete.sales == 4 and complete.recent[0]['Event'] == 'E3 CheckIn'
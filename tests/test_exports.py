@@ -0,0 +1,95 @@
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import exports
+from exports import payroll_table, payslip_pdf, synthetic_payroll, write_csv, write_parquet, write_payslips
+
+
+def make_frame(n=1_003):
+    return pd.DataFrame({
+        'ID': np.arange(n),
+        'Store': [f"Store, \"{i % 7}\"" for i in range(n)],
+        'Revenue': np.arange(n) * 1.5,
+        'Note': [None] * n,
+    })
+
+
+def test_csv_streams_in_chunks_and_round_trips(tmp_path):
+    df = make_frame()
+    path = tmp_path / 'out.csv'
+    assert list(write_csv(df, path, chunk_rows=250)) == [250, 500, 750, 1000, 1003]
+    back = pd.read_csv(path)
+    # One header, with quoted commas and quotes intact
+    assert len(back) == 1_003
+    pd.testing.assert_frame_equal(back[['ID', 'Store', 'Revenue']], df[['ID', 'Store', 'Revenue']])
+    assert back['Note'].isna().all()
+
+
+def test_parquet_writes_a_row_group_per_chunk(tmp_path):
+    df = make_frame()
+    path = tmp_path / 'out.parquet'
+    assert list(write_parquet(df, path, chunk_rows=250))[-1] == 1_003
+    assert pq.ParquetFile(path).metadata.num_row_groups == 5
+    back = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(back[['ID', 'Store', 'Revenue']], df[['ID', 'Store', 'Revenue']])
+    # The all-null column is written as strings, not the null type
+    assert pq.read_schema(path).field('Note').type == 'string'
+
+
+def test_empty_frames_still_write_a_header(tmp_path):
+    df = make_frame(0)
+    assert list(write_csv(df, tmp_path / 'empty.csv')) == []
+    assert list(pd.read_csv(tmp_path / 'empty.csv').columns) == list(df.columns)
+    assert list(write_parquet(df, tmp_path / 'empty.parquet')) == []
+    assert pd.read_parquet(tmp_path / 'empty.parquet').columns.tolist() == list(df.columns)
+
+
+def read_zip(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_payslips_zip_one_pdf_per_employee(tmp_path):
+    payroll = synthetic_payroll(23)
+    path = tmp_path / 'slips.zip'
+    assert list(write_payslips(payroll, path, '2026-06', batch=10)) == [10, 20, 23]
+    files = read_zip(path)
+    assert sorted(files) == sorted(f"payslip_{e}.pdf" for e in payroll['EmpID'])
+    pdf = files['payslip_EMP-000004.pdf']
+    assert pdf.startswith(b'%PDF-1.4') and pdf.rstrip().endswith(b'%%EOF')
+    row = payroll.iloc[4]
+    assert f"Net payout: INR {row['Calculated_Payout']:,.2f}".encode() in pdf
+    # The xref offsets point at the objects they name
+    xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    offsets = [int(o) for o in re.findall(rb'(\d{10}) 00000 n', pdf[xref:])]
+    assert [pdf[o:].split(b' ', 1)[0] for o in offsets] == [str(i).encode() for i in range(1, 7)]
+
+
+def test_payslip_text_is_escaped():
+    slip = synthetic_payroll(1).iloc[0].to_dict()
+    slip['Name'] = 'A (B) \\ C'
+    assert b'A \\(B\\) \\\\ C' in payslip_pdf(slip, '2026-06')
+
+
+def test_parallel_payslips_match_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, 'PARALLEL_MIN', 10)
+    payroll = synthetic_payroll(40)
+    serial = list(write_payslips(payroll, tmp_path / 'serial.zip', '2026-06', workers=1, batch=15))
+    parallel = list(write_payslips(payroll, tmp_path / 'parallel.zip', '2026-06', workers=2, batch=15))
+    assert serial == parallel == [15, 30, 40]
+    assert read_zip(tmp_path / 'serial.zip') == read_zip(tmp_path / 'parallel.zip')
+
+
+def test_payroll_includes_rolled_up_months():
+    employees = pd.DataFrame({'EmpID': ['E1', 'E2'], 'Name': ['A', 'B'], 'Role': 'Employee', 'Store': 'S',
+                              'Wage': [30_000, 60_000]})
+    attendance = pd.DataFrame({'EmpID': ['E1', 'E1', 'E2'], 'Date': ['2026-06-01', '2026-06-02', '2026-06-01'],
+                               'CheckIn': '09:00:00', 'CheckOut': ['18:00:00', None, '18:00:00']})
+    monthly = pd.DataFrame({'EmpID': ['E2', 'E2'], 'Month': ['2026-04', '2026-05'], 'Days_Worked': [20, 10]})
+    payroll = payroll_table(attendance, employees, monthly).set_index('EmpID')
+    assert payroll.loc['E1', 'Days_Worked'] == 1 and payroll.loc['E1', 'Calculated_Payout'] == 1_000
+    assert payroll.loc['E2', 'Days_Worked'] == 31 and payroll.loc['E2', 'Calculated_Payout'] == 62_000
@@ -0,0 +1,65 @@
+import json
+import re
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import metrics
+
+# One sample line of the Prometheus text format, with escaped label values
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*\{(?:[a-zA-Z_]\w*="(?:[^"\\\n]|\\[\\"n])*",?)*\} \S+$')
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, '_server', None)
+    monkeypatch.setattr(metrics, '_histograms', {})
+    monkeypatch.setattr(metrics, '_gauges', {})
+    srv = metrics.start_server(port=0)
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.read().decode()
+
+
+def test_metrics_endpoint_serves_valid_text_format(server):
+    with metrics.span('action', 'pos.sale'):
+        pass
+    with metrics.span('tab', 'He said "hi"\\ then\nleft'):
+        pass
+    metrics.record_table_gauges({'sales': pd.DataFrame({'x': [1, 2]}), 'odd "table"': pd.DataFrame()}, force=True)
+
+    body = get(server + '/metrics')
+    samples = [l for l in body.splitlines() if l and not l.startswith('#')]
+    assert samples and all(SAMPLE.match(l) for l in samples), [l for l in samples if not SAMPLE.match(l)]
+    assert 'name="He said \\"hi\\"\\\\ then\\nleft"' in body
+    assert 'nexus_table_rows{table="odd \\"table\\""} 0' in body
+    assert 'nexus_table_rows{table="sales"} 2' in body
+    assert 'nexus_span_seconds_count{kind="action",name="pos.sale"} 1' in body
+    # Buckets are cumulative and end at +Inf with the full count
+    assert 'nexus_span_seconds_bucket{kind="action",name="pos.sale",le="+Inf"} 1' in body
+
+
+def test_json_endpoint_and_unknown_paths(server):
+    with metrics.span('action', 'pos.sale'):
+        pass
+    data = json.loads(get(server + '/metrics.json'))
+    (hist,) = data['histograms']
+    assert hist['labels'] == {'kind': 'action', 'name': 'pos.sale'} and hist['count'] == 1
+    with pytest.raises(urllib.error.HTTPError):
+        get(server + '/nope')
+
+
+def test_disabled_spans_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    monkeypatch.setattr(metrics, '_histograms', {})
+    with metrics.span('tab', 'x'):
+        pass
+    assert metrics._histograms == {}
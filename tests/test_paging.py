@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from paging import paginate, search_mask, sort_keys
+
+
+def make_frame(n=103):
+    return pd.DataFrame({
+        'ID': np.arange(n),
+        'Store': [f"Store {i % 7}" for i in range(n)],
+        'Note': [None if i % 10 == 0 else f"Note {i}" for i in range(n)],
+    })
+
+
+def test_pages_cover_every_row_once():
+    df = make_frame()
+    seen = []
+    for page in range(1, 6):
+        page_df, total, n_pages = paginate(df, page, 25, sort_by='ID')
+        seen += list(page_df['ID'])
+    assert total == 103 and n_pages == 5
+    assert seen == list(range(103))
+
+
+def test_last_page_is_short_and_out_of_range_pages_clamp():
+    df = make_frame()
+    last, _, _ = paginate(df, 5, 25, sort_by='ID')
+    assert list(last['ID']) == [100, 101, 102]
+    assert paginate(df, 99, 25, sort_by='ID')[0].equals(last)
+    assert list(paginate(df, 0, 25, sort_by='ID')[0]['ID']) == list(range(25))
+
+
+def test_empty_frame_and_empty_search():
+    empty, total, n_pages = paginate(make_frame(0), 3, 25)
+    assert empty.empty and total == 0 and n_pages == 1
+    none, total, n_pages = paginate(make_frame(), 1, 25, query='no such row')
+    assert none.empty and total == 0 and n_pages == 1
+
+
+def test_descending_and_presorted_agree():
+    df = make_frame()
+    sorted_desc = paginate(df, 1, 10, sort_by='ID', ascending=False)[0]
+    presorted_desc = paginate(df, 1, 10, sort_by='ID', ascending=False, presorted='ID')[0]
+    assert list(sorted_desc['ID']) == list(presorted_desc['ID']) == list(range(102, 92, -1))
+
+
+def test_search_mask_is_case_insensitive_and_skips_numbers_and_gaps():
+    df = make_frame()
+    mask = search_mask(df, 'store 3')
+    np.testing.assert_array_equal(mask, (df['ID'] % 7 == 3).to_numpy())
+    # Numeric columns aren't searched; missing text never matches
+    assert list(df.loc[search_mask(df, '42'), 'ID']) == [42]
+    assert not search_mask(df, 'none').any()
+    # Regex characters are literal
+    assert not search_mask(df, '.*').any()
+
+
+def test_sort_keys_handles_gaps_in_text():
+    df = make_frame(12)
+    page, _, _ = paginate(df, 1, 12, sort_by='Note')
+    assert list(page['Note'].iloc[:2].isna()) == [True, True]
+    assert sort_keys(df['ID']).dtype.kind == 'i'
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rebalancing import plan_moves, plan_rebalance, stock_matrices, synthetic_inventory, validate_plan
+
+
+def apply_plan(inv, plan):
+    after = inv.set_index(['Location', 'Product'])['Current_Stock'].copy()
+    for _, location, product, delta in plan_moves(plan):
+        after[(location, product)] += delta
+    return after
+
+
+@pytest.fixture(scope='module')
+def planned():
+    inv = synthetic_inventory(stores=30, skus=60, seed=5)
+    plan, stats = plan_rebalance(inv)
+    return inv, plan, stats
+
+
+def test_sources_and_destinations_stay_within_target(planned):
+    inv, plan, _ = planned
+    after = apply_plan(inv, plan)
+    before = inv.set_index(['Location', 'Product'])
+    target = before['Target_Stock']
+    sources = pd.MultiIndex.from_frame(plan[['Source', 'Product']])
+    dests = pd.MultiIndex.from_frame(plan[['Destination', 'Product']])
+    assert (after[sources] >= target[sources]).all()
+    assert (after[dests] <= target[dests]).all()
+    # A store never both gives and receives the same SKU
+    assert not set(sources) & set(dests)
+
+
+def test_units_are_conserved(planned):
+    inv, plan, stats = planned
+    after = apply_plan(inv, plan)
+    assert after.sum() == inv['Current_Stock'].sum()
+    assert stats['units'] == plan['Quantity'].sum() > 0
+    assert stats['lines'] == len(plan)
+
+
+def test_deficit_shrinks_by_the_units_moved(planned):
+    inv, plan, stats = planned
+    _, _, stock, target, _ = stock_matrices(inv)
+    after = apply_plan(inv, plan).loc[inv.set_index(['Location', 'Product']).index].to_numpy().reshape(stock.shape)
+    assert np.maximum(target - stock, 0).sum() == stats['deficit_units']
+    assert np.maximum(target - after, 0).sum() == stats['deficit_units'] - stats['units']
+
+
+def test_nearest_pairs_come_first(planned):
+    _, plan, _ = planned
+    assert plan['Distance_km'].is_monotonic_increasing
+
+
+def test_max_km_and_min_units_limit_the_plan(planned):
+    inv, plan, _ = planned
+    near, _ = plan_rebalance(inv, max_km=5)
+    assert (near['Distance_km'] <= 5).all() and len(near) < len(plan)
+    bulk, _ = plan_rebalance(inv, min_units=20)
+    assert (bulk['Quantity'] >= 20).all()
+
+
+def test_validate_plan_flags_stock_that_moved(planned):
+    inv, plan, _ = planned
+    assert validate_plan(inv, plan).empty
+    line = plan.iloc[0]
+    moved = inv.copy()
+    cell = (moved['Location'] == line['Source']) & (moved['Product'] == line['Product'])
+    moved.loc[cell, 'Current_Stock'] = 0
+    stale = validate_plan(moved, plan)
+    assert list(zip(stale['Source'], stale['Product'])) == [(line['Source'], line['Product'])]
+
+
+def test_balanced_network_needs_no_moves():
+    inv = synthetic_inventory(stores=5, skus=10)
+    inv['Current_Stock'] = inv['Target_Stock']
+    plan, stats = plan_rebalance(inv)
+    assert plan.empty and stats['covered_pct'] == 100.0
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from reconciliation import reconcile_shifts, synthetic_history, variance_summary
+
+NOW = pd.Timestamp('2026-03-01 12:00')
+
+
+def stamp(minutes):
+    return (pd.Timestamp('2026-03-01') + pd.to_timedelta(minutes, unit='min')).strftime('%Y-%m-%d %H:%M')
+
+
+def random_history(seed, n_sales=2_000, n_shifts=150):
+    rng = np.random.default_rng(seed)
+    stores = np.array(['A', 'B', 'C', 'D'])
+    sales = pd.DataFrame({
+        'Date': stamp(rng.integers(0, 720, n_sales)),
+        'Location': stores[rng.integers(0, 4, n_sales)],
+        'Revenue': rng.integers(1, 500, n_sales).astype(float),
+    })
+    start = rng.integers(0, 700, n_shifts)
+    end = start + rng.integers(0, 120, n_shifts)
+    open_ = rng.random(n_shifts) < 0.1
+    shifts = pd.DataFrame({
+        'ShiftID': [f"SHF-{i}" for i in range(n_shifts)],
+        'EmpID': 'EMP-X',
+        # 'E' has no sales at all
+        'Store': np.append(stores, 'E')[rng.integers(0, 5, n_shifts)],
+        'Date': stamp(start),
+        'EndTime': pd.Series(stamp(end)).where(~open_, None),
+        'StartCash': 1000.0,
+        'EndCash': np.where(open_, np.nan, 1000.0 + rng.integers(0, 20_000, n_shifts)),
+        'Status': np.where(open_, 'Active', 'Completed'),
+    })
+    return shifts, sales
+
+
+def brute_force(shifts, sales, now):
+    """Per-shift scan: the store's sales from the start minute through the end minute."""
+    sale_ts = pd.to_datetime(sales['Date'])
+    takings, counts = [], []
+    for _, shift in shifts.iterrows():
+        end = now if pd.isna(shift['EndTime']) else pd.Timestamp(shift['EndTime'])
+        hit = (sales['Location'] == shift['Store']) & (sale_ts >= pd.Timestamp(shift['Date'])) & (sale_ts <= end)
+        takings.append(float(sales.loc[hit, 'Revenue'].sum()))
+        counts.append(int(hit.sum()))
+    return np.array(takings), np.array(counts)
+
+
+def test_interval_join_matches_a_per_shift_scan():
+    for seed in (1, 2, 3):
+        shifts, sales = random_history(seed)
+        recon = reconcile_shifts(shifts, sales, now=NOW)
+        takings, counts = brute_force(shifts, sales, NOW)
+        np.testing.assert_allclose(recon['Takings'], takings)
+        np.testing.assert_array_equal(recon['Sales'], counts)
+
+
+def test_index_keys_give_the_same_answer():
+    shifts, sales = random_history(4)
+    sales_ns = pd.to_datetime(sales['Date']).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    pd.testing.assert_frame_equal(reconcile_shifts(shifts, sales, sales_ns=sales_ns, now=NOW),
+                                  reconcile_shifts(shifts, sales, now=NOW))
+
+
+def test_flags_against_the_tolerance():
+    sales = pd.DataFrame({'Date': [stamp(10), stamp(20)], 'Location': ['A', 'A'], 'Revenue': [300.0, 200.0]})
+    shifts = pd.DataFrame({
+        'ShiftID': ['S1', 'S2', 'S3', 'S4'], 'EmpID': 'EMP-X', 'Store': 'A',
+        'Date': stamp(0), 'EndTime': [stamp(30)] * 3 + [None],
+        'StartCash': 1000.0, 'EndCash': [1450.0, 1300.0, 1700.0, np.nan],
+        'Status': ['Completed'] * 3 + ['Active'],
+    })
+    recon = reconcile_shifts(shifts, sales, now=NOW, tolerance=100.0)
+    assert list(recon['Expected_Cash']) == [1500.0] * 4
+    assert list(recon['Flag']) == ['OK', 'SHORT', 'OVER', 'OPEN']
+    assert variance_summary(recon) == {'shifts': 3, 'flagged': 2, 'net_variance': -50.0, 'shortfall': -200.0}
+
+
+def test_refunds_paid_from_the_drawer_are_expected():
+    sales = pd.DataFrame({'Date': [stamp(10), stamp(20)], 'Location': ['A', 'A'], 'Revenue': [300.0, 200.0]})
+    # A refund at another store, or after the shift, isn't this drawer's
+    refunds = pd.DataFrame({'Date': [stamp(25), stamp(25), stamp(40)], 'Location': ['A', 'B', 'A'],
+                            'Amount': [60.0, 500.0, 500.0]})
+    shifts = pd.DataFrame({
+        'ShiftID': ['S1'], 'EmpID': 'EMP-X', 'Store': 'A', 'Date': stamp(0), 'EndTime': [stamp(30)],
+        'StartCash': 1000.0, 'EndCash': [1440.0], 'Status': ['Completed'],
+    })
+    (row,) = reconcile_shifts(shifts, sales, now=NOW, tolerance=50.0, refunds=refunds).to_dict('records')
+    assert (row['Takings'], row['Refunds'], row['Expected_Cash']) == (500.0, 60.0, 1440.0)
+    assert row['Variance'] == 0.0 and row['Flag'] == 'OK'
+    # Without the refund the same count looks short
+    assert reconcile_shifts(shifts, sales, now=NOW, tolerance=50.0)['Flag'].iloc[0] == 'SHORT'
+
+
+def test_refunds_match_a_per_shift_scan():
+    shifts, sales = random_history(6)
+    _, refunds = random_history(7, n_sales=300)
+    refunds = refunds.rename(columns={'Revenue': 'Amount'})
+    recon = reconcile_shifts(shifts, sales, now=NOW, refunds=refunds)
+    refunded, _ = brute_force(shifts, refunds.rename(columns={'Amount': 'Revenue'}), NOW)
+    np.testing.assert_allclose(recon['Refunds'], refunded)
+    np.testing.assert_allclose(recon['Expected_Cash'], 1000.0 + recon['Takings'] - refunded)
+
+
+def test_no_shifts():
+    shifts, sales = random_history(5)
+    assert reconcile_shifts(shifts.iloc[:0], sales).empty
+
+
+def test_synthetic_history_counts_mostly_clean():
+    shifts, sales, sale_ts = synthetic_history(stores=3, days=10, sales_per_store_day=20)
+    summary = variance_summary(reconcile_shifts(shifts, sales, sales_ns=sale_ts))
+    assert summary['shifts'] == len(shifts)
+    assert summary['flagged'] <= len(shifts) // 4
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from regions import RegionCluster, aggregate_hq, partition_by_region, region_summary
+from retention import RetentionPolicy, RetentionState, compact, compacted_tables
+from seed_data import load_seed_tables
+from time_index import append_events, index_tables
+
+
+@pytest.fixture(scope='module')
+def db_and_cluster(tmp_path_factory):
+    db = load_seed_tables()
+    db.update(compacted_tables())
+    db = index_tables(db)
+    db['retention'] = RetentionState(archive_dir=str(tmp_path_factory.mktemp('archive')))
+    with RegionCluster(db) as cluster:
+        yield db, cluster
+
+
+def assert_in_step(db, cluster):
+    cluster.sync(db)
+    expected = aggregate_hq([region_summary(part) for part in partition_by_region(db).values()])
+    for got, want in zip(aggregate_hq(cluster.summaries()), expected):
+        pd.testing.assert_frame_equal(got.sort_index(), want.sort_index())
+
+
+def test_sync_sends_only_what_changed(db_and_cluster):
+    db, cluster = db_and_cluster
+    assert cluster.sync(db) == 0
+
+    sales = db['sales'].tail(3).assign(Date=(db['time_index']['sales'].last() + pd.Timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M'))
+    append_events(db, 'sales', sales)
+    db['inventory'].loc[[0, 5, 9], 'Current_Stock'] += 7
+    pending = db['requests'].index[db['requests']['Status'] == 'Pending']
+    db['requests'].loc[pending, 'Status'] = 'Approved'
+    expected = 3 + 3 + len(pending)
+    assert cluster.sync(db) == expected
+    assert_in_step(db, cluster)
+
+
+def test_sync_resends_rewritten_tables(db_and_cluster):
+    db, cluster = db_and_cluster
+    # A late arrival merges into the middle of the table, then old sales are compacted away
+    append_events(db, 'sales', db['sales'].head(2))
+    assert_in_step(db, cluster)
+    compact(db, RetentionPolicy(sales_days=10, archive_days=0, min_days=0), now=db['time_index']['sales'].last())
+    assert_in_step(db, cluster)
+    assert cluster.sync(db) == 0
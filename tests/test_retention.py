@@ -0,0 +1,148 @@
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import retention
+from exports import payroll_table
+from retention import (RetentionPolicy, RetentionState, compact, compacted_tables, enforce_budget, read_archive_rows,
+                       sales_history)
+from seed_data import id_counters, load_seed_tables, next_ids
+from time_index import append_events, index_tables
+
+NOW = pd.Timestamp('2026-06-30 12:00')
+
+
+def history(now, days, n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.to_datetime(now.value - rng.integers(0, days * 86_400, n) * 1_000_000_000)
+
+
+def make_db(tmp_path, policy=None, seed=3):
+    rng = np.random.default_rng(seed)
+    db = load_seed_tables()
+    db.update(compacted_tables())
+    db = index_tables(db)
+    db['id_seq'] = id_counters(db)
+    db['retention'] = RetentionState(policy or RetentionPolicy(), archive_dir=str(tmp_path))
+
+    stores, products = db['stores'], db['products']
+    n = 5_000
+    append_events(db, 'sales', pd.DataFrame({
+        'Date': history(NOW, 200, n, seed).strftime('%Y-%m-%d %H:%M'),
+        'Location': rng.choice(stores, n), 'Product': rng.choice(products, n),
+        'Quantity': rng.integers(1, 5, n), 'Revenue': rng.integers(50, 5_000, n).astype(float),
+    }))
+    m = 400
+    append_events(db, 'dispatches', pd.DataFrame({
+        'DispatchID': next_ids(db, 'dispatches', m), 'Date': history(NOW, 120, m, seed + 1).strftime('%Y-%m-%d %H:%M'),
+        'Origin': 'Kompally Hub', 'Destination': rng.choice(stores, m), 'Product': rng.choice(products, m),
+        'Quantity': rng.integers(1, 50, m), 'Status': rng.choice(['Delivered', 'In-Transit'], m, p=[0.8, 0.2]),
+    }))
+    append_events(db, 'requests', pd.DataFrame({
+        'ReqID': next_ids(db, 'requests', m), 'Date': history(NOW, 120, m, seed + 2).strftime('%Y-%m-%d %H:%M'),
+        'Store': rng.choice(stores, m), 'Product': rng.choice(products, m),
+        'Quantity': rng.integers(1, 50, m), 'Status': rng.choice(['Pending', 'Approved', 'Rejected'], m),
+    }))
+    db['audit_logs'] = pd.DataFrame({
+        'Timestamp': history(NOW, 300, m, seed + 3).strftime('%Y-%m-%d %H:%M:%S'),
+        'User': 'admin', 'Action': 'TEST', 'Details': [f"entry {i}" for i in range(m)],
+    })
+    emp = db['employees']['EmpID'].to_numpy()
+    days = pd.date_range(NOW - pd.Timedelta(days=150), NOW, freq='D')
+    att = pd.DataFrame({'EmpID': np.repeat(emp, len(days)), 'Date': np.tile(days.strftime('%Y-%m-%d'), len(emp)),
+                        'CheckIn': '09:00:00', 'CheckOut': '18:00:00'})
+    att.loc[rng.random(len(att)) < 0.05, 'CheckOut'] = None
+    db['attendance'] = att
+    return db
+
+
+def sales_totals(frame):
+    return frame.groupby(['Location', 'Product'])[['Quantity', 'Revenue', 'Transactions']].sum().sort_index()
+
+
+POLICY = RetentionPolicy(sales_days=30, archive_days=20, attendance_days=40, audit_days=60)
+
+
+def test_compaction_preserves_sales_and_payroll(tmp_path):
+    db = make_db(tmp_path, POLICY)
+    sales_before = sales_totals(sales_history(db))
+    payroll_before = payroll_table(db['attendance'], db['employees'], db['attendance_monthly'])
+    raw_before = len(db['sales'])
+
+    report = compact(db, now=NOW)
+    assert report['sales_rows'] > 0 and report['attendance_rows'] > 0
+    assert len(db['sales']) < raw_before and len(db['sales_daily']) > 0
+    pd.testing.assert_frame_equal(sales_totals(sales_history(db)), sales_before)
+    assert sales_history(db)['Transactions'].sum() == raw_before
+    pd.testing.assert_frame_equal(payroll_table(db['attendance'], db['employees'], db['attendance_monthly']),
+                                  payroll_before)
+    # Nothing raw is left from before the window
+    cutoff = NOW.normalize() - pd.Timedelta(days=POLICY.sales_days)
+    assert pd.to_datetime(db['sales']['Date']).min() >= cutoff
+    # A second pass has nothing left to do
+    assert compact(db, now=NOW)['Rows_Compacted'] == 0
+
+
+def test_archived_rows_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, 'ARCHIVE_ROW_GROUP', 37)
+    db = make_db(tmp_path, POLICY)
+    before = {t: db[t].copy() for t in ('dispatches', 'requests', 'audit_logs')}
+    compact(db, now=NOW)
+
+    for table, key in [('dispatches', 'DispatchID'), ('requests', 'ReqID'), ('audit_logs', 'Details')]:
+        (seg,) = [s for s in db['retention'].segments if s['Table'] == table]
+        archived = read_archive_rows(seg['Path'], 0, seg['Rows'])
+        assert len(archived) == seg['Rows'] > 37
+        # Every row is either still live or archived, never both
+        frame = db[table]
+        if table == 'audit_logs':
+            # Compaction logs itself
+            frame = frame[frame['Action'] != 'RETENTION_COMPACTION']
+        live = set(frame[key])
+        assert not live & set(archived[key])
+        assert live | set(archived[key]) == set(before[table][key])
+        expected = before[table].set_index(key).loc[archived[key]].reset_index()
+        pd.testing.assert_frame_equal(archived, expected[archived.columns], check_dtype=False)
+        # Pages that straddle row groups match the whole read
+        for lo in (0, 30, 36, 37, 100, seg['Rows'] - 5):
+            pd.testing.assert_frame_equal(read_archive_rows(seg['Path'], lo, lo + 25), archived.iloc[lo:lo + 25].reset_index(drop=True))
+    assert (db['dispatches']['Status'] == 'In-Transit').sum() == (before['dispatches']['Status'] == 'In-Transit').sum()
+    assert (db['requests']['Status'] == 'Pending').sum() == (before['requests']['Status'] == 'Pending').sum()
+
+
+def test_budget_halves_windows_down_to_the_floor(tmp_path):
+    policy = RetentionPolicy(sales_days=40, archive_days=40, attendance_days=40, audit_days=40, min_days=5, budget_mb=0.0)
+    db = make_db(tmp_path, policy)
+    enforce_budget(db, now=NOW, force=True)
+    windows = [r['Windows'] for r in reversed(db['retention'].history) if r['Reason'].startswith('budget')]
+    assert [w.split(' / ')[0] for w in windows] == ['sales 40d', 'sales 20d', 'sales 10d', 'sales 5d']
+    # The budget is checked at most every CHECK_INTERVAL_S unless forced
+    assert enforce_budget(db, now=NOW) is None
+
+
+def test_under_budget_does_nothing(tmp_path):
+    db = make_db(tmp_path, RetentionPolicy(budget_mb=10_000.0))
+    assert enforce_budget(db, now=NOW, force=True) is None
+    assert not db['retention'].history
+
+
+def test_policy_from_env_rejects_a_non_positive_budget(monkeypatch):
+    monkeypatch.setenv('NEXUS_RETENTION_SALES_DAYS', '45')
+    assert RetentionPolicy.from_env().sales_days == 45
+    for value in ('0', '-64'):
+        monkeypatch.setenv('NEXUS_RETENTION_BUDGET_MB', value)
+        with pytest.raises(ValueError):
+            RetentionPolicy.from_env()
+
+
+def test_archive_directory_goes_with_its_state(tmp_path):
+    db = make_db(tmp_path, POLICY)
+    compact(db, now=NOW)
+    archive_dir = db['retention'].archive_dir
+    assert os.listdir(archive_dir) and os.path.dirname(archive_dir) == str(tmp_path)
+    del db
+    gc.collect()
+    assert not os.path.exists(archive_dir)
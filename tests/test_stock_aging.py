@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_aging import AGING_LABELS, LastSoldTracker
+
+T0 = pd.Timestamp('2026-01-01')
+
+
+def days(n):
+    return T0 + pd.Timedelta(days=n)
+
+
+def make_tracker():
+    return LastSoldTracker(['A', 'B'], ['P1', 'P2'], window_days=30)
+
+
+def test_velocity_is_an_exponentially_decayed_rate():
+    t = make_tracker()
+    t.record('A', 'P1', 30, T0)
+    # One sale of 30 units over a 30-day time constant is 1 unit/day, then decays by e^-1 per 30 days
+    assert t.velocity_at(T0)[0, 0] == pytest.approx(1.0)
+    assert t.velocity_at(days(30))[0, 0] == pytest.approx(np.exp(-1))
+    t.record('A', 'P1', 30, days(30))
+    assert t.velocity_at(days(30))[0, 0] == pytest.approx(1 + np.exp(-1))
+    assert t.velocity_at(days(30))[1].sum() == 0
+
+
+def test_late_events_and_bulk_bootstrap_agree_with_live_recording():
+    sales = pd.DataFrame({
+        'Date': [days(d).strftime('%Y-%m-%d %H:%M') for d in (0, 5, 3, 12)],
+        'Location': ['A', 'A', 'A', 'B'], 'Product': ['P1', 'P1', 'P1', 'P2'], 'Quantity': [4, 2, 7, 1],
+    })
+    live = make_tracker()
+    # The day-3 sale arrives after the day-5 one, as an offline sync would
+    live.record_many(sales['Location'], sales['Product'], sales['Quantity'], sales['Date'])
+    bulk = LastSoldTracker.from_sales(sales, ['A', 'B'], ['P1', 'P2'], now=days(12), window_days=30)
+    np.testing.assert_allclose(live.velocity_at(days(20)), bulk.velocity_at(days(20)))
+    np.testing.assert_array_equal(live.last_sold, bulk.last_sold)
+    assert live.last_sold[0, 0] == days(5).value
+
+
+def test_unknown_cells_are_ignored():
+    t = make_tracker()
+    t.record('Nowhere', 'P1', 5, T0)
+    t.record('A', 'Unknown', 5, T0)
+    assert t.velocity.sum() == 0 and (t.days_since_sale(T0) == np.inf).all()
+
+
+def test_days_of_cover():
+    t = make_tracker()
+    t.record('A', 'P1', 60, T0)
+    stock = np.array([[10, 10], [0, 5]])
+    cover = t.days_of_cover(stock, T0)
+    assert cover[0, 0] == pytest.approx(5.0)
+    # No velocity means stock never runs out, even at zero stock
+    assert np.isinf(cover[0, 1]) and np.isinf(cover[1, 0]) and np.isinf(cover[1, 1])
+    cells = t.cells(['A', 'B'], ['P1', 'P1'])
+    np.testing.assert_allclose(t.days_of_cover(np.array([10, 0]), T0, cells), [5.0, np.inf])
+
+
+def test_aging_bucket_edges():
+    t = make_tracker()
+    t.record('A', 'P1', 1, T0)
+    buckets = [int(t.aging_bucket(days(d))[0, 0]) for d in (0, 29.99, 30, 59.99, 60, 90, 400)]
+    assert buckets == [0, 0, 1, 1, 2, 3, 3]
+    # Never sold is the oldest bucket
+    assert AGING_LABELS[t.aging_bucket(T0)[1, 1]] == '90+ days'
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from stock_ledger import EVENT_KINDS, StockLedger
+
+START = pd.Timestamp('2026-01-01')
+
+
+def make_ledger(checkpoint_every, seed=11, n_batches=300):
+    rng = np.random.default_rng(seed)
+    locations, products = ['HQ', 'A', 'B'], ['P1', 'P2', 'P3', 'P4']
+    initial = rng.integers(0, 100, (len(locations), len(products)))
+    ledger = StockLedger(locations, products, initial, START, checkpoint_every=checkpoint_every)
+    log = []
+    for i in range(n_batches):
+        n = int(rng.integers(1, 6))
+        ts = START + pd.Timedelta(minutes=i)
+        locs = list(rng.choice(locations, n))
+        prods = list(rng.choice(products, n))
+        deltas = rng.integers(-20, 20, n)
+        ledger.record_batch(list(rng.choice(EVENT_KINDS, n)), locs, prods, deltas, ts)
+        log.extend((ts, l, p, d) for l, p, d in zip(locs, prods, deltas))
+    return ledger, initial, log
+
+
+def brute_force(ledger, initial, log, ts):
+    matrix = np.asarray(initial, dtype=np.int64).copy()
+    for when, l, p, d in log:
+        if when <= ts:
+            matrix[ledger.loc_code[l], ledger.prod_code[p]] += d
+    return matrix
+
+
+def test_checkpoint_replay_matches_brute_force():
+    ledger, initial, log = make_ledger(checkpoint_every=16)
+    assert ledger.checkpoints > 10
+    for minute in [0, 1, 15, 16, 17, 100, 149.5, 299, 1_000]:
+        ts = START + pd.Timedelta(minutes=minute)
+        np.testing.assert_array_equal(ledger.stock_at(ts), brute_force(ledger, initial, log, ts))
+
+
+def test_checkpoint_spacing_does_not_change_answers():
+    a, _, _ = make_ledger(checkpoint_every=7)
+    b, _, _ = make_ledger(checkpoint_every=10_000)
+    assert b.checkpoints == 1
+    for minute in range(0, 300, 13):
+        ts = START + pd.Timedelta(minutes=minute)
+        np.testing.assert_array_equal(a.stock_at(ts), b.stock_at(ts))
+
+
+def test_replay_matches_materialized_stock():
+    ledger, _, _ = make_ledger(checkpoint_every=32)
+    np.testing.assert_array_equal(ledger.replay(), ledger.stock)
+    np.testing.assert_array_equal(ledger.stock_at(START + pd.Timedelta(days=1)), ledger.stock)
+
+
+def test_log_stays_monotonic_for_out_of_order_timestamps():
+    ledger = StockLedger(['HQ'], ['P1'], [[10]], START, checkpoint_every=2)
+    ledger.record('SALE', 'HQ', 'P1', -1, START + pd.Timedelta(minutes=5))
+    # An earlier clock reading is clamped to the last event, not inserted before it
+    ledger.record('SALE', 'HQ', 'P1', -2, START + pd.Timedelta(minutes=1))
+    assert ledger.level_at('HQ', 'P1', START + pd.Timedelta(minutes=1)) == 10
+    assert ledger.level_at('HQ', 'P1', START + pd.Timedelta(minutes=5)) == 7
+    assert list(ledger.events()['Delta']) == [-1, -2]
+
+
+def test_no_answer_before_the_ledger_start():
+    ledger, initial, log = make_ledger(checkpoint_every=16)
+    assert ledger.start == START
+    assert ledger.stock_at(START - pd.Timedelta(seconds=1)) is None
+    assert ledger.level_at('HQ', 'P1', START - pd.Timedelta(days=30)) is None
+    np.testing.assert_array_equal(ledger.stock_at(START), brute_force(ledger, initial, log, START))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_index import TimeIndex, append_events, index_tables, latest, range_slice, to_ns
+
+
+def minutes(values):
+    return [(pd.Timestamp('2026-01-01') + pd.Timedelta(minutes=int(m))).strftime('%Y-%m-%d %H:%M') for m in values]
+
+
+def make_db(stamps):
+    sales = pd.DataFrame({'Date': minutes(stamps), 'Seq': np.arange(len(stamps))})
+    return index_tables({'sales': sales}, tables={'sales': 'Date'})
+
+
+def brute_force(frames):
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.iloc[np.argsort(to_ns(merged['Date']), kind='stable')].reset_index(drop=True)
+
+
+def assert_indexed(db):
+    np.testing.assert_array_equal(db['time_index']['sales'].keys, to_ns(db['sales']['Date']))
+    assert (np.diff(db['time_index']['sales'].keys) >= 0).all()
+
+
+def test_index_tables_sorts_stably():
+    db = make_db([5, 1, 3, 1, 0])
+    assert list(db['sales']['Seq']) == [4, 1, 3, 2, 0]
+    assert_indexed(db)
+
+
+def test_in_order_appends_go_to_the_tail():
+    db = make_db([0, 1, 2])
+    for batch in ([2, 3], [3], [10, 11, 12]):
+        rows = pd.DataFrame({'Date': minutes(batch), 'Seq': -1})
+        append_events(db, 'sales', rows)
+    assert len(db['sales']) == 9
+    assert_indexed(db)
+
+
+def test_late_arrivals_merge_like_a_stable_sort():
+    rng = np.random.default_rng(7)
+    db = make_db(np.sort(rng.integers(0, 1_000, 200)))
+    frames = [db['sales']]
+    for batch in range(20):
+        # Mix of on-time and late rows, in arbitrary order within the batch
+        stamps = rng.integers(0, 1_200, rng.integers(1, 15))
+        rows = pd.DataFrame({'Date': minutes(stamps), 'Seq': 1_000 * (batch + 1) + np.arange(len(stamps))})
+        frames.append(rows)
+        append_events(db, 'sales', rows)
+        assert_indexed(db)
+    pd.testing.assert_frame_equal(db['sales'], brute_force(frames))
+
+
+def test_range_slice_matches_a_mask():
+    rng = np.random.default_rng(3)
+    db = make_db(rng.integers(0, 5_000, 1_000))
+    ts = pd.to_datetime(db['sales']['Date'])
+    for start, end in [(None, None), ('2026-01-02', None), (None, '2026-01-03 05:00'), ('2026-01-02 01:07', '2026-01-02 01:07'), ('2026-01-02', '2026-01-03')]:
+        mask = np.ones(len(ts), dtype=bool)
+        if start is not None:
+            mask &= ts >= pd.Timestamp(start)
+        if end is not None:
+            mask &= ts < pd.Timestamp(end)
+        pd.testing.assert_frame_equal(range_slice(db, 'sales', start, end), db['sales'][mask])
+
+
+def test_time_index_grows_and_rejects_unsorted_keys():
+    index = TimeIndex([1, 2])
+    for k in range(3, 100):
+        index.extend([k])
+    assert len(index) == 99 and index.keys[-1] == 99
+    assert index.can_append([99, 100]) and not index.can_append([98]) and not index.can_append([200, 150])
+    with pytest.raises(ValueError):
+        TimeIndex([2, 1])
+
+
+def test_latest_is_newest_first():
+    db = make_db([0, 1, 2, 3])
+    assert list(latest(db['sales'], 2)['Seq']) == [3, 2]
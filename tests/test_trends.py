@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trends import bin_sales, build_trend_series, lttb_downsample, top_series
+
+
+def reference_lttb(x, y, n_out):
+    # Textbook LTTB: bucket i covers [floor(i * every) + 1, floor((i + 1) * every) + 1)
+    n = len(x)
+    edge = lambda i: min(n - 1, 1 + i * (n - 2) // (n_out - 2))
+    keep, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = edge(i), edge(i + 1)
+        nxt = slice(hi, edge(i + 2) if i + 2 < n_out - 1 else n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        best = max(range(lo, hi), key=lambda j: abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])))
+        keep.append(best)
+        a = best
+    return np.array(keep + [n - 1])
+
+
+@pytest.mark.parametrize('n', [4, 5, 28, 97, 250])
+def test_lttb_matches_reference(n):
+    rng = np.random.default_rng(n)
+    x, y = np.arange(n, dtype=float), rng.random(n)
+    for n_out in range(3, n):
+        np.testing.assert_array_equal(lttb_downsample(x, y, n_out), reference_lttb(x, y, n_out))
+
+
+def test_lttb_keeps_one_point_per_bucket():
+    n, n_out = 1_000, 37
+    y = np.random.default_rng(0).random(n)
+    keep = lttb_downsample(np.arange(n), y, n_out)
+    assert len(keep) == n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert (np.diff(keep) > 0).all()
+    edges = 1 + np.arange(n_out - 1) * (n - 2) // (n_out - 2)
+    np.testing.assert_array_equal(np.searchsorted(edges, keep[1:-1], side='right') - 1, np.arange(n_out - 2))
+
+
+def test_lttb_returns_everything_when_small():
+    np.testing.assert_array_equal(lttb_downsample(np.arange(10), np.ones(10), 10), np.arange(10))
+    np.testing.assert_array_equal(lttb_downsample(np.arange(10), np.ones(10), 2), np.arange(10))
+
+
+def test_bin_sales_sums_rows_into_their_bins():
+    sales = pd.DataFrame({
+        'Date': ['2026-01-01 00:10', '2026-01-01 00:50', '2026-01-01 02:00', '2026-01-01 05:00', '2025-12-31 23:00'],
+        'Location': ['A', 'B', 'A', 'A', 'A'],
+        'Revenue': [1.0, 2.0, 4.0, 8.0, 16.0],
+    })
+    starts, names, matrix = bin_sales(sales, '2026-01-01', '2026-01-01 03:00', step=pd.Timedelta(hours=1))
+    assert names == ['A', 'B']
+    assert list(starts) == list(pd.date_range('2026-01-01', periods=3, freq='h'))
+    # Rows outside [start, end) are dropped, empty bins are zero
+    np.testing.assert_array_equal(matrix, [[1.0, 0.0, 4.0], [2.0, 0.0, 0.0]])
+
+
+def test_top_series_folds_the_tail_into_other():
+    names = [f"S{i}" for i in range(30)]
+    matrix = np.arange(30, dtype=float)[:, None] * np.ones((1, 4))
+    kept, folded = top_series(names, matrix, max_series=5)
+    assert kept == ['S26', 'S27', 'S28', 'S29', 'Other']
+    np.testing.assert_array_equal(folded.sum(axis=1)[-1], 4 * sum(range(26)))
+    assert folded.sum() == matrix.sum()
+
+
+def test_trend_payload_is_bounded_with_many_series():
+    rng = np.random.default_rng(1)
+    n = 50_000
+    sales = pd.DataFrame({
+        'Date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 30 * 86_400, n), unit='s'),
+        'Product': rng.integers(0, 5_000, n).astype(str),
+        'Revenue': rng.random(n),
+    })
+    _, series = build_trend_series(sales, '2026-01-01', '2026-01-31', split_by='Product', max_points=4_000)
+    assert len(series) == 20
+    assert sum(len(xs) for xs, _ in series.values()) <= 4_000
@@ -0,0 +1,118 @@
+"""Time-ordered indexes over the append-only event tables.
+
+Each event table is kept in ascending time order and paired with a
+``TimeIndex`` holding the same timestamps as int64 nanoseconds. Range queries
+are two ``searchsorted`` calls followed by a positional slice, so filtering
+costs O(log n + k) and never rescans or re-sorts the table.
+"""
+import numpy as np
+import pandas as pd
+
+# Event tables and the column they are ordered by
+EVENT_TABLES = {'sales': 'Date', 'sales_daily': 'Date', 'requests': 'Date', 'dispatches': 'Date'}
+
+
+def to_ns(values):
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    return pd.to_datetime(pd.Series(values).to_numpy()).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+class TimeIndex:
+    """Sorted int64 timestamps with amortised O(1) appends."""
+
+    def __init__(self, keys=None):
+        keys = np.empty(0, dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        if len(keys) > 1 and (np.diff(keys) < 0).any():
+            raise ValueError("TimeIndex keys must be sorted ascending")
+        self._buf = np.empty(max(16, 2 * len(keys)), dtype=np.int64)
+        self._buf[:len(keys)] = keys
+        self._n = len(keys)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def keys(self):
+        return self._buf[:self._n]
+
+    def extend(self, new_keys):
+        new_keys = np.asarray(new_keys, dtype=np.int64)
+        need = self._n + len(new_keys)
+        if need > len(self._buf):
+            grown = np.empty(max(need, 2 * len(self._buf)), dtype=np.int64)
+            grown[:self._n] = self.keys
+            self._buf = grown
+        self._buf[self._n:need] = new_keys
+        self._n = need
+
+    def can_append(self, new_keys):
+        # True when new_keys can go at the tail without breaking the order
+        if len(new_keys) == 0:
+            return True
+        in_order = len(new_keys) < 2 or not (np.diff(new_keys) < 0).any()
+        return in_order and (self._n == 0 or new_keys[0] >= self._buf[self._n - 1])
+
+    def bounds(self, start=None, end=None):
+        """Positions ``(lo, hi)`` of rows with ``start <= t < end``."""
+        keys = self.keys
+        lo = 0 if start is None else int(keys.searchsorted(pd.Timestamp(start).value, side='left'))
+        hi = self._n if end is None else int(keys.searchsorted(pd.Timestamp(end).value, side='left'))
+        return lo, max(lo, hi)
+
+    def first(self):
+        return pd.Timestamp(self._buf[0]) if self._n else None
+
+    def last(self):
+        return pd.Timestamp(self._buf[self._n - 1]) if self._n else None
+
+
+def sort_and_index(df, col):
+    keys = to_ns(df[col])
+    if len(keys) < 2 or (np.diff(keys) >= 0).all():
+        # Already ordered (e.g. a snapshot): keep the frame as-is rather than copying it
+        return df.reset_index(drop=True), TimeIndex(keys)
+    # Stable sort keeps same-minute events in arrival order
+    order = np.argsort(keys, kind='stable')
+    return df.take(order).reset_index(drop=True), TimeIndex(keys[order])
+
+
+def index_tables(db, tables=EVENT_TABLES):
+    """Sort every event table in ``db`` by time and attach its ``TimeIndex``."""
+    db.setdefault('time_index', {})
+    for table, col in tables.items():
+        if table in db:
+            db[table], db['time_index'][table] = sort_and_index(db[table], col)
+    return db
+
+
+def append_events(db, table, rows):
+    """Append ``rows`` (DataFrame or list of dicts) keeping ``db[table]`` time-ordered."""
+    col = EVENT_TABLES[table]
+    new = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    if new.empty:
+        return db[table]
+    index = db['time_index'][table]
+    new_keys = to_ns(new[col])
+
+    if index.can_append(new_keys):
+        # Common case: events arrive in time order, so this is a plain tail append
+        db[table] = pd.concat([db[table], new], ignore_index=True) if len(db[table]) else new.reset_index(drop=True)
+        index.extend(new_keys)
+    else:
+        # Late arrivals (e.g. an offline cache sync) fall back to a stable merge
+        merged = pd.concat([db[table], new], ignore_index=True)
+        db[table], db['time_index'][table] = sort_and_index(merged, col)
+    return db[table]
+
+
+def range_slice(db, table, start=None, end=None):
+    """Rows of ``db[table]`` with ``start <= t < end`` as a positional slice."""
+    lo, hi = db['time_index'][table].bounds(start, end)
+    return db[table].iloc[lo:hi]
+
+
+def latest(df, n=None):
+    """Newest-first view of a time-ordered table."""
+    rev = df.iloc[::-1]
+    return rev if n is None else rev.head(n)
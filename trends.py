@@ -0,0 +1,118 @@
+"""Server-side binning and shape-preserving downsampling for trend charts.
+
+Sales are pre-binned on a fixed time grid with ``np.bincount`` and each series
+is then reduced with Largest-Triangle-Three-Buckets (LTTB), so the payload
+sent to the browser stays bounded regardless of how many rows are in range.
+"""
+import numpy as np
+import pandas as pd
+
+# Total number of points shipped to the browser across all series
+MAX_TREND_POINTS = 4000
+# Beyond this many series the smallest are folded into one "Other" line
+MAX_TREND_SERIES = 20
+
+# Candidate bin widths, finest first
+BIN_STEPS = [
+    ('15 min', pd.Timedelta(minutes=15)),
+    ('Hourly', pd.Timedelta(hours=1)),
+    ('6 Hours', pd.Timedelta(hours=6)),
+    ('Daily', pd.Timedelta(days=1)),
+    ('Weekly', pd.Timedelta(days=7)),
+]
+MAX_BINS = 20000
+
+
+def pick_bin_step(start, end, max_bins=MAX_BINS, min_step=None):
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for label, step in BIN_STEPS:
+        if min_step is not None and step < min_step:
+            continue
+        if span / step <= max_bins:
+            return label, step
+    return BIN_STEPS[-1]
+
+
+def bin_sales(sales_df, start, end, split_by='Location', metric='Revenue', step=None):
+    """Aggregate ``metric`` per ``split_by`` value on a regular [start, end) grid.
+
+    Returns ``(bin_starts, series_names, matrix)`` where ``matrix`` has one row
+    per series and one column per bin. Empty bins are zero-filled.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if step is None:
+        _, step = pick_bin_step(start, end)
+    n_bins = max(1, int(np.ceil((end - start) / step)))
+    bin_starts = pd.date_range(start, periods=n_bins, freq=step)
+
+    if sales_df.empty:
+        return bin_starts, [], np.zeros((0, n_bins))
+
+    ts = pd.to_datetime(sales_df['Date']).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    bins = (ts - start.value) // step.value
+    in_range = (bins >= 0) & (bins < n_bins)
+
+    codes, names = pd.factorize(sales_df[split_by].to_numpy()[in_range], sort=True)
+    weights = sales_df[metric].to_numpy(dtype=np.float64)[in_range]
+    flat = codes * n_bins + bins[in_range]
+    matrix = np.bincount(flat, weights=weights, minlength=len(names) * n_bins)
+    return bin_starts, list(names), matrix.reshape(len(names), n_bins)
+
+
+def lttb_downsample(x, y, n_out):
+    """Return the indices of the ``n_out`` points LTTB keeps from ``(x, y)``."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    # Bucket edges over the interior points; integer maths so no edge is floored one short
+    edges = 1 + np.arange(n_out - 1, dtype=np.int64) * (n - 2) // (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        # Triangle area against the previous kept point and the next bucket mean
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def top_series(names, matrix, max_series=MAX_TREND_SERIES):
+    """Keep the ``max_series - 1`` largest series by total and sum the rest into ``'Other'``."""
+    if len(names) <= max_series:
+        return names, matrix
+    order = np.argsort(-matrix.sum(axis=1), kind='stable')
+    top, rest = np.sort(order[:max_series - 1]), order[max_series - 1:]
+    return [names[i] for i in top] + ['Other'], np.vstack([matrix[top], matrix[rest].sum(axis=0)])
+
+
+def build_trend_series(sales_df, start, end, split_by='Location', metric='Revenue', max_points=MAX_TREND_POINTS,
+                       min_step=None, max_series=MAX_TREND_SERIES):
+    """Bin and downsample sales into ``{series_name: (timestamps, values)}``.
+
+    ``min_step`` stops binning finer than the data's resolution (e.g. daily
+    aggregates of compacted sales). At most ``max_series`` series are
+    returned, so the total stays near ``max_points`` however many products
+    or stores are in range.
+    """
+    label, step = pick_bin_step(start, end, min_step=min_step)
+    bin_starts, names, matrix = bin_sales(sales_df, start, end, split_by, metric, step)
+    if not names:
+        return label, {}
+    names, matrix = top_series(names, matrix, max_series)
+
+    per_series = max(3, max_points // len(names))
+    x = bin_starts.asi8
+    series = {}
+    for name, y in zip(names, matrix):
+        idx = lttb_downsample(x, y, per_series)
+        series[name] = (bin_starts[idx], y[idx])
+    return label, series
@@ -0,0 +1,22 @@
+"""Start method for the app's worker processes.
+
+Streamlit runs app.py as ``__main__``, and a spawned or forkserver child
+re-imports the parent's main script (as ``__mp_main__``) before running
+its target. app.py therefore keeps page set-up and data loading behind
+``if __name__ == "__main__"``. Children fork from a forkserver that has
+already imported the heavy libraries, so the re-import is cheap and no
+worker loads the seed data.
+"""
+import multiprocessing as mp
+
+# Imported once in the forkserver; every worker forks with them loaded
+PRELOAD = ['numpy', 'pandas', 'pyarrow', 'streamlit', 'regions', 'exports']
+
+
+def worker_context():
+    """Forkserver context with ``PRELOAD`` imported, or spawn where forkserver isn't available."""
+    if 'forkserver' not in mp.get_all_start_methods():
+        return mp.get_context('spawn')
+    ctx = mp.get_context('forkserver')
+    ctx.set_forkserver_preload(PRELOAD)
+    return ctx